@@ -26,6 +26,20 @@ if __name__ == "__main__":
         "--check", action="store_true", dest="check",
         help="Check implementation of parsing and processing."
     )
+    PARSER.add_argument(
+        "--benchmark", action="store_true", dest="benchmark",
+        help=(
+            "Measure the performance of parsing (a single protocol if given, "
+            "otherwise the benchmark suite on synthetic protocols)."
+        )
+    )
+    PARSER.add_argument(
+        "--rebuild-summary", action="store_true", dest="rebuild_summary",
+        help=(
+            "Recompute the summary of the analysis of all speeches in the "
+            "database."
+        )
+    )
     PARSER.add_argument(
         "-p", type=str, dest="protocol", metavar="protocol.xml or protocols/",
         help="Example protocol to check or directory with multiple protocols."
@@ -42,6 +56,26 @@ if __name__ == "__main__":
         "--parse-only", action="store_true", dest="parse_only",
         help="Only parse speeches when checking."
     )
+    PARSER.add_argument(
+        "-c", type=str, dest="cache", metavar="cache/",
+        help="Directory of the parse cache when checking."
+    )
+    PARSER.add_argument(
+        "-j", type=int, dest="workers", metavar="workers",
+        default=os.cpu_count(),
+        help=(
+            "Number of worker processes when checking a directory (0 for "
+            "one per CPU)."
+        )
+    )
+    PARSER.add_argument(
+        "-n", type=int, dest="repetitions", metavar="repetitions", default=10,
+        help="Number of repetitions per measurement when benchmarking."
+    )
+    PARSER.add_argument(
+        "-b", type=str, dest="baseline", metavar="baseline.json",
+        help="Previous benchmark results to compare with."
+    )
     ARGS = PARSER.parse_args()
     if ARGS.test:
         import test.test as test
@@ -57,15 +91,27 @@ if __name__ == "__main__":
             ARGS.parse_only
         )
         if os.path.isdir(PROTOCOL):
-            FILES = [
-                os.path.join(PROTOCOL, protocol)
-                for protocol in os.listdir(PROTOCOL)
-            ]
-            for tmp in FILES:
-                print("Checking file {}".format(tmp))
-                check.run(tmp, DTD, OUTPUT, PARSE_ONLY)
+            check.run_directory(
+                PROTOCOL, DTD, OUTPUT, PARSE_ONLY, ARGS.workers, ARGS.cache
+            )
+        else:
+            check.run(PROTOCOL, DTD, OUTPUT, PARSE_ONLY, ARGS.cache)
+    elif ARGS.benchmark:
+        import test.benchmark as benchmark
+        print("Running benchmark.")
+        if ARGS.protocol is None:
+            benchmark.run_suite(
+                os.path.abspath(ARGS.dtd), ARGS.output, ARGS.repetitions,
+                ARGS.baseline
+            )
         else:
-            check.run(PROTOCOL, DTD, OUTPUT, PARSE_ONLY)
+            benchmark.run(
+                os.path.abspath(ARGS.protocol), os.path.abspath(ARGS.dtd),
+                ARGS.repetitions
+            )
+    elif ARGS.rebuild_summary:
+        print("Rebuilding summary.")
+        backend.rebuild_summary()
     else:
         print("Running backend.")
         backend.run()
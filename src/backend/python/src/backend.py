@@ -16,7 +16,10 @@ from typing import List
 # Local imports
 import src.modules.api as api
 import src.modules.schema as schema
+import src.modules.parsing as parsing
+import src.modules.processing as processing
 import src.modules.updating as updating
+import src.modules.analyzing as analyzing
 import src.modules.database as database
 import src.modules.scraping as scraping
 import src.modules.myexceptions as myexceptions
@@ -61,23 +64,44 @@ def __parse_env_variables() -> schema.EnvVars:
             int(os.environ["SCRAPER_TIMEOUT"]),
             int(os.environ["SCRAPER_INTERVAL"])
         )
+        # Optional: downloaded protocols are not stored without a directory
         protocol_config = (
-            os.environ["PROTOCOL_DTD_FILE"], os.environ["PROTOCOL_DIRECTORY"]
+            os.environ["PROTOCOL_DTD_FILE"],
+            os.environ.get("PROTOCOL_DIRECTORY", "")
         )
         ods_config = (
             os.environ["ODS_HOST"], os.environ["ODS_PIPELINE_DEPUTIES"],
             os.environ["ODS_FALLBACK_DEPUTIES"], os.environ["ODS_PROFILE_URL"]
         )
+        # Optional: the parse cache is disabled without a directory
+        cache_config = (
+            os.environ.get("PROTOCOL_CACHE_DIRECTORY", ""),
+            int(os.environ.get("PROTOCOL_CACHE_SIZE", "512")) * 1024 * 1024
+        )
+        # Optional: textblob without worker processes is the default and
+        # speeches are analyzed before they are stored
+        analysis_config = (
+            os.environ.get("SENTIMENT_ENGINE", "textblob"),
+            int(os.environ.get("ANALYSIS_WORKERS", "0")),
+            os.environ.get("ANALYSIS_DEFERRED", "no").lower() == "yes"
+        )
+        # Optional: sentiments are only cached in memory without a database
+        sentiment_cache_config = (
+            int(os.environ.get("SENTIMENT_CACHE_SIZE", "10000")),
+            os.environ.get("SENTIMENT_CACHE_FILE", "")
+        )
     except KeyError as key_error:
         print("Missing required environment variable: %s", str(key_error))
         sys.exit(1)
     except ValueError as value_error:
-        print("Unable to convert port: %s", str(value_error))
+        print("Unable to convert number: %s", str(value_error))
         sys.exit(1)
     return schema.EnvVars(
         database_config=database_config, api_config=api_config,
         scraper_config=scraper_config, protocol_config=protocol_config,
-        ods_config=ods_config, logging_config=logging_config
+        ods_config=ods_config, logging_config=logging_config,
+        cache_config=cache_config, analysis_config=analysis_config,
+        sentiment_cache_config=sentiment_cache_config
     )
 
 
@@ -88,6 +112,8 @@ def __create_threads(
     """Create all threads that run in the backend.
 
     Returns the thread objects so they can all get started 'simultaneously'.
+    In the deferred mode, the analyzer is started as fifth thread. It
+    analyzes the speeches that are still pending from previous runs first.
 
     Args:
         env_vars (schema.EnvVars): environment variables
@@ -95,9 +121,11 @@ def __create_threads(
         sem_updater (threading.Semaphore): semaphore of updater
 
     Returns:
-        List[threading.Thread]: list containig all four threads
+        List[threading.Thread]: list containig all four (or five) threads
 
     """
+    _, _, deferred = env_vars.analysis_config
+    sem_analyzer = threading.Semaphore(1) if deferred else None
     t_scraper = scraping.Scraper(
         sem=sem_scraper,
         database_client=db_client,
@@ -106,7 +134,8 @@ def __create_threads(
     t_updater = updating.Updater(
         sem=sem_updater,
         database_client=db_client,
-        protocol_config=env_vars.protocol_config
+        protocol_config=env_vars.protocol_config,
+        analyzer_sem=sem_analyzer
     )
     t_scraper_timer = scraping.ScraperTimer(
         sem=sem_scraper,
@@ -115,13 +144,27 @@ def __create_threads(
     t_api = threading.Thread(target=api.start, args=(
         env_vars.api_config, env_vars.ods_config, db_client
     ))
-    return [t_api, t_scraper_timer, t_scraper, t_updater]
+    threads = [t_api, t_scraper_timer, t_scraper, t_updater]
+    if deferred:
+        threads.append(analyzing.Analyzer(
+            sem=sem_analyzer, database_client=db_client
+        ))
+    return threads
 
 
 def run() -> None:
     """Run the backend."""
     env_vars = __parse_env_variables()
     __init_logging(env_vars.logging_config)
+    parsing.configure_cache(*env_vars.cache_config)
+    engine, workers, _ = env_vars.analysis_config
+    try:
+        processing.configure_engine(engine)
+    except ValueError as value_error:
+        logging.error(str(value_error))
+        sys.exit(1)
+    processing.configure_workers(workers)
+    processing.configure_sentiment_cache(*env_vars.sentiment_cache_config)
     sem_scraper = threading.Semaphore(1)
     sem_updater = threading.Semaphore(0)
     try:
@@ -129,6 +172,7 @@ def run() -> None:
             env_vars.database_config, sem_updater, sem_scraper
         )
         logging.info("Successfully connected to the database.")
+        db_client.prepare()
     except myexceptions.DatabaseInitException:
         logging.error("Could not connect to the database.")
         sys.exit(1)
@@ -139,3 +183,23 @@ def run() -> None:
     for thread in threads:
         thread.start()
     logging.info("Started all threads successfully.")
+
+
+def rebuild_summary() -> None:
+    """Rebuild the summary of the analysis in the configured database.
+
+    The database is never cleared, even if configured for the backend, and
+    no other maintenance of the startup is done.
+    """
+    env_vars = __parse_env_variables()
+    __init_logging(env_vars.logging_config)
+    host, port, _, user, password = env_vars.database_config
+    try:
+        db_client = database.Database(
+            (host, port, False, user, password),
+            threading.Semaphore(0), threading.Semaphore(0)
+        )
+    except myexceptions.DatabaseInitException:
+        logging.error("Could not connect to the database.")
+        sys.exit(1)
+    db_client.summary.rebuild(db_client.speeches)
@@ -0,0 +1,321 @@
+"""Aggregates of the speeches maintained in the database.
+
+The collection 'summary' holds a single document with the limits and
+histograms of the analysis of all speeches. The collection 'speakers'
+registers every speaker with party and number of speeches. Both are updated
+whenever speeches are stored and can be rebuilt from the speeches at any
+time. The Database class owns one instance of every aggregate.
+"""
+
+
+# Python imports
+import logging
+import collections
+from typing import List, Dict, Any
+
+
+# 3rd party modules
+import pymongo
+
+
+# Local imports
+import src.modules.schema as schema
+
+
+class AnalysisSummary:
+    """Summary of the analysis of all analyzed speeches.
+
+    The summary contains the limits and the sum of every field of the
+    analysis and (for polarity and subjectivity) a histogram of BUCKETS
+    buckets of equal width. Speeches whose analysis is pending or failed are
+    not part of the summary.
+    """
+
+    # Fields of the analysis summarized by their name in the summary
+    FIELDS = dict(
+        polarity="polarity", subjectivity="subjectivity",
+        number="number_of_comments"
+    )
+    # Ranges of the fields of the analysis with a histogram
+    RANGES = dict(polarity=(-1.0, 1.0), subjectivity=(0.0, 1.0))
+    # Number of buckets of every histogram
+    BUCKETS = 10
+    # Speeches whose analysis is part of the summary
+    QUERY = {
+        "analysis_pending": {"$exists": False},
+        "analysis_failed": {"$exists": False}
+    }
+    # Descriptions of the summarized fields
+    DESCRIPTIONS = dict(
+        polarity="-1.0 (negative) ; 1.0 (positive)",
+        subjectivity="0.0 (objective) ; 1.0 (subjective)",
+        number="Number of comments during a speech"
+    )
+
+    def __init__(self, collection: pymongo.collection.Collection):
+        """Init object.
+
+        Args:
+            collection (pymongo.collection.Collection): collection of the
+                summary
+
+        """
+        self.collection = collection
+
+    def exists(self) -> bool:
+        """Check if the summary has been built.
+
+        Returns:
+            bool: True if the summary exists, False otherwise
+
+        """
+        return self.collection.find_one({"_id": "analysis"}) is not None
+
+    def get_limits(self) -> Dict[str, Any]:
+        """Return the limits of the analysis of all analyzed speeches.
+
+        Besides the limits, the mean and (for polarity and subjectivity) the
+        histogram of every field are returned.
+
+        Returns:
+            Dict[str, Any]: number of analyzed speeches, description and
+                values of every field or None if no speech is analyzed
+
+        """
+        summary = self.collection.find_one({"_id": "analysis"})
+        if summary is None or summary.get("total", 0) <= 0:
+            return None
+        res = dict(analyzed=summary["total"])
+        for key, desc in AnalysisSummary.DESCRIPTIONS.items():
+            values = summary[key]
+            res[key] = dict(
+                desc=desc, min=values["min"], max=values["max"],
+                mean=values["sum"] / summary["total"]
+            )
+            if key in AnalysisSummary.RANGES:
+                histogram = values.get("histogram", {})
+                res[key]["histogram"] = [
+                    histogram.get(str(bucket), 0)
+                    for bucket in range(AnalysisSummary.BUCKETS)
+                ]
+        return res
+
+    def rebuild(self, speeches: pymongo.collection.Collection) -> None:
+        """Recompute the summary from all speeches.
+
+        The summary is computed by a single aggregation pipeline on the
+        database and replaces the current summary afterwards.
+
+        Args:
+            speeches (pymongo.collection.Collection): collection of speeches
+
+        """
+        facets = dict(stats=[{"$group": dict(
+            _id=None, total={"$sum": 1}, **{
+                "{}_{}".format(key, operator): {
+                    "${}".format(operator): "$analysis.{}".format(field)
+                }
+                for key, field in AnalysisSummary.FIELDS.items()
+                for operator in ["min", "max", "sum"]
+            }
+        )}])
+        for key, (low, high) in AnalysisSummary.RANGES.items():
+            facets[key] = [
+                {"$group": {"_id": {"$min": [
+                    AnalysisSummary.BUCKETS - 1, {"$max": [0, {"$floor": {
+                        "$multiply": [
+                            {"$subtract": [
+                                "$analysis.{}".format(
+                                    AnalysisSummary.FIELDS[key]
+                                ), low
+                            ]},
+                            AnalysisSummary.BUCKETS / (high - low)
+                        ]
+                    }}]}
+                ]}, "count": {"$sum": 1}}}
+            ]
+        result = next(speeches.aggregate([
+            {"$match": AnalysisSummary.QUERY}, {"$facet": facets}
+        ]))
+        summary = dict(total=0)
+        if result["stats"]:
+            stats = result["stats"][0]
+            summary["total"] = stats["total"]
+            for key in AnalysisSummary.FIELDS:
+                summary[key] = {
+                    operator: stats["{}_{}".format(key, operator)]
+                    for operator in ["min", "max", "sum"]
+                }
+            for key in AnalysisSummary.RANGES:
+                summary[key]["histogram"] = {
+                    str(int(bucket["_id"])): bucket["count"]
+                    for bucket in result[key]
+                }
+        self.collection.replace_one({"_id": "analysis"}, summary, upsert=True)
+        logging.info("Rebuilt summary of %d speeches.", summary["total"])
+
+    def add(self, analyses: List[Dict[str, Any]]) -> None:
+        """Add the analysis of multiple speeches to the summary atomically.
+
+        Args:
+            analyses (List[Dict[str, Any]]): analysis of every speech
+
+        """
+        if not analyses:
+            return
+        update = {"$inc": {"total": len(analyses)}, "$min": {}, "$max": {}}
+        for key, field in AnalysisSummary.FIELDS.items():
+            values = [analysis[field] for analysis in analyses]
+            update["$min"]["{}.min".format(key)] = min(values)
+            update["$max"]["{}.max".format(key)] = max(values)
+            update["$inc"]["{}.sum".format(key)] = sum(values)
+            if key not in AnalysisSummary.RANGES:
+                continue
+            low, high = AnalysisSummary.RANGES[key]
+            buckets = collections.Counter(
+                min(AnalysisSummary.BUCKETS - 1, max(0, int(
+                    (value - low) * (AnalysisSummary.BUCKETS / (high - low))
+                ))) for value in values
+            )
+            for bucket, count in buckets.items():
+                update["$inc"]["{}.histogram.{}".format(key, bucket)] = count
+        self.collection.update_one({"_id": "analysis"}, update, upsert=True)
+
+
+class SpeakerRegistry:
+    """Registry of all speakers with party and number of speeches.
+
+    The party of a speaker is taken from their newest speech (by date and
+    speech ID), whose key is stored alongside. The version of the registry
+    increases with every change, which invalidates the cached speakers and
+    name keys.
+    """
+
+    def __init__(self, collection: pymongo.collection.Collection):
+        """Init object.
+
+        Args:
+            collection (pymongo.collection.Collection): collection of the
+                speakers
+
+        """
+        self.collection = collection
+        self.version = 0
+        self.speakers_cache = None
+        self.name_keys_cache = None
+
+    def get_all(self) -> Dict[str, Any]:
+        """Return all registered speakers.
+
+        The result is cached until speeches are inserted again.
+
+        Returns:
+            Dict[str, Any]: names of deputies, their number and every
+                speaker with party and number of speeches
+
+        """
+        version = self.version
+        cache = self.speakers_cache
+        if cache is not None and cache[0] == version:
+            return cache[1]
+        speakers = [
+            dict(
+                name=speaker["_id"], party=speaker.get("party"),
+                speeches=speaker["speeches"]
+            ) for speaker in self.collection.find().sort("_id")
+        ]
+        res = dict(
+            names=[speaker["name"] for speaker in speakers],
+            total=len(speakers), speakers=speakers
+        )
+        self.speakers_cache = (version, res)
+        return res
+
+    def get_name_keys(self) -> List[str]:
+        """Return the (cached) name keys of all registered speakers.
+
+        Returns:
+            List[str]: name keys of all speakers
+
+        """
+        version = self.version
+        cache = self.name_keys_cache
+        if cache is None or cache[0] != version:
+            cache = (version, list({
+                schema.Name.normalize(speaker["_id"])
+                for speaker in self.collection.find({}, {"_id": 1})
+            }))
+            self.name_keys_cache = cache
+        return cache[1]
+
+    def rebuild(self, speeches: pymongo.collection.Collection) -> None:
+        """Recompute the registry from all speeches.
+
+        The registry is computed by a single aggregation pipeline on the
+        database, which replaces the collection of speakers. The speeches
+        are sorted on the index of their name, date and speech ID, so the
+        last speech of every group is the newest one. The pipeline may use
+        the disk for large collections.
+
+        Args:
+            speeches (pymongo.collection.Collection): collection of speeches
+
+        """
+        speeches.aggregate([
+            {"$sort": {
+                "meta.name_key": 1, "meta.date_key": 1, "speech_id": 1
+            }},
+            {"$group": {
+                "_id": "$meta.name", "party": {"$last": "$meta.party"},
+                "latest": {"$last": {"$concat": [
+                    "$meta.date_key", "|", "$speech_id"
+                ]}},
+                "speeches": {"$sum": 1}
+            }},
+            {"$out": self.collection.name}
+        ], allowDiskUse=True)
+        self.version += 1
+        logging.info(
+            "Rebuilt registry of %d speakers.",
+            self.collection.estimated_document_count()
+        )
+
+    def add(self, documents: List[Dict[str, Any]]) -> None:
+        """Register the speakers of inserted speeches.
+
+        The number of speeches of every speaker is increased. The party is
+        updated only if an inserted speech is newer than all registered
+        speeches of the speaker, so inserting older protocols later does not
+        replace the current party.
+
+        Args:
+            documents (List[Dict[str, Any]]): documents of inserted speeches
+
+        """
+        if not documents:
+            return
+        counts = collections.Counter(
+            document["meta"]["name"] for document in documents
+        )
+        newest = {}
+        for document in documents:
+            meta = document["meta"]
+            latest = "{}|{}".format(
+                meta.get("date_key") or schema.ProtocolContext.date_key(
+                    meta["date"]
+                ), document["speech_id"]
+            )
+            if meta["name"] not in newest \
+                    or newest[meta["name"]][0] < latest:
+                newest[meta["name"]] = (latest, meta["party"])
+        requests = []
+        for name, count in counts.items():
+            latest, party = newest[name]
+            requests.append(pymongo.UpdateOne({"_id": name}, {
+                "$inc": {"speeches": count}, "$max": {"latest": latest}
+            }, upsert=True))
+            requests.append(pymongo.UpdateOne(
+                {"_id": name, "latest": latest}, {"$set": {"party": party}}
+            ))
+        self.collection.bulk_write(requests, ordered=True)
+        self.version += 1
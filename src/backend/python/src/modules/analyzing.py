@@ -0,0 +1,94 @@
+"""Analyzer module for the deferred analysis of speeches.
+
+In the deferred mode, the updater stores the parsed speeches right away and
+tags them as pending. This module analyzes the pending speeches in the
+background and updates their analysis in the database.
+"""
+
+
+# Global imports
+import logging
+import threading
+from typing import List
+
+
+# Local imports
+import src.modules.schema as schema
+import src.modules.database as database
+import src.modules.processing as processing
+import src.modules.myexceptions as myexceptions
+
+
+class Analyzer(threading.Thread):
+    """Implementation of the analyzer thread.
+
+    The analyzer waits for the updater to store new speeches and analyzes
+    all pending speeches in batches afterwards. If the analysis of a batch
+    fails, its speeches are analyzed one by one, so a single broken speech
+    does not affect the others.
+    """
+
+    def __init__(
+            self, sem: threading.Semaphore, database_client: database.Database
+    ):
+        """Init object.
+
+        Args:
+            sem (threading.Semaphore): semaphore released by the updater
+            database_client (database.Database): database
+
+        """
+        threading.Thread.__init__(self)
+        self.sem = sem
+        self.db_client = database_client
+
+    def run(self) -> None:
+        """Infinetly analyze the speeches which are pending."""
+        while True:
+            logging.info("Analyzer requests semaphore.")
+            self.sem.acquire()
+            logging.info("Analyzer obtained semaphore.")
+            self.process_pending()
+
+    def process_pending(self) -> int:
+        """Analyze pending speeches until there are no more.
+
+        Returns:
+            int: number of analyzed speeches
+
+        """
+        total = 0
+        while True:
+            speeches = self.db_client.speech_get_pending(processing.BATCH_SIZE)
+            if not speeches:
+                break
+            total += self.__analyze(speeches)
+        if total > 0:
+            logging.info("Analyzed %d pending speeches.", total)
+        return total
+
+    def __analyze(self, speeches: List[schema.Speech]) -> int:
+        """Analyze a batch of speeches and store the results.
+
+        Args:
+            speeches (List[schema.Speech]): pending speeches
+
+        Returns:
+            int: number of speeches that have been processed
+
+        """
+        try:
+            processing.analyze_speeches(speeches)
+        except myexceptions.SpeechAnalysisException:
+            analyzed, failed = [], []
+            for speech in speeches:
+                try:
+                    processing.analyze_speeches([speech])
+                    analyzed.append(speech)
+                except myexceptions.SpeechAnalysisException:
+                    failed.append(speech)
+            logging.error("Failed analyzing %d speeches.", len(failed))
+            self.db_client.speech_update_analysis(failed, failed=True)
+            speeches = analyzed
+        self.db_client.speech_update_analysis(speeches)
+        return len(speeches)
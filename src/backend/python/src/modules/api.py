@@ -29,6 +29,8 @@ import src.modules.ods_wrapper as ods_wrapper
 DATABASE = None
 ODS_WRAPPER = None
 API_AUTHOR, API_VERSION, API_CONTACT = (None, None, None)
+# Default and maximum number of speeches of a paginated profile
+PAGE_SIZE, MAX_PAGE_SIZE = (20, 100)
 
 APP = flask.Flask(__name__, template_folder="/usr/data")
 CORS_ENABLED = CORS(APP)
@@ -59,7 +61,12 @@ def api_home() -> str:
             dict(route="/profile/{deputy}", descr=(
                 "Profile of given deputy"
                 "(pass the name as an dash seperated string, e.g. john-doe)"
-            ))
+            )),
+            dict(route="/profile/{deputy}?limit=&cursor=&fields=", descr=(
+                "Profile of given deputy with a page of speeches "
+                "(newest first, fields e.g. meta,analysis)"
+            )),
+            dict(route="/speech/{speech_id}", descr="Speech with content")
         ],
         description=(
             "This is some further description of the api."
@@ -117,7 +124,10 @@ def api_profile(name: str) -> Dict[str, Any]:
     This route retrieves the information about the given deputy. It uses the
     overview provided by the ODS to get the username for the profile page
     of abgeordnetenwatch.de. Returns the profile information and all speeches
-    of the given deputy.
+    of the given deputy, which have been analyzed successfully. If any of
+    the query parameters limit, cursor or fields (comma separated) is given,
+    only a page of the speeches is returned together with the cursor of the
+    next page.
 
     Args:
         name (str): deputy's name
@@ -138,12 +148,45 @@ def api_profile(name: str) -> Dict[str, Any]:
             break
     if profile is None:
         return flask.jsonify(None)
-    profile["profile"]["speeches"] = DATABASE.speech_get_speeches_for_name(
-        regex
-    )
+    args = flask.request.args
+    if not any(key in args for key in ["limit", "cursor", "fields"]):
+        profile["profile"]["speeches"] = \
+            DATABASE.speech_get_speeches_for_name(str(my_name))
+        return flask.jsonify(profile)
+    limit = min(max(args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    fields = args["fields"].split(",") if args.get("fields") else None
+    try:
+        page = DATABASE.speech_get_page_for_name(
+            str(my_name), limit, args.get("cursor"), fields
+        )
+    except ValueError as value_error:
+        logging.warning(str(value_error))
+        flask.abort(400)
+    profile["profile"]["speeches"] = page["speeches"]
+    profile["profile"]["speeches_cursor"] = page["cursor"]
     return flask.jsonify(profile)
 
 
+@APP.route("/speech/<speech_id>")
+def api_speech(speech_id: str) -> Dict[str, Any]:
+    """Return a single speech including its content.
+
+    Paginated profiles can omit the content of the speeches, so it is
+    requested on demand by this route. Like the speeches of profiles, a
+    speech is only returned once it has been analyzed successfully.
+
+    Args:
+        speech_id (str): ID of the speech
+
+    Returns:
+        Dict[str, Any]: speech or None if it does not exist
+
+    """
+    global DATABASE
+    logging.info("/speech/%s", speech_id)
+    return flask.jsonify(DATABASE.speech_get(speech_id))
+
+
 def start(
         api_config: Tuple[str, int, str, str, str],
         ods_config: Tuple[str, str],
@@ -0,0 +1,375 @@
+"""Caching of intermediate results.
+
+This module implements caches that allow the backend to skip expensive work
+it has already done before. The parse cache stores the speeches of a
+protocol on disk, keyed by the content of the protocol file. The sentiment
+cache stores the sentiment of a speech, keyed by the text of the speaker.
+"""
+
+
+# Python imports
+import os
+import zlib
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+import collections
+from typing import List, Iterable, Tuple, Dict, Any
+
+
+# Local imports
+import src.modules.schema as schema
+import src.modules.serialization as serialization
+
+
+class ParseCache:
+    """Content-addressed on-disk cache of parsed protocols.
+
+    Every entry is stored in a separate file whose name is the SHA-256 of the
+    protocol's bytes and the version of the parser. Entries contain the
+    speeches as compressed pickle of their json data. The total size of all
+    entries is bounded: the least recently used entries are evicted first.
+    All lookups are counted.
+    """
+
+    SUFFIX = ".speeches"
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, directory: str, max_bytes: int):
+        """Init object.
+
+        Args:
+            directory (str): directory of the cache (created if missing)
+            max_bytes (int): maximum size of all entries in bytes
+
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(data: Iterable[bytes], version: str) -> str:
+        """Return the key of a protocol.
+
+        Args:
+            data (Iterable[bytes]): content of the protocol (e.g. in chunks)
+            version (str): version of the parser
+
+        Returns:
+            str: key of the protocol
+
+        """
+        digest = hashlib.sha256()
+        for chunk in data:
+            digest.update(chunk)
+        return ParseCache.key_of_digest(digest, version)
+
+    @staticmethod
+    def key_of_digest(digest: "hashlib._Hash", version: str) -> str:
+        """Return the key of a protocol whose content is already hashed.
+
+        Args:
+            digest (hashlib._Hash): SHA-256 of the content (not modified)
+            version (str): version of the parser
+
+        Returns:
+            str: key of the protocol
+
+        """
+        digest = digest.copy()
+        digest.update(version.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_of_file(filepath: str, version: str) -> str:
+        """Return the key of a protocol file without loading it at once.
+
+        Args:
+            filepath (str): path of the protocol
+            version (str): version of the parser
+
+        Returns:
+            str: key of the protocol
+
+        """
+        with open(filepath, "rb") as protocol:
+            return ParseCache.key(
+                iter(lambda: protocol.read(ParseCache.CHUNK_SIZE), b""),
+                version
+            )
+
+    def get(self, key: str) -> List[schema.Speech]:
+        """Return the speeches stored for the given key.
+
+        A hit marks the entry as recently used.
+
+        Args:
+            key (str): key of the protocol
+
+        Returns:
+            List[schema.Speech]: speeches or None if there is no entry
+
+        """
+        documents = self.__load(key)
+        with self.lock:
+            if documents is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return [
+            serialization.speech_from_document(doc) for doc in documents
+        ]
+
+    def __load(self, key: str) -> List[Dict[str, Any]]:
+        """Return the documents stored for the given key.
+
+        Args:
+            key (str): key of the protocol
+
+        Returns:
+            List[Dict[str, Any]]: documents or None if there is no (valid)
+                entry
+
+        """
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as entry:
+                data = entry.read()
+            os.utime(path)
+            return pickle.loads(zlib.decompress(data))
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            logging.warning("Dropping corrupt cache entry %s", key)
+            self.__remove(path)
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of hits and misses.
+
+        Returns:
+            Dict[str, int]: counters of the cache
+
+        """
+        with self.lock:
+            return dict(hits=self.hits, misses=self.misses)
+
+    def put(self, key: str, speeches: List[schema.Speech]) -> None:
+        """Store the speeches of a protocol.
+
+        The entry is written atomically. Afterwards, entries are evicted
+        until the cache fits into its size limit again.
+
+        Args:
+            key (str): key of the protocol
+            speeches (List[schema.Speech]): parsed speeches
+
+        """
+        self.put_documents(key, [
+            serialization.speech_to_document(speech) for speech in speeches
+        ])
+
+    def put_documents(self, key: str, documents: List[Dict[str, Any]]) -> None:
+        """Store the speeches of a protocol given as their documents.
+
+        Args:
+            key (str): key of the protocol
+            documents (List[Dict[str, Any]]): documents of the parsed
+                speeches (see serialization.speech_to_document)
+
+        """
+        data = zlib.compress(
+            pickle.dumps(documents, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        path = self.__path(key)
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with self.lock:
+            with open(tmp_path, "wb") as entry:
+                entry.write(data)
+            os.replace(tmp_path, path)
+            self.__evict()
+
+    def __evict(self) -> None:
+        """Remove the least recently used entries exceeding the size limit."""
+        entries = []
+        for fname in os.listdir(self.directory):
+            if not fname.endswith(ParseCache.SUFFIX):
+                continue
+            path = os.path.join(self.directory, fname)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.__remove(path)
+            total -= size
+
+    def __path(self, key: str) -> str:
+        """Return the path of the entry of the given key.
+
+        Args:
+            key (str): key of the protocol
+
+        Returns:
+            str: path of the entry
+
+        """
+        return os.path.join(self.directory, key + ParseCache.SUFFIX)
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        """Remove an entry if it still exists.
+
+        Args:
+            path (str): path of the entry
+
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class SentimentCache:
+    """Cache of sentiment results keyed by the text of the speaker.
+
+    The first tier is an in-memory LRU cache of limited size. The optional
+    second tier is a sqlite database that survives restarts of the backend.
+    Results found in the database are promoted to the memory tier. All
+    lookups are counted.
+    """
+
+    def __init__(self, max_entries: int, database_file: str = None):
+        """Init object.
+
+        Args:
+            max_entries (int): maximum number of entries held in memory
+            database_file (str, optional): sqlite database of the persistent
+                tier (created if missing). Defaults to None (disabled).
+
+        """
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.database = None
+        if database_file:
+            self.database = sqlite3.connect(
+                database_file, check_same_thread=False
+            )
+            self.database.execute(
+                "CREATE TABLE IF NOT EXISTS sentiments ("
+                "key TEXT PRIMARY KEY, polarity REAL, subjectivity REAL)"
+            )
+            self.database.commit()
+
+    @staticmethod
+    def key(text: str, engine: str) -> str:
+        """Return the key of the sentiment of a text.
+
+        The text is normalized by collapsing all whitespace, which does not
+        change its sentiment.
+
+        Args:
+            text (str): text of the speaker
+            engine (str): name of the sentiment engine
+
+        Returns:
+            str: key of the sentiment
+
+        """
+        normalized = " ".join(text.split())
+        return hashlib.sha256(
+            "{}\n{}".format(engine, normalized).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Tuple[float, float]:
+        """Return the sentiment stored for the given key.
+
+        Args:
+            key (str): key of the sentiment
+
+        Returns:
+            Tuple[float, float]: (polarity, subjectivity) or None if missing
+
+        """
+        with self.lock:
+            sentiment = self.entries.get(key)
+            if sentiment is not None:
+                self.entries.move_to_end(key)
+            elif self.database is not None:
+                row = self.database.execute(
+                    "SELECT polarity, subjectivity FROM sentiments "
+                    "WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    sentiment = tuple(row)
+                    self.__remember(key, sentiment)
+            if sentiment is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return sentiment
+
+    def put_many(self, items: List[Tuple[str, Tuple[float, float]]]) -> None:
+        """Store the sentiments of multiple texts.
+
+        Args:
+            items (List[Tuple[str, Tuple[float, float]]]): pairs of key and
+                (polarity, subjectivity)
+
+        """
+        with self.lock:
+            for key, sentiment in items:
+                self.__remember(key, tuple(sentiment))
+            if self.database is not None and items:
+                self.database.executemany(
+                    "INSERT OR REPLACE INTO sentiments VALUES (?, ?, ?)",
+                    [(key, polarity, subjectivity)
+                     for key, (polarity, subjectivity) in items]
+                )
+                self.database.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of hits, misses and entries in memory.
+
+        Returns:
+            Dict[str, int]: counters of the cache
+
+        """
+        with self.lock:
+            return dict(
+                hits=self.hits, misses=self.misses, entries=len(self.entries)
+            )
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        with self.lock:
+            if self.database is not None:
+                self.database.close()
+                self.database = None
+
+    def __remember(self, key: str, sentiment: Tuple[float, float]) -> None:
+        """Store a sentiment in memory and evict the least recently used.
+
+        Args:
+            key (str): key of the sentiment
+            sentiment (Tuple[float, float]): (polarity, subjectivity)
+
+        """
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = sentiment
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
@@ -0,0 +1,345 @@
+"""Columnar content of speeches.
+
+This module implements a columnar alternative to schema.SpeechContent. It
+keeps the paragraphs of a speech in a few flat buffers instead of a tree of
+objects, which needs less memory and lets the text of the speaker be read
+without copying it.
+"""
+
+
+# Python imports
+import array
+from typing import Dict, List, Tuple, Iterable
+
+
+# Local imports
+import src.modules.schema as schema
+
+
+class ColumnarSpeechContent:  # pylint: disable=too-many-instance-attributes
+    """Columnar structure of the content of a single speech.
+
+    Alternative to SpeechContent that stores the paragraphs of a speech in
+    flat buffers instead of a tree of objects: a single UTF-8 text blob with
+    the start and end of every paragraph, an array of paragraph types and an
+    array of the first paragraph of every entry. The speech paragraphs of
+    the speaker are stored first and joined by spaces, so the text of the
+    speaker is a single slice of the blob (see get_speakers_text_view). The
+    content is immutable, so it is created from a SpeechContent or from json
+    data. The buffers are the point of the class, so it has more attributes
+    than pylint allows by default.
+    """
+
+    __slots__ = (
+        "text", "starts", "ends", "types", "entry_starts", "speakers",
+        "is_speaker", "speakers_length", "speakers_bytes"
+    )
+
+    ENCODING = "utf-8"
+
+    # Paragraph types by their code in the type array
+    TYPES = (schema.ParagraphType.SPEECH, schema.ParagraphType.COMMENT)
+    # Start of paragraphs without text (None)
+    NO_TEXT = -1
+
+    def __init__(
+            self, entries: Iterable[
+                Tuple[str, bool, Iterable[Tuple[schema.ParagraphType, str]]]
+            ]
+    ):
+        """Init object.
+
+        Args:
+            entries (Iterable[Tuple[str, bool, Iterable[Tuple[
+                schema.ParagraphType, str]]]]): (speaker, is speaker,
+                paragraphs) per entry with (type, text) per paragraph
+
+        """
+        self.speakers, self.is_speaker = [], array.array("B")
+        self.entry_starts = array.array("l")
+        paragraphs_of_speech, characters = [], 0
+        for speaker, is_speaker, paragraphs in entries:
+            self.entry_starts.append(len(paragraphs_of_speech))
+            self.speakers.append(schema.JSONSerializable.intern(speaker))
+            self.is_speaker.append(is_speaker)
+            for type_of_paragraph, text in paragraphs:
+                code = ColumnarSpeechContent.TYPES.index(
+                    schema.ParagraphType(type_of_paragraph)
+                )
+                paragraphs_of_speech.append((
+                    code,
+                    None if text is None else text.encode(
+                        ColumnarSpeechContent.ENCODING
+                    ),
+                    bool(is_speaker) and code == 0
+                ))
+                if bool(is_speaker) and code == 0:
+                    characters += len(text or "") + 1
+        self.types = array.array(
+            "B", (code for code, _, _ in paragraphs_of_speech)
+        )
+        speakers_text = b" ".join(
+            text or b"" for _, text, in_head in paragraphs_of_speech if in_head
+        )
+        self.speakers_length = max(characters - 1, 0)
+        self.speakers_bytes = len(speakers_text)
+        self.text = speakers_text + b"".join(
+            text or b"" for _, text, in_head in paragraphs_of_speech
+            if not in_head
+        )
+        self.starts, self.ends = self.__locate(paragraphs_of_speech)
+
+    def __locate(
+            self, paragraphs: List[Tuple[int, str, bool]]
+    ) -> Tuple[array.array, array.array]:
+        """Return the positions of the paragraphs in the text blob.
+
+        Args:
+            paragraphs (List[Tuple[int, bytes, bool]]): (type code, encoded
+                text, part of the speaker's text) per paragraph
+
+        Returns:
+            Tuple[array.array, array.array]: start and end (in bytes) per
+                paragraph
+
+        """
+        starts, ends = array.array("l"), array.array("l")
+        head_position, tail_position = 0, self.speakers_bytes
+        for _, text, in_head in paragraphs:
+            length = len(text or b"")
+            if in_head:
+                # Paragraphs of the speaker's text are separated by a space
+                start = head_position
+                head_position += length + 1
+            else:
+                start = tail_position
+                tail_position += length
+            if text is None:
+                starts.append(ColumnarSpeechContent.NO_TEXT)
+                ends.append(ColumnarSpeechContent.NO_TEXT)
+            else:
+                starts.append(start)
+                ends.append(start + length)
+        return starts, ends
+
+    @classmethod
+    def from_content(
+            cls, content: schema.SpeechContent
+    ) -> "ColumnarSpeechContent":
+        """Convert the content of a speech into the columnar structure.
+
+        Args:
+            content (schema.SpeechContent): content of the speech
+
+        Returns:
+            ColumnarSpeechContent: object
+
+        """
+        return cls(
+            (
+                entry.speaker, entry.is_speaker,
+                ((p.type_of_paragraph, p.text) for p in entry.paragraphs)
+            ) for entry in content.entries
+        )
+
+    @property
+    def entries(self) -> List[schema.SpeechEntry]:
+        """Return the entries of the speech as objects.
+
+        Returns:
+            List[schema.SpeechEntry]: entries of the speech (new objects)
+
+        """
+        return [
+            schema.SpeechEntry(speaker, bool(is_speaker), [
+                schema.SpeechParagraph(
+                    self.__get_type(index), self.__get_text(index)
+                )
+                for index in self.__get_paragraphs(number)
+            ])
+            for number, (speaker, is_speaker) in enumerate(
+                zip(self.speakers, self.is_speaker)
+            )
+        ]
+
+    def get_speakers_text(self) -> str:
+        """Return the text of the speaker.
+
+        Returns:
+            str: text of the speech (without questions and comments)
+
+        """
+        return str(
+            self.get_speakers_text_view(), ColumnarSpeechContent.ENCODING
+        )
+
+    def get_speakers_text_view(self) -> memoryview:
+        """Return the encoded text of the speaker without copying it.
+
+        Returns:
+            memoryview: UTF-8 encoded text of the speaker
+
+        """
+        return memoryview(self.text)[:self.speakers_bytes]
+
+    def get_speakers_text_length(self) -> int:
+        """Return the length of the text of the speaker without slicing it.
+
+        Returns:
+            int: length of the result of get_speakers_text
+
+        """
+        return self.speakers_length
+
+    def get_comments(self) -> List[str]:
+        """Return all comments during the speech.
+
+        Returns:
+            List[str]: the text of all comments during the speech
+
+        """
+        code = ColumnarSpeechContent.TYPES.index(
+            schema.ParagraphType.COMMENT
+        )
+        return [
+            self.__get_text(index) or ""
+            for index, type_code in enumerate(self.types) if type_code == code
+        ]
+
+    def get_number_of_comments(self) -> int:
+        """Return the number of comments during the speech.
+
+        Returns:
+            int: number of comments
+
+        """
+        return self.types.count(
+            ColumnarSpeechContent.TYPES.index(schema.ParagraphType.COMMENT)
+        )
+
+    def assert_valid(self) -> bool:
+        """Assert that the content contains text.
+
+        Returns:
+            bool: True if content is valid, False otherwise
+
+        """
+        if len(self.entry_starts) == 0:
+            return False
+        for number in range(len(self.entry_starts)):
+            if not self.__get_paragraphs(number):
+                return False
+        return all(end > start for start, end in zip(self.starts, self.ends))
+
+    def to_json(self) -> Dict[str, List["schema.SpeechEntry"]]:
+        """Convert object to json data.
+
+        Returns:
+            Dict[str, List["schema.SpeechEntry"]]: mapping of attributes
+                (equal to the one of SpeechContent)
+
+        """
+        return dict(entries=[
+            dict(
+                speaker=speaker, is_speaker=bool(is_speaker),
+                paragraphs=[
+                    dict(
+                        type_of_paragraph=self.__get_type(index).value,
+                        text=self.__get_text(index)
+                    ) for index in self.__get_paragraphs(number)
+                ]
+            ) for number, (speaker, is_speaker) in enumerate(
+                zip(self.speakers, self.is_speaker)
+            )
+        ])
+
+    @classmethod
+    def from_json(cls, obj) -> "ColumnarSpeechContent":
+        """Initialize object from json data of a SpeechContent.
+
+        Returns:
+            ColumnarSpeechContent: object
+
+        """
+        schema.JSONSerializable.assert_keys(["entries"], obj)
+        for entry in obj["entries"]:
+            schema.JSONSerializable.assert_keys(
+                ["speaker", "is_speaker", "paragraphs"], entry
+            )
+        return cls(
+            (
+                entry["speaker"], entry["is_speaker"], (
+                    (paragraph["type_of_paragraph"], paragraph["text"])
+                    for paragraph in entry["paragraphs"]
+                )
+            ) for entry in obj["entries"]
+        )
+
+    @classmethod
+    def speech_from_json(cls, obj: dict) -> schema.Speech:
+        """Initialize a speech with a columnar content from json data.
+
+        Columnar counterpart of Speech.from_json.
+
+        Args:
+            obj (dict): json data of the speech
+
+        Returns:
+            schema.Speech: speech whose content is a ColumnarSpeechContent
+
+        """
+        schema.Speech.assert_keys([
+            "meta", "content", "speaker_id", "speech_id"
+        ], obj)
+        return schema.Speech(
+            meta=obj["meta"],
+            content=cls.from_json(obj["content"]),
+            speaker_id=obj["speaker_id"],
+            speech_id=obj["speech_id"]
+        )
+
+    def __get_paragraphs(self, number: int) -> range:
+        """Return the indices of the paragraphs of an entry.
+
+        Args:
+            number (int): index of the entry
+
+        Returns:
+            range: indices of the paragraphs
+
+        """
+        if number + 1 < len(self.entry_starts):
+            end = self.entry_starts[number + 1]
+        else:
+            end = len(self.types)
+        return range(self.entry_starts[number], end)
+
+    def __get_type(self, index: int) -> schema.ParagraphType:
+        """Return the type of a paragraph.
+
+        Args:
+            index (int): index of the paragraph
+
+        Returns:
+            schema.ParagraphType: type of the paragraph
+
+        """
+        return ColumnarSpeechContent.TYPES[self.types[index]]
+
+    def __get_text(self, index: int) -> str:
+        """Return the text of a paragraph.
+
+        Args:
+            index (int): index of the paragraph
+
+        Returns:
+            str: text of the paragraph (None if it has no text)
+
+        """
+        start = self.starts[index]
+        if start == ColumnarSpeechContent.NO_TEXT:
+            return None
+        return str(
+            memoryview(self.text)[start:self.ends[index]],
+            ColumnarSpeechContent.ENCODING
+        )
@@ -8,6 +8,12 @@ The database 'bundestag' is used to save the data. It consists of two
 collections 'protocols' and 'speeches' that contain the protocol links and
 processed speeches in respective.
 
+The indexes of both collections are declared by the Database class and
+ensured on startup. Their version is stored in the collection 'indexes', so
+indexes which are no longer declared are dropped once after an upgrade. The
+summary of the analysis and the registry of speakers are maintained in the
+collections 'summary' and 'speakers' (see module aggregates).
+
 By convention, three different prefixes are used. The prefix 'speech'
 indicates that the method is using the collection 'speeches' whereas the
 prefix 'protocol' is used for methods that use the 'protocols' collection.
@@ -17,10 +23,12 @@ statistics and meta information.
 
 
 # Python imports
-import re
+import time
+import difflib
 import logging
+import itertools
 import threading
-from typing import List, Union, Dict, Any, Tuple
+from typing import List, Union, Dict, Any, Tuple, Iterable, Optional
 
 
 # 3rd party modules
@@ -29,27 +37,85 @@ import pymongo
 
 # Local imports
 import src.modules.schema as schema
+import src.modules.aggregates as aggregates
+import src.modules.serialization as serialization
 import src.modules.myexceptions as myexceptions
 
 
-class Database:
+class Database:  # pylint: disable=too-many-instance-attributes
     """Implementation of the database client.
 
     It uses the pymongo module inorder to communicate with the database.
+    The collections, the aggregates and the signaling events are kept as
+    attributes, so they are looked up only once.
     """
 
+    # Number of speeches sent to the database in a single bulk insert
+    INSERT_CHUNK_SIZE = 500
+    # Error code of the database for violations of a unique index
+    DUPLICATE_KEY_ERROR = 11000
+    # Version of the declared indexes (increase on every change of INDEXES)
+    INDEX_VERSION = 3
+    # Indexes of the collections given by their (ascending) fields and options
+    INDEXES = dict(
+        protocols=[
+            ("url", dict(unique=True)),
+            ("done", dict())
+        ],
+        speeches=[
+            ("speech_id", dict(unique=True)),
+            (("meta.name_key", "meta.date_key", "speech_id"), dict()),
+            ("meta.party", dict()),
+            ("meta.date", dict()),
+            ("analysis_pending", dict(sparse=True))
+        ]
+    )
+    # Top-level fields of speeches which can be projected
+    SPEECH_FIELDS = ("meta", "content", "speaker_id", "speech_id", "analysis")
+    # Speeches which are returned by queries (analyzed successfully)
+    ANALYZED = {
+        "analysis_pending": {"$exists": False},
+        "analysis_failed": {"$exists": False}
+    }
+    # Projection of the internal fields of speeches which are never returned
+    HIDDEN_FIELDS = {"_id": 0, "analysis_pending": 0, "analysis_failed": 0}
+    # Order of paginated speeches (newest first)
+    SPEECH_ORDER = [
+        ("meta.date_key", pymongo.DESCENDING),
+        ("speech_id", pymongo.DESCENDING)
+    ]
+    # Minimum similarity of name keys for the fuzzy lookup of speeches
+    FUZZY_CUTOFF = 0.8
+    # Seconds the names of the databases and collections are cached for
+    NAMES_CACHE_SECONDS = 60.0
+    # Frequent queries that must be covered by an index
+    QUERIES = dict(
+        protocol_by_url=("protocols", {"url": ""}),
+        protocol_next=("protocols", {"done": False}),
+        speech_by_id=("speeches", {"speech_id": ""}),
+        speeches_by_name=("speeches", {"meta.name_key": ""}),
+        speeches_by_party=("speeches", {"meta.party": ""}),
+        speeches_pending=("speeches", {"analysis_pending": True})
+    )
+
     def __init__(
             self, database_config: Tuple[str, int, bool, str, str],
             updater_event: threading.Semaphore,
             scraper_event: threading.Semaphore,
+            database_name: str = "bundestag"
     ):
         """Initialize an Database object.
 
+        Only the connection is established (and the database cleared if
+        configured). The maintenance on startup is done by prepare.
+
         Args:
             database_config (Tuple[str, int, bool]):
                 (host, port, clear, user, password)
             updater_event (threading.Semaphore): signaling updater thread
             scraper_event (threading.Semaphore): signaling scraper thread
+            database_name (str, optional): name of the database. Defaults
+                to 'bundestag'.
 
         Raises:
             myexceptions.DatabaseInitException: failed connection to database
@@ -63,91 +129,437 @@ class Database:
             self.client.admin.command('ismaster')
         except pymongo.errors.ConnectionFailure:
             raise myexceptions.DatabaseInitException
-        self.database = self.client["bundestag"]
+        self.database = self.client[database_name]
         self.speeches = self.database["speeches"]
         self.protocols = self.database["protocols"]
+        self.summary = aggregates.AnalysisSummary(self.database["summary"])
+        self.speakers = aggregates.SpeakerRegistry(self.database["speakers"])
         self.updater_event = updater_event
         self.scraper_event = scraper_event
+        self.names_cache = None
         if clear_db:
             self.clear()
             logging.info("Cleared database before startup")
 
+    def prepare(self) -> None:
+        """Prepare the database for the backend on startup.
+
+        The declared indexes are ensured and the keys of old speeches are
+        backfilled. The summary and the registry of speakers are rebuilt if
+        they are missing.
+        """
+        self.ensure_indexes()
+        self.meta_backfill_keys()
+        if not self.summary.exists():
+            self.summary.rebuild(self.speeches)
+        if self.speakers.collection.estimated_document_count() <= 0 \
+                < self.speeches.estimated_document_count():
+            self.speakers.rebuild(self.speeches)
+
     def __del__(self):
         """Close the client connection on deletion."""
         self.client.close()
 
     def clear(self) -> None:
-        """Clear the entire 'bundestag' database."""
-        self.client.drop_database("bundestag")
-        self.database = self.client["bundestag"]
+        """Clear the entire database."""
+        name = self.database.name
+        self.client.drop_database(name)
+        self.database = self.client[name]
         self.speeches = self.database["speeches"]
         self.protocols = self.database["protocols"]
+        self.summary = aggregates.AnalysisSummary(self.database["summary"])
+        self.speakers = aggregates.SpeakerRegistry(self.database["speakers"])
+        self.names_cache = None
+        self.ensure_indexes()
+
+    def ensure_indexes(self) -> None:
+        """Create the declared indexes of the collections if they are missing.
+
+        The unique indexes let the database reject duplicate speeches and
+        protocols, so inserts do not have to look them up first. The index of
+        pending speeches is sparse, so it only contains the speeches that
+        still wait for their analysis. If the stored version of the indexes
+        differs from INDEX_VERSION, indexes that are not declared anymore are
+        dropped. Afterwards, all queries not covered by an index are logged.
+        """
+        versions = self.database["indexes"]
+        stored = versions.find_one({"_id": "version"})
+        upgrade = stored is None or stored["version"] != Database.INDEX_VERSION
+        for collection, indexes in Database.INDEXES.items():
+            indexes = [
+                ((fields,) if isinstance(fields, str) else fields, options)
+                for fields, options in indexes
+            ]
+            names = {
+                "_1_".join(fields) + "_1" for fields, _ in indexes
+            }
+            if upgrade:
+                for name in self.database[collection].index_information():
+                    if name != "_id_" and name not in names:
+                        logging.info("Dropping index %s.%s", collection, name)
+                        self.database[collection].drop_index(name)
+            for fields, options in indexes:
+                try:
+                    self.database[collection].create_index(
+                        [(field, pymongo.ASCENDING) for field in fields],
+                        name="_1_".join(fields) + "_1", **options
+                    )
+                except pymongo.errors.OperationFailure as err:
+                    logging.error(
+                        "Failed creating index on %s.%s: %s",
+                        collection, ", ".join(fields), err
+                    )
+        if upgrade:
+            versions.replace_one(
+                {"_id": "version"}, {"version": Database.INDEX_VERSION},
+                upsert=True
+            )
+        for name in self.meta_get_unindexed_queries():
+            logging.warning("Query %s is not covered by an index.", name)
 
-    def speech_insert(self, speech: schema.Speech) -> bool:
+    def speech_insert(
+            self, speech: schema.Speech, analysis_pending: bool = False
+    ) -> bool:
         """Insert a speech into the database.
 
         This method inserts a single speech into the database. It is safe
-        to call from other modules but there is also a wrapper method to
-        insert multiple speeches at once.
+        to call from other modules but there is also a method to insert
+        multiple speeches at once in bulk.
 
         Args:
             speech (schema.Speech): speech object to insert
+            analysis_pending (bool, optional): the speech is stored before
+                its analysis (see speech_get_pending). Defaults to False.
 
         Returns:
             bool: True if speech has not been added yet, False otherwise
 
         """
-        exist = self.speeches.find({"speech_id": speech.speech_id}).count() > 0
-        if exist:
+        document = serialization.speech_to_document(speech)
+        if analysis_pending:
+            document["analysis_pending"] = True
+        try:
+            self.speeches.insert_one(document)
+        except pymongo.errors.DuplicateKeyError:
             return False
-        self.speeches.insert(speech.to_json())
+        if not analysis_pending:
+            self.summary.add([document["analysis"]])
+        self.speakers.add([document])
         return True
 
-    def speech_insert_collection(self, speeches: List[schema.Speech]) -> bool:
-        """Insert a list of speeches into the database.
+    def speech_insert_collection(
+            self, speeches: Iterable[schema.Speech],
+            analysis_pending: bool = False
+    ) -> Dict[str, int]:
+        """Insert a collection of speeches into the database.
 
-        Wrapper method for inserting multiple speeches at once into the
-        database. Internally uses 'speech_insert' to insert a single speech
-        of the given list.
+        The speeches are sent in unordered bulk inserts of INSERT_CHUNK_SIZE
+        speeches. Speeches that already exist are rejected by the unique
+        index on the speech ID and counted as duplicates, the others are
+        inserted anyway. Generators are consumed lazily, so every chunk is
+        inserted as soon as it has been produced. The analysis and the
+        speakers of every inserted chunk are added to the summary and the
+        registry of speakers at once.
 
         Args:
-            speeches (List[schema.Speech]): list of speeches
+            speeches (Iterable[schema.Speech]): list or generator of speeches
+            analysis_pending (bool, optional): the speeches are stored before
+                their analysis. Defaults to False.
 
         Returns:
-            bool: True if all speeches were added successfully, False otherwise
+            Dict[str, int]: number of inserted, duplicate and failed speeches
 
         """
-        result = [self.speech_insert(speech) for speech in speeches]
-        failed = len([ret for ret in result if not ret])
-        if failed > 0:
-            logging.warning(
-                "Failed inserting %d/%d speeches.", failed, len(result)
-            )
-            return False
-        logging.info("Inserted %d speeches successfully.", len(result))
-        return True
+        result = dict(inserted=0, duplicates=0, failed=0)
+        speeches = iter(speeches)
+        while True:
+            chunk = list(itertools.islice(
+                speeches, Database.INSERT_CHUNK_SIZE
+            ))
+            if not chunk:
+                break
+            documents = [
+                serialization.speech_to_document(speech) for speech in chunk
+            ]
+            if analysis_pending:
+                for document in documents:
+                    document["analysis_pending"] = True
+            inserted = self.__insert_many(documents, result)
+            if not analysis_pending:
+                self.summary.add([
+                    document["analysis"] for document in inserted
+                ])
+            self.speakers.add(inserted)
+        if result["failed"] > 0:
+            logging.warning("Failed inserting %d speeches.", result["failed"])
+        logging.info(
+            "Inserted %d speeches (%d duplicates).",
+            result["inserted"], result["duplicates"]
+        )
+        return result
+
+    def __insert_many(
+            self, documents: List[Dict[str, Any]], result: Dict[str, int]
+    ) -> List[Dict[str, Any]]:
+        """Insert documents of speeches in a single unordered bulk insert.
+
+        Args:
+            documents (List[Dict[str, Any]]): documents of the speeches
+            result (Dict[str, int]): counters of the insert (updated)
+
+        Returns:
+            List[Dict[str, Any]]: documents that have been inserted
+
+        """
+        inserted = documents
+        try:
+            self.speeches.insert_many(documents, ordered=False)
+        except pymongo.errors.BulkWriteError as err:
+            errors = err.details["writeErrors"]
+            duplicates = len([
+                error for error in errors
+                if error["code"] == Database.DUPLICATE_KEY_ERROR
+            ])
+            result["duplicates"] += duplicates
+            result["failed"] += len(errors) - duplicates
+            rejected = {error["index"] for error in errors}
+            inserted = [
+                document for index, document in enumerate(documents)
+                if index not in rejected
+            ]
+        result["inserted"] += len(inserted)
+        return inserted
 
     def speech_get_speeches_for_name(
-            self, name: re.Pattern, want_json: bool = True
+            self, name: str, want_json: bool = True, fuzzy: bool = True
     ) -> Union[List[schema.Speech], List[Dict[str, Any]]]:
         """Return all speeches of given deputy.
 
-        This function returns all speeches for the given deputy.
+        This function returns all speeches for the given deputy. The speeches
+        are looked up by the normalized key of the name (see
+        schema.Name.normalize) on its index. If there is no speech and the
+        fuzzy lookup is enabled, the speeches of the most similar name key of
+        all speakers are returned instead (if any is similar enough).
         The caller may specify whether he wants the data as an json or object
-        data.
+        data. Objects decode their content on first access, so callers which
+        only read meta data or analysis do not pay for decoding paragraphs.
+        Speeches whose analysis is pending or failed are skipped.
 
         Args:
-            name (re.Pattern): regex pattern for name
+            name (str): name of the deputy (in any format)
             want_json (bool, optional): json or object data. Defaults to True.
+            fuzzy (bool, optional): fall back to the most similar name.
+                Defaults to True.
 
         Returns:
             Union[List[schema.Speech], List[Dict[str, Any]]]: speeches
 
         """
-        speeches_json = self.speeches.find({"meta.name": name}, {"_id": 0})
+        key = schema.Name.normalize(name)
+        query = dict(Database.ANALYZED, **{"meta.name_key": key})
+        speeches_json = list(
+            self.speeches.find(query, Database.HIDDEN_FIELDS)
+        )
+        if not speeches_json and fuzzy:
+            similar = self.__similar_name_key(key)
+            if similar is not None:
+                query["meta.name_key"] = similar
+                speeches_json = list(
+                    self.speeches.find(query, Database.HIDDEN_FIELDS)
+                )
         if want_json:
-            return list(speeches_json)
-        return list(schema.Speech.from_json(sp) for sp in speeches_json)
+            return speeches_json
+        return list(serialization.SpeechProxy(sp) for sp in speeches_json)
+
+    def speech_get_page_for_name(
+            self, name: str, limit: int, cursor: str = None,
+            fields: List[str] = None, fuzzy: bool = True
+    ) -> Dict[str, Any]:
+        """Return a page of the speeches of given deputy.
+
+        The speeches are ordered by date and speech ID (newest first). The
+        cursor of the returned page continues with the speech after its
+        last speech, so pages stay stable while new speeches are stored.
+        The fuzzy lookup is only done for the first page. If it is used, the
+        cursor also contains the similar name key, so the following pages
+        query it directly.
+        Projecting the speeches to some of their fields (e.g. meta and
+        analysis) avoids transferring their content. The ID and the date key
+        of the speeches are always included, which the cursor requires.
+        Speeches whose analysis is pending or failed are skipped.
+
+        Args:
+            name (str): name of the deputy (in any format)
+            limit (int): maximum number of speeches of the page (at least 1)
+            cursor (str, optional): cursor of the previous page. Defaults to
+                None (first page).
+            fields (List[str], optional): fields of the speeches to return
+                (see SPEECH_FIELDS). Defaults to None (all fields).
+            fuzzy (bool, optional): fall back to the most similar name.
+                Defaults to True.
+
+        Raises:
+            ValueError: if the limit, the cursor or a field is invalid
+
+        Returns:
+            Dict[str, Any]: speeches and cursor of the next page (None if
+                this is the last page)
+
+        """
+        if limit < 1:
+            raise ValueError("Invalid limit: {}".format(limit))
+        key = schema.Name.normalize(name)
+        query = dict(Database.ANALYZED, **{"meta.name_key": key})
+        if cursor is not None:
+            date_key, sep, speech_id = cursor.partition("|")
+            speech_id, _, similar = speech_id.partition("|")
+            if not sep or not speech_id:
+                raise ValueError("Invalid cursor: {}".format(cursor))
+            if similar:
+                query["meta.name_key"] = similar
+            query["$or"] = [
+                {"meta.date_key": {"$lt": date_key}},
+                {"meta.date_key": date_key, "speech_id": {"$lt": speech_id}}
+            ]
+        projection = Database.__page_projection(fields)
+        speeches = list(self.speeches.find(query, projection).sort(
+            Database.SPEECH_ORDER
+        ).limit(limit + 1))
+        if not speeches and fuzzy and cursor is None:
+            similar = self.__similar_name_key(key)
+            if similar is not None:
+                query["meta.name_key"] = similar
+                speeches = list(self.speeches.find(query, projection).sort(
+                    Database.SPEECH_ORDER
+                ).limit(limit + 1))
+        next_cursor = None
+        if len(speeches) > limit:
+            speeches = speeches[:limit]
+            next_cursor = "{}|{}".format(
+                speeches[-1]["meta"]["date_key"], speeches[-1]["speech_id"]
+            )
+            if query["meta.name_key"] != key:
+                next_cursor += "|" + query["meta.name_key"]
+        return dict(speeches=speeches, cursor=next_cursor)
+
+    @staticmethod
+    def __page_projection(fields: List[str]) -> Dict[str, int]:
+        """Return the projection of the speeches of a page.
+
+        Args:
+            fields (List[str]): fields of the speeches to return or None
+                (all fields)
+
+        Raises:
+            ValueError: if a field is invalid
+
+        Returns:
+            Dict[str, int]: projection including the fields of the cursor and
+                excluding the hidden fields
+
+        """
+        if fields is None:
+            return dict(Database.HIDDEN_FIELDS)
+        unknown = set(fields) - set(Database.SPEECH_FIELDS)
+        if unknown:
+            raise ValueError("Unknown fields: {}".format(sorted(unknown)))
+        # Fields of an inclusive projection exclude the hidden fields
+        projection = {"_id": 0, "speech_id": 1}
+        projection.update({field: 1 for field in fields})
+        if "meta" not in fields:
+            projection["meta.date_key"] = 1
+        return projection
+
+    def speech_get(self, speech_id: str) -> Dict[str, Any]:
+        """Return a single speech including its content.
+
+        Args:
+            speech_id (str): ID of the speech
+
+        Returns:
+            Dict[str, Any]: speech or None if it does not exist or its
+                analysis is pending or failed
+
+        """
+        return self.speeches.find_one(
+            dict(Database.ANALYZED, speech_id=speech_id),
+            Database.HIDDEN_FIELDS
+        )
+
+    def __similar_name_key(self, key: str) -> Optional[str]:
+        """Return the most similar name key of all speakers.
+
+        This is the fallback of the lookup of speeches by name, which is
+        only used if there is no speech with the exact name key.
+
+        Args:
+            key (str): name key without speeches
+
+        Returns:
+            Optional[str]: most similar other name key or None if no key is
+                similar enough
+
+        """
+        matches = difflib.get_close_matches(
+            key, self.speakers.get_name_keys(), n=1,
+            cutoff=Database.FUZZY_CUTOFF
+        )
+        if matches and matches[0] != key:
+            logging.info("Using name %s for %s.", matches[0], key)
+            return matches[0]
+        return None
+
+    def speech_get_pending(self, limit: int) -> List[schema.Speech]:
+        """Return speeches that have been stored before their analysis.
+
+        Args:
+            limit (int): maximum number of speeches
+
+        Returns:
+            List[schema.Speech]: speeches waiting for their analysis
+
+        """
+        pending = self.speeches.find(
+            {"analysis_pending": True}, {"_id": 0}
+        ).limit(limit)
+        return list(serialization.speech_from_document(sp) for sp in pending)
+
+    def speech_update_analysis(
+            self, speeches: List[schema.Speech], failed: bool = False
+    ) -> int:
+        """Store the analysis of pending speeches.
+
+        Only the analysis of the speeches is updated and the speeches are no
+        longer pending. Speeches whose analysis failed are tagged as failed
+        instead, so they do not block the pending ones. Every speech is
+        updated on its own, so only the analysis of speeches which were
+        still pending is added to the summary (a replayed update does not
+        count twice).
+
+        Args:
+            speeches (List[schema.Speech]): analyzed speeches
+            failed (bool, optional): the analysis failed. Defaults to False.
+
+        Returns:
+            int: number of updated speeches
+
+        """
+        updated = []
+        for speech in speeches:
+            analysis = speech.analysis.to_json()
+            result = self.speeches.update_one({
+                "speech_id": speech.speech_id, "analysis_pending": True
+            }, {
+                "$set": {"analysis_failed": True} if failed else {
+                    "analysis": analysis
+                },
+                "$unset": {"analysis_pending": ""}
+            })
+            if result.matched_count > 0:
+                updated.append(analysis)
+        if not failed:
+            self.summary.add(updated)
+        return len(updated)
 
     def protocol_insert(self, protocol: schema.Protocol) -> bool:
         """Insert a single protocol into the database.
@@ -162,10 +574,10 @@ class Database:
             bool: True if protocol has not been added before, False otherwise
 
         """
-        exists = self.protocols.find({"url": protocol.url}).count() > 0
-        if exists:
+        try:
+            self.protocols.insert_one(protocol.to_json())
+        except pymongo.errors.DuplicateKeyError:
             return False
-        self.protocols.insert(protocol.to_json())
         logging.info("Inserted protocol %s.", protocol.fname)
         self.updater_event.release()
         return True
@@ -232,82 +644,150 @@ class Database:
         """Return general information about the database.
 
         Collects information such as database/collection names, number of
-        speeches, etc.
+        speeches, etc. All numbers are counted by the database without
+        transferring any document. The totals are taken from the metadata of
+        the collections and the done protocols are counted on their index.
+        The names of the databases and collections are cached for
+        NAMES_CACHE_SECONDS seconds.
 
         Returns:
             Dict[str, Union[int, List[str]]]: information about database
 
         """
+        database_names, collection_names = self.__get_names()
         res = {
-            "databases": [],
-            "collections": [],
-            "speeches": 0,
+            "databases": database_names,
+            "collections": collection_names,
+            "speeches": self.speeches.estimated_document_count(),
             "protocols": {
-                "done": 0,
+                "done": self.protocols.count_documents({"done": True}),
                 "in_progress": 0,
-                "total": 0
+                "total": self.protocols.estimated_document_count()
             }
         }
-        res["databases"] = list(self.client.list_database_names())
-        res["collections"] = list(self.database.collection_names())
-        res["speeches"] = len(list(self.speeches.find()))
-        res["protocols"]["total"] = len(list(self.protocols.find()))
-        res["protocols"]["done"] = len(
-            list(self.protocols.find({"done": True}))
-        )
         res["protocols"]["in_progress"] = res["protocols"]["total"] \
             - res["protocols"]["done"]
         return res
 
-    def meta_get_all_speakers(self) -> Dict[str, Union[List[str], int]]:
+    def __get_names(self) -> Tuple[List[str], List[str]]:
+        """Return the (cached) names of the databases and collections.
+
+        Returns:
+            Tuple[List[str], List[str]]: names of databases and collections
+
+        """
+        now = time.monotonic()
+        cache = self.names_cache
+        if cache is None or now - cache[0] > Database.NAMES_CACHE_SECONDS:
+            cache = (
+                now, list(self.client.list_database_names()),
+                list(self.database.list_collection_names())
+            )
+            self.names_cache = cache
+        return list(cache[1]), list(cache[2])
+
+    def meta_get_unindexed_queries(self) -> List[str]:
+        """Return the frequent queries which are not covered by an index.
+
+        Every query of QUERIES is explained by the database. A query is not
+        covered if its winning plan scans the whole collection.
+
+        Returns:
+            List[str]: names of the queries scanning a whole collection
+
+        """
+        return [
+            name for name, (collection, query) in Database.QUERIES.items()
+            if Database.__uses_collection_scan(
+                self.database[collection].find(query).explain()[
+                    "queryPlanner"
+                ]["winningPlan"]
+            )
+        ]
+
+    @staticmethod
+    def __uses_collection_scan(plan: Any) -> bool:
+        """Check if a query plan (or one of its stages) is a collection scan.
+
+        Args:
+            plan (Any): (part of) the winning plan of an explained query
+
+        Returns:
+            bool: True if the plan contains a collection scan, else False
+
+        """
+        if isinstance(plan, dict):
+            if plan.get("stage") == "COLLSCAN":
+                return True
+            return any(
+                Database.__uses_collection_scan(value)
+                for value in plan.values()
+            )
+        if isinstance(plan, list):
+            return any(
+                Database.__uses_collection_scan(value) for value in plan
+            )
+        return False
+
+    def meta_get_all_speakers(self) -> Dict[str, Any]:
         """Return the names of all speakers who are present in the database.
 
+        The speakers are read from the registry of speakers. The result is
+        cached until speeches are inserted again.
+
+        Returns:
+            Dict[str, Any]: names of deputies, their number and every
+                speaker with party and number of speeches
+
+        """
+        return self.speakers.get_all()
+
+    def meta_backfill_keys(self) -> int:
+        """Store the name and date key of speeches stored without them.
+
         Returns:
-            Dict[str, Union[List[str], int]]: names of deputies
+            int: number of updated speeches
 
         """
-        speakers = list(set(
-            x["meta"]["name"]
-            for x in self.speeches.find({}, {"_id": 0, "meta": 1})
-        ))
-        return dict(names=speakers, total=len(speakers))
+        missing = self.speeches.find({"$or": [
+            {"meta.name_key": {"$exists": False}},
+            {"meta.date_key": {"$exists": False}}
+        ]}, {"meta.name": 1, "meta.date": 1})
+        updated = 0
+        while True:
+            chunk = list(itertools.islice(missing, Database.INSERT_CHUNK_SIZE))
+            if not chunk:
+                break
+            updated += self.speeches.bulk_write([
+                pymongo.UpdateOne({"_id": document["_id"]}, {"$set": {
+                    "meta.name_key": schema.Name.normalize(
+                        document["meta"]["name"]
+                    ),
+                    "meta.date_key": schema.ProtocolContext.date_key(
+                        document["meta"]["date"]
+                    )
+                }}) for document in chunk
+            ], ordered=False).modified_count
+        if updated > 0:
+            logging.info("Stored keys of %d speeches.", updated)
+        return updated
 
     def meta_get_analysis_limits(self) -> Dict[str, Any]:
         """Return the limits of the analysis of all speeches in the database.
 
         The limits can be useful for classifying a single speech as rather
-        negative/positive or subjective/objective.
+        negative/positive or subjective/objective. Speeches whose analysis is
+        pending or failed are ignored. Besides the limits, the mean and (for
+        polarity and subjectivity) a histogram are returned. All values are
+        read from the summary (see aggregates.AnalysisSummary).
+        The total is the number of all speeches, the number of analyzed
+        speeches is returned separately.
 
         Returns:
             Dict[str, Any]: description and its corresponding values
 
         """
-        speeches = list(self.speeches.find({}, {"_id": 0}))
-        if len(speeches) <= 0:
+        limits = self.summary.get_limits()
+        if limits is None:
             return None
-        polarity = [
-            speech["analysis"]["polarity"] for speech in speeches
-        ]
-        subjectivity = [
-            speech["analysis"]["subjectivity"] for speech in speeches
-        ]
-        comment = [
-            speech["analysis"]["number_of_comments"] for speech in speeches
-        ]
-        polarity_limits = dict(
-            desc="-1.0 (negative) ; 1.0 (positive)",
-            min=min(polarity), max=max(polarity))
-        subjectivity_limits = dict(
-            desc="0.0 (objective) ; 1.0 (subjective)",
-            min=min(subjectivity), max=max(subjectivity)
-        )
-        comment_limits = dict(
-            desc="Number of comments during a speech",
-            min=min(comment), max=max(comment)
-        )
-        return dict(
-            total=len(speeches),
-            polarity=polarity_limits,
-            subjectivity=subjectivity_limits,
-            number=comment_limits
-        )
+        return dict(total=self.speeches.estimated_document_count(), **limits)
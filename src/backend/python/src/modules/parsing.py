@@ -7,9 +7,10 @@ coverts the content to predefined objects.
 
 
 # Python imports
+import io
 import os
 import logging
-from typing import List, Tuple
+from typing import List, Tuple, Iterator, Union, BinaryIO, Dict
 
 
 # 3rd party modules
@@ -18,17 +19,103 @@ import lxml.etree
 
 # Local imports
 import src.modules.schema as schema
+import src.modules.caching as caching
+import src.modules.serialization as serialization
 import src.modules.myexceptions as myexceptions
 
 
-def get_speeches(filepath: str, dtd_file: str) -> List[schema.Speech]:
-    """Parse the given file according to the given DTD.
+# Protocols are given by their filepath, their content or a file-like object
+ProtocolSource = Union[str, bytes, BinaryIO]
+# Version of the parser's output. Increase it whenever a change of this module
+# changes the parsed speeches, so that cached results are invalidated.
+PARSER_VERSION = "3"
+# Cache of parsed protocols (see configure_cache)
+__PARSE_CACHE = None
+# Document type definitions that have already been loaded (see __get_dtd)
+__DTD_CACHE = {}
+# Registry of all queries on a protocol. The expressions are compiled once
+# on import. Positional predicates select the first match in document order
+# like 'find' does, so the evaluation stops early.
+__XPATH = {
+    name: lxml.etree.XPath(path, smart_strings=False)
+    for name, path in dict(
+        # Relative to the root element
+        speeches="descendant::tagesordnungspunkt/rede",
+        date="(descendant::veranstaltungsdaten/datum)[1]",
+        toc_speakers="descendant::ivz-block//redner",
+        # Relative to a speaker in the table of contents
+        toc_topic="(../../../ivz-eintrag/ivz-eintrag-inhalt)[1]",
+        # Relative to a speech
+        speech_speaker="descendant::redner[1]",
+        # Relative to the speaker of a speech
+        speaker_firstname="(name/vorname)[1]",
+        speaker_lastname="(name/nachname)[1]",
+        speaker_party="(name/fraktion)[1]",
+        speaker_role="(name/rolle/rolle_kurz)[1]",
+        # Relative to a speaker paragraph within a speech
+        entry_firstname="(descendant::redner/name/vorname)[1]",
+        entry_lastname="(descendant::redner/name/nachname)[1]",
+        entry_party="(descendant::redner/name/fraktion)[1]"
+    ).items()
+}
+
+
+def get_speeches(source: ProtocolSource, dtd_file: str) -> List[schema.Speech]:
+    """Parse the given protocol according to the given DTD.
+
+    Parses the protocol and returns the single speeches. This is the main
+    entry point of this module.
+
+    The protocol is either given by its filepath or by its content, as bytes
+    or binary file-like object (e.g. a downloaded response). The latter
+    allows to parse protocols without storing them on disk first.
+    The protocol is parsed only once. The resulting tree is used for both
+    the validation and the extraction of the speeches. The document type
+    definition is loaded once per process and reused for all protocols.
+    If a parse cache is configured, protocols that have been parsed before
+    are not parsed again.
+
+    Args:
+        source (ProtocolSource): filepath, bytes or file-like object
+        dtd_file (str): document type definition
+
+    Raises:
+        FileNotFoundError: if the given filepath is no protocol file
+        SpeechParsingException: if parsing the speeches fail in any kind
+
+    Returns:
+        List[schema.Speech]: list of speech elements of the protocol
+
+    """
+    name = __get_protocol_name(source)
+    if isinstance(source, str) or source is None:
+        __assert_protocol_file(source)
+    elif not isinstance(source, bytes):
+        source = source.read()
+    cache = __PARSE_CACHE
+    if cache is None:
+        return __parse_protocol(source, dtd_file, name)
+    if isinstance(source, str):
+        # Read the file once for both the key and the parser
+        with open(source, "rb") as protocol:
+            source = protocol.read()
+    key = cache.key([source], PARSER_VERSION)
+    speeches = cache.get(key)
+    if speeches is None:
+        speeches = __parse_protocol(source, dtd_file, name)
+        cache.put(key, speeches)
+    return speeches
 
-    Parses the protocol and returns the single speeches. This is the only
-    function in this module that is safe to be called from outside.
+
+def __parse_protocol(
+        source: Union[str, bytes], dtd_file: str, name: str
+) -> List[schema.Speech]:
+    """Parse the given protocol as a whole and return its speeches.
 
     Args:
-        filepath (str): absolute filepath of the protocol
+        source (Union[str, bytes]): filepath or content of the protocol
+        dtd_file (str): document type definition
+        name (str): name of the protocol (used for logging)
 
     Raises:
         SpeechParsingException: if parsing the speeches fail in any kind
@@ -37,35 +124,230 @@ def get_speeches(filepath: str, dtd_file: str) -> List[schema.Speech]:
         List[schema.Speech]: list of speech elements of the protocol
 
     """
-    if filepath is None or filepath == "" or not __check_protocol(filepath):
-        raise FileNotFoundError("Invalid filepath '{}'".format(filepath))
-    if not __validate_protocol(filepath, dtd_file):
-        logging.error("Failed validating %s", filepath)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        tree = lxml.etree.parse(source)
+    except lxml.etree.XMLSyntaxError as exception:
+        logging.error("Failed parsing %s", name)
+        raise myexceptions.SpeechParsingException from exception
+    if not __validate_protocol(tree, dtd_file):
+        logging.error("Failed validating %s", name)
         raise myexceptions.SpeechParsingException
     try:
-        tree = lxml.etree.parse(filepath)
         root = tree.getroot()
+        context = __get_protocol_context(root)
         speeches = []
-        for speech_elem in root.findall(".//tagesordnungspunkt/rede"):
-            speech = __parse_speech(root, speech_elem)
-            if speech is None:
-                logging.warning(
-                    "Skipping speech in %s. Invalid content", filepath
-                )
-            else:
-                if speech.assert_is_relevant():
-                    speeches.append(speech)
+        for speech_elem in __XPATH["speeches"](root):
+            speech = __extract_speech(context, speech_elem, name)
+            if speech is not None:
+                speeches.append(speech)
     except Exception as exception:
         raise myexceptions.SpeechParsingException from exception
     return speeches
 
 
+def iter_speeches(
+        source: ProtocolSource, dtd_file: str
+) -> Iterator[schema.Speech]:
+    """Parse the given protocol incrementally and yield its speeches.
+
+    Streaming variant of 'get_speeches'. The protocol is read with
+    'lxml.etree.iterparse' and every speech is yielded as soon as its
+    element is closed. The preamble, which precedes all speeches, is turned
+    into the protocol context. Elements that have been processed are cleared
+    afterwards, so the memory consumption does not grow with the size of the
+    protocol. A file-like object is consumed while the speeches are
+    iterated, so a download can be parsed without being buffered. The
+    document type definition can only be applied to complete elements in
+    this mode. Therefore, the preamble and every single speech element are
+    validated instead of the whole document. If a parse cache is configured,
+    cached speeches of a filepath or bytes are returned without parsing and
+    the speeches of such a protocol are stored once it is read completely.
+    File-like objects bypass the cache: their key is known only at their
+    end, so an entry of them could never be looked up.
+
+    Args:
+        source (ProtocolSource): filepath, bytes or file-like object
+        dtd_file (str): document type definition
+
+    Raises:
+        FileNotFoundError: if the given filepath is no protocol file
+        SpeechParsingException: if parsing the speeches fail in any kind
+
+    Returns:
+        Iterator[schema.Speech]: relevant speeches in document order
+
+    """
+    name = __get_protocol_name(source)
+    if isinstance(source, str) or source is None:
+        __assert_protocol_file(source)
+    dtd = __get_dtd(dtd_file)
+    cache = __PARSE_CACHE
+    if isinstance(source, bytes):
+        key = None if cache is None else cache.key([source], PARSER_VERSION)
+        source = io.BytesIO(source)
+    elif isinstance(source, str):
+        key = None if cache is None else cache.key_of_file(
+            source, PARSER_VERSION
+        )
+    else:
+        return __stream_speeches(source, dtd, name)
+    if cache is None:
+        return __stream_speeches(source, dtd, name)
+    speeches = cache.get(key)
+    if speeches is not None:
+        return iter(speeches)
+    return __cache_stream(__stream_speeches(source, dtd, name), cache, key)
+
+
+def configure_cache(directory: str, max_bytes: int) -> None:
+    """Enable the cache of parsed protocols for this process.
+
+    Args:
+        directory (str): directory of the cache or None to disable it
+        max_bytes (int): maximum size of the cache in bytes
+
+    """
+    global __PARSE_CACHE  # pylint: disable=global-statement
+    if directory:
+        __PARSE_CACHE = caching.ParseCache(directory, max_bytes)
+        logging.info("Caching parsed protocols in %s", directory)
+    else:
+        __PARSE_CACHE = None
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return the counters of the parse cache.
+
+    Returns:
+        Dict[str, int]: hits and misses (empty if the cache is disabled)
+
+    """
+    if __PARSE_CACHE is None:
+        return dict()
+    return __PARSE_CACHE.stats()
+
+
+def __cache_stream(
+        speeches: Iterator[schema.Speech], cache: caching.ParseCache,
+        key: str
+) -> Iterator[schema.Speech]:
+    """Pass streamed speeches through and cache them at the end.
+
+    Every speech is converted into its document before it is yielded, so
+    changes of the caller (e.g. the analysis) do not reach the cache. The
+    speeches are stored only if the protocol was parsed completely.
+
+    Args:
+        speeches (Iterator[schema.Speech]): streamed speeches
+        cache (caching.ParseCache): parse cache
+        key (str): key of the parsed protocol
+
+    Yields:
+        schema.Speech: streamed speech
+
+    """
+    documents = []
+    for speech in speeches:
+        documents.append(serialization.speech_to_document(speech))
+        yield speech
+    cache.put_documents(key, documents)
+
+
+def __stream_speeches(
+        source: Union[str, BinaryIO], dtd: lxml.etree.DTD, name: str
+) -> Iterator[schema.Speech]:
+    """Yield the speeches of a protocol while it is parsed incrementally.
+
+    Args:
+        source (Union[str, BinaryIO]): filepath or file-like object
+        dtd (lxml.etree.DTD): document type definition
+        name (str): name of the protocol (used for logging)
+
+    Raises:
+        SpeechParsingException: if parsing the speeches fail in any kind
+
+    Yields:
+        schema.Speech: relevant speeches of the protocol in document order
+
+    """
+    events = lxml.etree.iterparse(
+        source, events=("end",),
+        tag=("vorspann", "tagesordnungspunkt", "rede")
+    )
+    context = None
+    try:
+        for _, elem in events:
+            if elem.tag == "tagesordnungspunkt":
+                __release_element(elem)
+                continue
+            if not dtd.validate(elem):
+                logging.error("Failed validating %s", name)
+                raise myexceptions.SpeechParsingException
+            if elem.tag == "vorspann":
+                # The preamble precedes all speeches and is not required
+                # anymore once the context is built
+                context = __get_protocol_context(elem.getparent())
+                elem.clear()
+            elif elem.getparent().tag == "tagesordnungspunkt":
+                speech = __extract_speech(context, elem, name)
+                elem.clear()
+                if speech is not None:
+                    yield speech
+    except myexceptions.SpeechParsingException:
+        raise
+    except Exception as exception:
+        raise myexceptions.SpeechParsingException from exception
+
+
+def __release_element(elem: lxml.etree.ElementBase) -> None:
+    """Free the memory of an element that has been processed completely.
+
+    The element is cleared and all of its preceding siblings are removed
+    from the tree.
+
+    Args:
+        elem (lxml.etree.ElementBase): processed element
+
+    """
+    elem.clear()
+    parent = elem.getparent()
+    while elem.getprevious() is not None:
+        del parent[0]
+
+
+def __extract_speech(
+        context: schema.ProtocolContext,
+        speech_elem: lxml.etree.ElementBase, name: str
+) -> schema.Speech:
+    """Parse a single speech and filter it by its relevance.
+
+    Args:
+        context (schema.ProtocolContext): context of the protocol
+        speech_elem (lxml.etree.ElementBase): speech element to parse
+        name (str): name of the protocol (used for logging)
+
+    Returns:
+        schema.Speech: parsed speech or None if it is invalid or irrelevant
+
+    """
+    speech = __parse_speech(context, speech_elem)
+    if speech is None:
+        logging.warning("Skipping speech in %s. Invalid content", name)
+        return None
+    if not speech.assert_is_relevant():
+        return None
+    return speech
+
+
 def __parse_speech(
-        root: lxml.etree.ElementBase, speech: lxml.etree.ElementBase
+        context: schema.ProtocolContext, speech: lxml.etree.ElementBase
 ) -> schema.Speech:
     """Parse a single speech given as a tree element.
 
     Args:
+        context (schema.ProtocolContext): context of the protocol
         speech (lxml.etree.ElementBase): speech element to parse
 
     Returns:
@@ -73,13 +355,15 @@ def __parse_speech(
 
     """
     speech_id, speaker_id, name, party = __get_speech_meta(speech)
-    topic = __get_speech_topic(root, speaker_id)
-    date = __get_speech_date(root)
+    topic = context.get_topic(speaker_id)
+    date = context.date
     content = __get_speech_contents(speech)
     if not content.assert_valid():
         return None
     meta = dict(
-        name=name, party=party, topic=topic, date=date
+        name=name, party=party, topic=topic, date=date,
+        name_key=schema.Name.normalize(name),
+        date_key=schema.ProtocolContext.date_key(date)
     )
     return schema.Speech(
         meta, content, speaker_id, speech_id
@@ -100,53 +384,96 @@ def __get_speech_meta(
         Tuple[str, str, str, str]: (ID(speech), ID(speaker), name, party)
 
     """
-    speaker = speech.find(".//redner")
+    speaker = __find("speech_speaker", speech)
     speech_id = speech.attrib["id"]
     speaker_id = speaker.attrib["id"]
     try:
-        firstname = speaker.find("./name/vorname").text
+        firstname = __find("speaker_firstname", speaker).text
     except AttributeError:
         firstname = "n.a"
     try:
-        lastname = speaker.find("./name/nachname").text
+        lastname = __find("speaker_lastname", speaker).text
     except AttributeError:
         lastname = "n.a"
     name = "{} {}".format(firstname, lastname)
     try:
-        party = speaker.find("./name/fraktion").text
+        party = __find("speaker_party", speaker).text
     except AttributeError:
-        party = speaker.find("./name/rolle/rolle_kurz").text
+        party = __find("speaker_role", speaker).text
     return (speech_id, speaker_id, name, party)
 
 
-def __get_speech_topic(root: lxml.etree.ElementBase, speaker_id: str) -> str:
-    """Return the topic of the speaker's speech.
+def __get_protocol_context(
+        root: lxml.etree.ElementBase
+) -> schema.ProtocolContext:
+    """Return the context that is shared by all speeches of the protocol.
+
+    The table of contents is traversed once in order to map every speaker
+    to the topic of the agenda item he is listed in. The first listing of a
+    speaker determines his topic.
+
+    Args:
+        root (lxml.etree.ElementBase): root element of xml tree
+
+    Returns:
+        schema.ProtocolContext: context of the protocol
+
+    """
+    topics = {}
+    for speaker in __XPATH["toc_speakers"](root):
+        speaker_id = speaker.get("id")
+        if speaker_id in topics:
+            continue
+        topic = __get_speech_topic(speaker)
+        if topic is not None:
+            topics[speaker_id] = __get_topic_text(topic)
+    session = dict(
+        period=root.get("wahlperiode"), number=root.get("sitzung-nr")
+    )
+    return schema.ProtocolContext(
+        __get_speech_date(root), session, topics
+    )
+
+
+def __get_speech_topic(
+        speaker: lxml.etree.ElementBase
+) -> lxml.etree.ElementBase:
+    """Return the topic element of the agenda item a speaker is listed in.
 
     The layout of the topic's description is not defined so the result may not
     always be satisfying.
 
     Args:
-        root (lxml.etree.ElementBase): root element of xml tree
-        speaker_id (str): unique ID of desired speaker
+        speaker (lxml.etree.ElementBase): speaker in the table of contents
+
+    Returns:
+        lxml.etree.ElementBase: topic element or None if there is none
+
+    """
+    return __find("toc_topic", speaker)
+
+
+def __get_topic_text(topic: lxml.etree.ElementBase) -> str:
+    """Return the description of an agenda item.
+
+    Args:
+        topic (lxml.etree.ElementBase): topic element
 
     Returns:
-        str: topic of the agenda item the speech is related to
+        str: topic of the agenda item
 
     """
-    topic = root.find(".//ivz-block//redner[@id = '{}']/../../../{}/{}".format(
-        speaker_id, "ivz-eintrag", "ivz-eintrag-inhalt"
-    ))
     try:
         text = topic.text.split(":")[1].strip()
     except IndexError:
         text = topic.text
     except AttributeError:
-        text = "None"
+        text = schema.ProtocolContext.TOPIC_UNKNOWN
     return text
 
 
 def __get_speech_date(root: lxml.etree.ElementBase) -> str:
-    """Return the date the speech was held.
+    """Return the date the speeches of the protocol were held.
 
     Args:
         root (lxml.etree.ElementBase): root element
@@ -155,9 +482,7 @@ def __get_speech_date(root: lxml.etree.ElementBase) -> str:
         str: date
 
     """
-    return root.find(
-        ".//veranstaltungsdaten/datum"
-    ).attrib["date"]
+    return __find("date", root).attrib["date"]
 
 
 def __get_speech_contents(
@@ -169,63 +494,119 @@ def __get_speech_contents(
     content which requires to collect subsequent paragraphs of one speaker and
     seperate them from the paragraphs of the other speakers.
 
+    The children of the speech are traversed exactly once. Every name or
+    speaker paragraph starts a new entry and the previous entry is emitted
+    as soon as it is complete.
+
     Args:
         speech (lxml.etree.ElementBase): speech to parse
 
+    Raises:
+        SpeechParsingException: if the speech does not name any speaker
+
     Returns:
         schema.SpeechContent: the sequential content of the speech
 
     """
     speech_content = schema.SpeechContent([])
-    name_flow = [
-        schema.SpeechIndex(speech.index(e), e.text.replace(":", ""))
-        for e in speech if e.tag == "name"
-    ]
-    redner_flow = [
-        schema.SpeechIndex(speech.index(e), "{} {} ({})".format(
-            e.find(".//redner/name/vorname").text
-            if e.find(".//redner/name/vorname") is not None else "n.a",
-            e.find(".//redner/name/nachname").text
-            if e.find(".//redner/name/nachname") is not None else "n.a",
-            e.find(".//redner/name/fraktion").text
-            if e.find(".//redner/name/fraktion") is not None else ""
-        ))
-        for e in speech
-        if e.tag == "p" and "klasse" in e.attrib.keys()
-        and e.attrib["klasse"] == "redner"
-    ]
-    speech_flow = sorted(name_flow + redner_flow, key=lambda x: x.index)
-    speaker = speech_flow[0]
-    for counter, curr_speech_index in enumerate(speech_flow):
-        try:
-            speech_index_start = curr_speech_index
-            speech_index_end = speech_flow[counter+1].index
-        except IndexError:
-            speech_index_end = len(speech)
-        is_speaker = (speech_index_start.name == speaker.name)
-        paragraphs = speech[(speech_index_start.index+1):speech_index_end]
-        speech_entry = schema.SpeechEntry(
-            speech_index_start.name, is_speaker, []
-        )
-        for para in paragraphs:
-            if para.text is None:
-                continue
-            if para.tag == "kommentar":
-                speech_paragraph = schema.SpeechParagraph(
-                    schema.SpeechParagraph.TYPE_COMMENT,
-                    para.text.replace("(", "").replace(")", "")
-                )
-            if para.tag == "p" and para.attrib != "redner":
-                speech_paragraph = schema.SpeechParagraph(
-                    schema.SpeechParagraph.TYPE_SPEECH,
-                    para.text
-                )
-            speech_entry.add_paragraph(speech_paragraph)
-        if len(speech_entry.paragraphs) != 0:
-            speech_content.add_speech_entry(speech_entry)
+    speaker, speech_entry, speech_paragraph = None, None, None
+    for elem in speech:
+        name = __get_entry_speaker(elem)
+        if name is not None:
+            if speech_entry is not None and speech_entry.paragraphs:
+                speech_content.add_speech_entry(speech_entry)
+            if speaker is None:
+                speaker = name
+            speech_entry = schema.SpeechEntry(name, name == speaker, [])
+            continue
+        if speech_entry is None or elem.text is None:
+            continue
+        speech_paragraph = __get_paragraph(elem, speech_paragraph)
+        speech_entry.add_paragraph(speech_paragraph)
+    if speaker is None:
+        raise myexceptions.SpeechParsingException("Speech without speaker")
+    if speech_entry.paragraphs:
+        speech_content.add_speech_entry(speech_entry)
     return speech_content
 
 
+def __get_paragraph(
+        elem: lxml.etree.ElementBase,
+        previous: schema.SpeechParagraph
+) -> schema.SpeechParagraph:
+    """Return the paragraph of a speech represented by the given element.
+
+    Elements that are neither paragraphs nor comments (e.g. quotes) repeat
+    the previous paragraph of the speech.
+
+    Args:
+        elem (lxml.etree.ElementBase): child element of a speech
+        previous (schema.SpeechParagraph): previous paragraph of the speech
+
+    Raises:
+        SpeechParsingException: if there is no previous paragraph to repeat
+
+    Returns:
+        schema.SpeechParagraph: paragraph
+
+    """
+    if elem.tag == "kommentar":
+        return schema.SpeechParagraph(
+            schema.SpeechParagraph.TYPE_COMMENT,
+            elem.text.replace("(", "").replace(")", "")
+        )
+    if elem.tag == "p":
+        return schema.SpeechParagraph(
+            schema.SpeechParagraph.TYPE_SPEECH, elem.text
+        )
+    if previous is None:
+        raise myexceptions.SpeechParsingException(
+            "Unexpected element '{}' in speech".format(elem.tag)
+        )
+    return previous
+
+
+def __get_entry_speaker(elem: lxml.etree.ElementBase) -> str:
+    """Return the deputy that starts a new entry with the given element.
+
+    Args:
+        elem (lxml.etree.ElementBase): child element of a speech
+
+    Returns:
+        str: deputy's name or None if the element does not start an entry
+
+    """
+    if elem.tag == "name":
+        return elem.text.replace(":", "")
+    if elem.tag != "p" or elem.get("klasse") != "redner":
+        return None
+    firstname = __find("entry_firstname", elem)
+    lastname = __find("entry_lastname", elem)
+    party = __find("entry_party", elem)
+    return "{} {} ({})".format(
+        firstname.text if firstname is not None else "n.a",
+        lastname.text if lastname is not None else "n.a",
+        party.text if party is not None else ""
+    )
+
+
+def __find(
+        query: str, elem: lxml.etree.ElementBase
+) -> lxml.etree.ElementBase:
+    """Evaluate a registered query and return its first result.
+
+    Args:
+        query (str): name of the query in the registry
+        elem (lxml.etree.ElementBase): context element of the query
+
+    Returns:
+        lxml.etree.ElementBase: first matching element or None
+
+    """
+    result = __XPATH[query](elem)
+    return result[0] if result else None
+
+
 def __check_protocol(filepath: str) -> bool:
     """Check the existence and validity of the given protocol.
 
@@ -241,16 +622,75 @@ def __check_protocol(filepath: str) -> bool:
     return os.path.exists(filepath) and os.path.isfile(filepath)
 
 
-def __validate_protocol(filepath: str, dtd_file: str) -> bool:
+def __assert_protocol_file(filepath: str) -> None:
+    """Assert that the given filepath refers to a protocol file.
+
+    Args:
+        filepath (str): path of the .xml file
+
+    Raises:
+        FileNotFoundError: if the path is empty or no file
+
+    """
+    if filepath is None or filepath == "" or not __check_protocol(filepath):
+        raise FileNotFoundError("Invalid filepath '{}'".format(filepath))
+
+
+def __get_protocol_name(source: ProtocolSource) -> str:
+    """Return a name of the given protocol that can be used for logging.
+
+    Args:
+        source (ProtocolSource): filepath, bytes or file-like object
+
+    Returns:
+        str: filepath, name of the file-like object or placeholder
+
+    """
+    if isinstance(source, str):
+        return source
+    return str(getattr(source, "name", "<protocol in memory>"))
+
+
+def __get_dtd(dtd_file: str) -> lxml.etree.DTD:
+    """Return the document type definition of the given file.
+
+    The definition is loaded on the first request and cached afterwards, so
+    every protocol that is parsed by this process shares the same object.
+
+    Args:
+        dtd_file (str): path of the .dtd file
+
+    Returns:
+        lxml.etree.DTD: document type definition
+
+    """
+    key = os.path.abspath(dtd_file)
+    dtd = __DTD_CACHE.get(key)
+    if dtd is None:
+        dtd = lxml.etree.DTD(dtd_file)
+        __DTD_CACHE[key] = dtd
+    return dtd
+
+
+def clear_dtd_cache() -> None:
+    """Drop all cached document type definitions.
+
+    The next call of 'get_speeches' loads the definition from disk again.
+    """
+    __DTD_CACHE.clear()
+
+
+def __validate_protocol(
+        tree: lxml.etree.ElementTree, dtd_file: str
+) -> bool:
     """Check if the given protocol matches the document type definition.
 
     Args:
-        filename (str): absolute path of the .xml file
+        tree (lxml.etree.ElementTree): parsed protocol
+        dtd_file (str): path of the .dtd file
 
     Returns:
         bool: True if it matches, False otherwise
 
     """
-    dtd = lxml.etree.DTD(dtd_file)
-    tree = lxml.etree.parse(filepath)
-    return dtd.validate(tree)
+    return __get_dtd(dtd_file).validate(tree)
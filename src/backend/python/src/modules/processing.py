@@ -1,24 +1,150 @@
 """Processing of the speeches.
 
-This module is used to post-process a speech. The current implementation
-uses textblob to calculate the sentiment of the content.
+This module is used to post-process a speech. The sentiment of the content is
+calculated by a sentiment engine (see module sentiment). By default, textblob
+is used. The sentiment can be calculated by a pool of worker processes (see
+configure_workers), which keeps all cores of the host busy. Results are
+memoized by the text of the speaker (see configure_sentiment_cache), so a
+speech that has been analyzed before is not analyzed again.
 """
 
 
 # Python imports
 import logging
-from typing import List, Tuple
-
-
-# 3rd party modules
-from textblob_de import TextBlobDE as TextBlob
+import collections
+import multiprocessing
+from typing import List, Tuple, Iterable, Iterator, Callable, Dict
 
 
 # Local imports
 import src.modules.schema as schema
+import src.modules.caching as caching
+import src.modules.sentiment as sentiment
 import src.modules.myexceptions as myexceptions
 
 
+# Number of speeches whose sentiment is calculated at once
+BATCH_SIZE = 64
+# Number of speeches that are sent to a worker at once
+WORKER_BATCH_SIZE = 8
+# Number of sentiments held in memory by default
+SENTIMENT_CACHE_SIZE = 10000
+# Sentiment engine of this process (see configure_engine)
+__ENGINE = sentiment.TextBlobEngine()
+# Pool of worker processes and its size (see configure_workers)
+__POOL = None
+__WORKERS = 0
+# Memoized sentiments (see configure_sentiment_cache)
+__SENTIMENT_CACHE = caching.SentimentCache(SENTIMENT_CACHE_SIZE)
+
+
+def configure_engine(name: str) -> None:
+    """Select the sentiment engine of this process.
+
+    The current engine is kept if it already has the given name, so the
+    state it has built up is not lost. Otherwise, a running pool of workers
+    is restarted with the new engine.
+
+    Args:
+        name (str): name of the engine (e.g. 'textblob' or 'lexicon')
+
+    Raises:
+        ValueError: if there is no engine of the given name
+
+    """
+    global __ENGINE  # pylint: disable=global-statement
+    if __ENGINE.NAME != name:
+        __ENGINE = sentiment.create_engine(name)
+        logging.info("Using sentiment engine %s", name)
+        if __POOL is not None:
+            workers = __WORKERS
+            configure_workers(0)
+            configure_workers(workers)
+
+
+def configure_workers(workers: int) -> None:
+    """Calculate the sentiment in a persistent pool of worker processes.
+
+    All workers are started at once and create the current sentiment engine,
+    which loads its models before the first speech arrives. The workers are
+    started by a fork server, so they do not inherit the threads of the
+    backend. A running pool of the same size is kept.
+
+    Args:
+        workers (int): number of worker processes (0 disables the pool)
+
+    """
+    global __POOL, __WORKERS  # pylint: disable=global-statement
+    if __POOL is not None and workers == __WORKERS:
+        return
+    if __POOL is not None:
+        __POOL.close()
+        __POOL.join()
+    __POOL, __WORKERS = None, 0
+    if workers > 0:
+        __POOL = multiprocessing.get_context("forkserver").Pool(
+            workers, initializer=__init_worker, initargs=(__ENGINE.NAME,)
+        )
+        __WORKERS = workers
+        logging.info("Analyzing speeches in %d worker processes", workers)
+
+
+def configure_sentiment_cache(
+        max_entries: int, database_file: str = None
+) -> None:
+    """Configure the cache of sentiment results.
+
+    The cache maps the text of a speaker to its sentiment. It keeps up to
+    max_entries results in memory and all results in the given sqlite
+    database, so they survive restarts of the backend. The results depend on
+    the sentiment engine, so every engine has its own entries.
+
+    Args:
+        max_entries (int): maximum number of results held in memory
+        database_file (str, optional): sqlite database of the results.
+            Defaults to None (results are only held in memory).
+
+    """
+    global __SENTIMENT_CACHE  # pylint: disable=global-statement
+    if __SENTIMENT_CACHE is not None:
+        __SENTIMENT_CACHE.close()
+    __SENTIMENT_CACHE = None
+    if max_entries > 0 or database_file:
+        __SENTIMENT_CACHE = caching.SentimentCache(max_entries, database_file)
+        logging.info(
+            "Caching up to %d sentiments in memory (database: %s)",
+            max_entries, database_file or "none"
+        )
+
+
+def get_sentiment_cache_stats() -> Dict[str, int]:
+    """Return the counters of the sentiment cache.
+
+    Returns:
+        Dict[str, int]: hits, misses and entries in memory (empty if the
+            cache is disabled)
+
+    """
+    if __SENTIMENT_CACHE is None:
+        return dict()
+    return __SENTIMENT_CACHE.stats()
+
+
+def __init_worker(engine: str) -> None:
+    """Prepare a worker process of the pool.
+
+    Args:
+        engine (str): name of the sentiment engine
+
+    """
+    configure_engine(engine)
+    try:
+        __ENGINE.warm_up()
+    except Exception as exception:  # pylint: disable=broad-except
+        # The analysis reports the failure once a speech arrives
+        logging.warning("Failed warming up sentiment engine: %s", exception)
+
+
 def analyze_speeches(speeches: List[schema.Speech]) -> None:
     """Analyze multiple speeches at once.
 
@@ -29,56 +155,228 @@ def analyze_speeches(speeches: List[schema.Speech]) -> None:
         myexceptions.SpeechAnalysisException: if processing of a speech fails
             or None was passed as argument
 
+    """
+    for _ in iter_analyzed_speeches(speeches):
+        pass
+
+
+def iter_analyzed_speeches(
+        speeches: Iterable[schema.Speech]
+) -> Iterator[schema.Speech]:
+    """Analyze speeches in batches while they are consumed.
+
+    Lazy variant of 'analyze_speeches'. The speeches are collected in batches
+    of BATCH_SIZE speeches, so an engine can score them together. Every batch
+    is yielded right after its analysis, so this function can be chained
+    between a streaming parser and the database. If a pool of workers is
+    configured, batches of WORKER_BATCH_SIZE speeches are analyzed by the
+    workers in parallel and yielded in their original order.
+
+    Args:
+        speeches (Iterable[schema.Speech]): speeches (e.g. a generator)
+
+    Raises:
+        myexceptions.SpeechAnalysisException: if processing of a speech fails
+            or None was passed as argument
+
+    Yields:
+        schema.Speech: analyzed speech
+
     """
     if speeches is None:
         raise myexceptions.SpeechAnalysisException("Speeches were 'None'")
+    # While the workers analyze the pending batches, the next ones are read
+    pending = collections.deque()
+    for batch in __iter_batches(speeches):
+        pending.append((batch, __submit_batch(batch)))
+        if len(pending) > __WORKERS:
+            yield from __complete_batch(*pending.popleft())
+    while pending:
+        yield from __complete_batch(*pending.popleft())
+
+
+def __iter_batches(
+        speeches: Iterable[schema.Speech]
+) -> Iterator[List[schema.Speech]]:
+    """Collect speeches in batches.
+
+    Args:
+        speeches (Iterable[schema.Speech]): speeches (e.g. a generator)
+
+    Yields:
+        List[schema.Speech]: batch of speeches
+
+    """
+    size = BATCH_SIZE if __POOL is None else WORKER_BATCH_SIZE
+    batch = []
     for speech in speeches:
-        try:
-            __analyze_speech(speech)
-        except Exception as exception:
-            logging.error("Failed analyzing speech (id: %s)", speech.speech_id)
-            logging.exception(exception)
-            raise myexceptions.SpeechAnalysisException from exception
+        batch.append(speech)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
-def __analyze_speech(speech: schema.Speech) -> None:
-    """Analyze a single speech.
+def __submit_batch(
+        speeches: List[schema.Speech]
+) -> Callable[[], List[Tuple[float, float]]]:
+    """Start the sentiment analysis of multiple speeches.
 
-    This function updates the analysis attribute of the speech object.
+    Sentiments found in the cache are reused. The remaining texts are
+    analyzed by the pool of workers if it is configured and by this process
+    otherwise.
 
     Args:
-        speech (Speech): speech to analyze
+        speeches (List[schema.Speech]): speeches to analyze
+
+    Raises:
+        myexceptions.SpeechAnalysisException: if processing of a speech fails
+
+    Returns:
+        Callable[[], List[Tuple[float, float]]]: returns the sentiments
+            (polarity, subjectivity) once they are calculated
 
     """
-    polarity, subjectivity = __analyze_sentiment(speech.content)
-    no_comments = __analyze_comments(speech.content)
-    speech.analysis.update(
-        polarity, subjectivity, no_comments
-    )
+    texts = [speech.content.get_speakers_text() for speech in speeches]
+    keys, cached = __lookup_sentiments(texts)
+    missing = [text for text, hit in zip(texts, cached) if hit is None]
+    try:
+        if __POOL is not None and missing:
+            get_missing = __POOL.apply_async(
+                __analyze_sentiment, (missing,)
+            ).get
+        else:
+            get_missing = __analyze_sentiment(missing).copy
+    except Exception as exception:
+        __log_failure(speeches, exception)
+        raise myexceptions.SpeechAnalysisException from exception
+    return lambda: __merge_sentiments(keys, cached, get_missing())
+
+
+def __lookup_sentiments(
+        texts: List[str]
+) -> Tuple[List[str], List[Tuple[float, float]]]:
+    """Look up the sentiments of multiple texts in the cache.
+
+    Args:
+        texts (List[str]): texts of the speakers of the speeches
+
+    Returns:
+        Tuple[List[str], List[Tuple[float, float]]]: cache keys and cached
+            sentiments of the texts (None if missing)
 
+    """
+    if __SENTIMENT_CACHE is None:
+        return [None] * len(texts), [None] * len(texts)
+    keys = [
+        caching.SentimentCache.key(text, __ENGINE.NAME) for text in texts
+    ]
+    return keys, [__SENTIMENT_CACHE.get(key) for key in keys]
 
-def __analyze_sentiment(content: schema.SpeechContent) -> Tuple[float, float]:
-    """Analyzises the sentiment of a speech.
 
-    It returns a tuple describing if the text of the speech is rather
-    positive/negative and subjective/objective.
+def __merge_sentiments(
+        keys: List[str], cached: List[Tuple[float, float]],
+        calculated: List[Tuple[float, float]]
+) -> List[Tuple[float, float]]:
+    """Merge cached and calculated sentiments and store the calculated ones.
 
     Args:
-        content (schema.SpeechContent): content of the speech
+        keys (List[str]): cache keys of the texts
+        cached (List[Tuple[float, float]]): cached sentiments (None if
+            missing)
+        calculated (List[Tuple[float, float]]): sentiments of the missing
+            texts in their original order
+
+    Returns:
+        List[Tuple[float, float]]: (polarity, subjectivity) per text
+
+    """
+    calculated = iter(calculated)
+    sentiments, new_entries = [], []
+    for key, hit in zip(keys, cached):
+        if hit is None:
+            hit = next(calculated)
+            new_entries.append((key, hit))
+        sentiments.append(hit)
+    if __SENTIMENT_CACHE is not None:
+        __SENTIMENT_CACHE.put_many(new_entries)
+    return sentiments
+
+
+def __complete_batch(
+        speeches: List[schema.Speech],
+        get_sentiments: Callable[[], List[Tuple[float, float]]]
+) -> List[schema.Speech]:
+    """Write the results of the analysis back to the speeches.
+
+    This function updates the analysis attribute of the speech objects.
+
+    Args:
+        speeches (List[schema.Speech]): analyzed speeches
+        get_sentiments (Callable[[], List[Tuple[float, float]]]): returns
+            the sentiments of the speeches (see __submit_batch)
+
+    Raises:
+        myexceptions.SpeechAnalysisException: if processing of a speech fails
+
+    Returns:
+        List[schema.Speech]: analyzed speeches
+
+    """
+    try:
+        sentiments = get_sentiments()
+        for speech, (polarity, subjectivity) in zip(speeches, sentiments):
+            no_comments = __analyze_comments(speech.content)
+            speech.analysis.update(polarity, subjectivity, no_comments)
+    except Exception as exception:
+        __log_failure(speeches, exception)
+        raise myexceptions.SpeechAnalysisException from exception
+    return speeches
+
+
+def __log_failure(
+        speeches: List[schema.Speech], exception: Exception
+) -> None:
+    """Log the failed analysis of multiple speeches.
+
+    Args:
+        speeches (List[schema.Speech]): speeches whose analysis failed
+        exception (Exception): cause of the failure
+
+    """
+    logging.error("Failed analyzing speeches (ids: %s)", ", ".join(
+        speech.speech_id for speech in speeches
+    ))
+    logging.exception(exception)
+
+
+def __analyze_sentiment(texts: List[str]) -> List[Tuple[float, float]]:
+    """Analyzises the sentiment of multiple speeches.
+
+    It returns tuples describing if the text of a speech is rather
+    positive/negative and subjective/objective. This function is executed
+    by the workers of the pool as well.
+
+    Args:
+        texts (List[str]): texts of the speakers of the speeches
 
     Returns:
-        Tuple[float, float]: (polarity, subjectivity)
+        List[Tuple[float, float]]: (polarity, subjectivity) per speech
 
     """
-    text = content.get_speakers_text()
-    if not text:
-        return (0.0, 0.5)
-    blob = TextBlob(text)
-    polarity, subjectivity = (
-        float("{0:.2f}".format(blob.sentiment.polarity)),
-        float("{0:.2f}".format(blob.sentiment.subjectivity))
-    )
-    return (polarity, subjectivity)
+    scores = iter(__ENGINE.analyze([text for text in texts if text]))
+    sentiments = []
+    for text in texts:
+        if not text:
+            sentiments.append((0.0, 0.5))
+            continue
+        polarity, subjectivity = next(scores)
+        sentiments.append((
+            float("{0:.2f}".format(polarity)),
+            float("{0:.2f}".format(subjectivity))
+        ))
+    return sentiments
 
 
 def __analyze_comments(content: schema.SpeechContent) -> int:
@@ -93,5 +391,4 @@ def __analyze_comments(content: schema.SpeechContent) -> int:
         int: number of comments
 
     """
-    comments = content.get_comments()
-    return len(comments)
+    return content.get_number_of_comments()
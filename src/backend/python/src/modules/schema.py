@@ -1,12 +1,18 @@
 """Typedef of custom objects.
 
 This module defines the structure of all objects used in the backend that are
-no python built-in types.
+no python built-in types. The objects of a speech are created in large
+numbers, so their classes define __slots__ and share their strings (see
+JSONSerializable.intern).
 """
 
 
 # Python imports
 import re
+import sys
+import enum
+import unicodedata
+import collections
 from typing import Dict, Any, Union, List, Tuple
 
 
@@ -17,6 +23,8 @@ import src.modules.myexceptions as myexceptions
 class JSONSerializable:
     """Base class for all classes which are stored in the database."""
 
+    __slots__ = ()
+
     def to_json(self) -> dict:
         """Convert to json data.
 
@@ -60,22 +68,59 @@ class JSONSerializable:
             if k not in obj.keys():
                 raise myexceptions.JSONInitializationException
 
+    @staticmethod
+    def intern(value: Any) -> Any:
+        """Return the shared copy of a string that occurs in many objects.
+
+        Names, parties, topics and dates repeat in every speech of a deputy
+        or protocol. Interning them keeps a single copy in memory.
+
+        Args:
+            value (Any): string to intern (other values are returned as is)
+
+        Returns:
+            Any: interned string or the unchanged value
+
+        """
+        return sys.intern(value) if isinstance(value, str) else value
+
+
+class ParagraphType(str, enum.Enum):
+    """Type of a paragraph of a speech.
+
+    The members compare equal to the strings stored in the database.
+    """
+
+    SPEECH = "speech"
+    COMMENT = "comment"
+
 
 class SpeechParagraph(JSONSerializable):
     """Structure of a single paragraph of a speech."""
 
-    TYPE_SPEECH = "speech"
-    TYPE_COMMENT = "comment"
+    __slots__ = ("type_of_paragraph", "text")
 
-    def __init__(self, type_of_paragraph: str, text: str):
+    TYPE_SPEECH = ParagraphType.SPEECH
+    TYPE_COMMENT = ParagraphType.COMMENT
+    # Types by their value (members are equal to their value as well)
+    TYPES = {member.value: member for member in ParagraphType}
+
+    def __init__(self, type_of_paragraph: ParagraphType, text: str):
         """Initialize object.
 
         Args:
-            type (str): type of the paragraph
+            type (ParagraphType): type of the paragraph (or its value)
             text (str): text of the paragraph
 
+        Raises:
+            ValueError: if the type of the paragraph is unknown
+
         """
-        self.type_of_paragraph = type_of_paragraph
+        self.type_of_paragraph = SpeechParagraph.TYPES.get(type_of_paragraph)
+        if self.type_of_paragraph is None:
+            raise ValueError(
+                "Unknown type of paragraph: {}".format(type_of_paragraph)
+            )
         self.text = text
 
     def get_text(self) -> str:
@@ -115,7 +160,7 @@ class SpeechParagraph(JSONSerializable):
 
         """
         return dict(
-            type_of_paragraph=self.type_of_paragraph,
+            type_of_paragraph=self.type_of_paragraph.value,
             text=self.text
         )
 
@@ -137,6 +182,8 @@ class SpeechParagraph(JSONSerializable):
 class Speech(JSONSerializable):
     """Structure of a single speech."""
 
+    __slots__ = ("meta", "content", "speaker_id", "speech_id", "analysis")
+
     LENGTH_THRESHOLD = 1000
 
     def __init__(
@@ -147,14 +194,17 @@ class Speech(JSONSerializable):
 
         Args:
             meta (Dict[str, str]): (name, party, topic, date)
-            content (SpeechContent): content of the speech
+            content (SpeechContent): content of the speech (or its
+                columns.ColumnarSpeechContent)
             speaker_id (str): speaker's ID
             speech_id (str): ID of the speech
 
         """
-        self.meta = meta
+        self.meta = {
+            key: JSONSerializable.intern(value) for key, value in meta.items()
+        }
         self.content = content
-        self.speaker_id = speaker_id
+        self.speaker_id = JSONSerializable.intern(speaker_id)
         self.speech_id = speech_id
         self.analysis = SpeechAnalysis()
 
@@ -177,6 +227,9 @@ class Speech(JSONSerializable):
     def from_json(cls, obj: dict) -> "Speech":
         """Initialize an object from json data.
 
+        Args:
+            obj (dict): json data of the speech
+
         Returns:
             Speech: object
 
@@ -202,13 +255,15 @@ class Speech(JSONSerializable):
             bool: true if considered a relevant speech, false otherwise
 
         """
-        text = self.content.get_speakers_text()
-        return len(text) >= Speech.LENGTH_THRESHOLD
+        length = self.content.get_speakers_text_length()
+        return length >= Speech.LENGTH_THRESHOLD
 
 
 class SpeechAnalysis(JSONSerializable):
     """Structure of the analysis of a speech."""
 
+    __slots__ = ("polarity", "subjectivity", "number_of_comments")
+
     def __init__(
             self, polarity: float = 0.0, subjectivity: float = 0.5,
             number_of_comments: int = 0
@@ -324,6 +379,8 @@ class SpeechEntry(JSONSerializable):
     president of the parliament.
     """
 
+    __slots__ = ("speaker", "is_speaker", "paragraphs", "content")
+
     def __init__(
             self, speaker: str, is_speaker: bool,
             paragraphs: List["SpeechParagraph"]
@@ -336,20 +393,25 @@ class SpeechEntry(JSONSerializable):
             paragraphs (List[SpeechParagraph]): list of subsequent paragraphs
 
         """
-        self.speaker = speaker
+        self.speaker = JSONSerializable.intern(speaker)
         self.is_speaker = is_speaker
         self.paragraphs = paragraphs
+        # Content the entry belongs to (see SpeechContent.add_speech_entry)
+        self.content = None
 
     def add_paragraph(self, paragraph: SpeechParagraph) -> None:
         """Add an paragraph to the speech entry.
 
-        Append the paragraph to the list of paragraphs.
+        Append the paragraph to the list of paragraphs. The statistics of the
+        content the entry belongs to are updated as well.
 
         Args:
             paragraph (SpeechParagraph): paragraph to add
 
         """
         self.paragraphs.append(paragraph)
+        if self.content is not None:
+            self.content.count_paragraph(self, paragraph)
 
     def to_json(self) -> Dict[str, Union[str, bool, List[SpeechParagraph]]]:
         """Convert object to json data.
@@ -387,9 +449,17 @@ class SpeechContent:
     """Structure of the content of a single speech.
 
     The content is divided into objects of type SpeechEntry that contain
-    subsequent paragraphs of a deputy.
+    subsequent paragraphs of a deputy. Statistics of the paragraphs are kept
+    while entries and paragraphs are added, so they never have to be
+    recomputed. Therefore, entries and paragraphs must only be added by
+    add_speech_entry and SpeechEntry.add_paragraph.
     """
 
+    __slots__ = (
+        "entries", "paragraph_counts", "speakers_paragraphs",
+        "speakers_characters", "__speakers_text"
+    )
+
     def __init__(self, entries: List[SpeechEntry]):
         """Init object.
 
@@ -398,6 +468,15 @@ class SpeechContent:
 
         """
         self.entries = entries
+        # Number of paragraphs per type
+        self.paragraph_counts = collections.Counter()
+        # Number and total length of the speaker's paragraphs
+        self.speakers_paragraphs = 0
+        self.speakers_characters = 0
+        # Joined text of the speaker (None if it must be joined again)
+        self.__speakers_text = None
+        for speech_entry in entries:
+            self.__count_entry(speech_entry)
 
     def add_speech_entry(self, speech_entry: SpeechEntry) -> None:
         """Add a single speech entry to the content of the speech.
@@ -407,23 +486,84 @@ class SpeechContent:
 
         """
         self.entries.append(speech_entry)
+        self.__count_entry(speech_entry)
+
+    def count_paragraph(
+            self, speech_entry: SpeechEntry, paragraph: SpeechParagraph
+    ) -> None:
+        """Update the statistics with a paragraph of one of the entries.
+
+        Args:
+            speech_entry (SpeechEntry): entry containing the paragraph
+            paragraph (SpeechParagraph): paragraph that has been added
+
+        """
+        self.paragraph_counts[paragraph.type_of_paragraph] += 1
+        if speech_entry.is_speaker and paragraph.is_speech():
+            self.speakers_paragraphs += 1
+            self.speakers_characters += len(paragraph.get_text())
+            self.__speakers_text = None
+
+    def __count_entry(self, speech_entry: SpeechEntry) -> None:
+        """Update the statistics with all paragraphs of a new entry.
+
+        Args:
+            speech_entry (SpeechEntry): entry that has been added
+
+        """
+        speech_entry.content = self
+        paragraphs = speech_entry.paragraphs
+        self.paragraph_counts.update(
+            paragraph.type_of_paragraph for paragraph in paragraphs
+        )
+        if not speech_entry.is_speaker:
+            return
+        lengths = [
+            len(paragraph.get_text()) for paragraph in paragraphs
+            if paragraph.is_speech()
+        ]
+        if lengths:
+            self.speakers_paragraphs += len(lengths)
+            self.speakers_characters += sum(lengths)
+            self.__speakers_text = None
 
     def get_speakers_text(self) -> str:
         """Return the text of the speaker.
 
         Iterate over all paragraphs and check if the text of the paragraph
-        was spoken by the speaker.
+        was spoken by the speaker. The text is joined once and kept until
+        another paragraph of the speaker is added.
 
         Returns:
             str: text of the speech (without questions and comments)
 
         """
-        return " ".join([
-            speech_paragraph.get_text()
-            for speech_entry in self.entries
-            for speech_paragraph in speech_entry.paragraphs
-            if speech_paragraph.is_speech() and speech_entry.is_speaker
-        ])
+        if self.__speakers_text is None:
+            self.__speakers_text = " ".join([
+                speech_paragraph.get_text()
+                for speech_entry in self.entries
+                for speech_paragraph in speech_entry.paragraphs
+                if speech_paragraph.is_speech() and speech_entry.is_speaker
+            ])
+        return self.__speakers_text
+
+    def get_speakers_text_length(self) -> int:
+        """Return the length of the text of the speaker without joining it.
+
+        Returns:
+            int: length of the result of get_speakers_text
+
+        """
+        return self.speakers_characters + max(self.speakers_paragraphs - 1, 0)
+
+    def get_number_of_comments(self) -> int:
+        """Return the number of comments during the speech.
+
+        Returns:
+            int: number of comments
+
+        """
+        return self.paragraph_counts[SpeechParagraph.TYPE_COMMENT]
 
     def get_comments(self) -> List[str]:
         """Return all comments during the speech.
@@ -491,6 +631,8 @@ class SpeechIndex(JSONSerializable):
     subsequent paragraphs of a single deputy.
     """
 
+    __slots__ = ("index", "name")
+
     def __init__(self, index: int, name: str):
         """Init object.
 
@@ -523,6 +665,84 @@ class SpeechIndex(JSONSerializable):
         return cls(index=int(obj["index"]), name=obj["name"])
 
 
+class ProtocolContext(JSONSerializable):
+    """Structure of the information shared by all speeches of a protocol.
+
+    Used for parsing a protocol. It is built once per protocol and maps the
+    IDs of the speakers to the topics of their agenda items, so a speech can
+    look up its topic and date without searching the protocol again.
+    """
+
+    TOPIC_UNKNOWN = "None"
+
+    def __init__(
+            self, date: str, session: Dict[str, str], topics: Dict[str, str]
+    ):
+        """Init object.
+
+        Args:
+            date (str): date of the session
+            session (Dict[str, str]): (period, number) of the session
+            topics (Dict[str, str]): mapping of speaker IDs to topics
+
+        """
+        self.date = date
+        self.session = session
+        self.topics = topics
+
+    def get_topic(self, speaker_id: str) -> str:
+        """Return the topic of the agenda item of the given speaker.
+
+        Args:
+            speaker_id (str): unique ID of the speaker
+
+        Returns:
+            str: topic or 'None' if the speaker is not listed in the agenda
+
+        """
+        return self.topics.get(speaker_id, ProtocolContext.TOPIC_UNKNOWN)
+
+    @staticmethod
+    def date_key(date: str) -> str:
+        """Return the sortable key of a date of a protocol.
+
+        Args:
+            date (str): date as given by the protocol (e.g. "25.10.2019")
+
+        Returns:
+            str: date in ISO format (e.g. "2019-10-25") or the given date if
+                it has another format
+
+        """
+        parts = date.split(".")
+        if len(parts) != 3 or not all(part.isdigit() for part in parts):
+            return date
+        day, month, year = parts
+        return "{}-{:0>2}-{:0>2}".format(year, month, day)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert object to json data.
+
+        Returns:
+            Dict[str, Any]: mapping of attributes
+
+        """
+        return dict(date=self.date, session=self.session, topics=self.topics)
+
+    @classmethod
+    def from_json(cls, obj: dict) -> "ProtocolContext":
+        """Initialize object from json data.
+
+        Returns:
+            ProtocolContext: object
+
+        """
+        ProtocolContext.assert_keys(["date", "session", "topics"], obj)
+        return cls(
+            date=obj["date"], session=obj["session"], topics=obj["topics"]
+        )
+
+
 class EnvVars(JSONSerializable):
     """Structure of environment variables used by the backend."""
 
@@ -534,7 +754,10 @@ class EnvVars(JSONSerializable):
             scraper_config: Tuple[int, int],
             protocol_config: Tuple[str, str],
             ods_config: Tuple[str, str, str, str],
-            logging_config: str
+            logging_config: str,
+            cache_config: Tuple[str, int] = ("", 0),
+            analysis_config: Tuple[str, int, bool] = ("textblob", 0, False),
+            sentiment_cache_config: Tuple[int, str] = (10000, "")
     ):
         """Init object.
 
@@ -547,6 +770,14 @@ class EnvVars(JSONSerializable):
             ods_config (Tuple[str, str]):
                 (ods host, deputies pipeline, fallback deputies, profile url)
             logging_config (str): logging level
+            cache_config (Tuple[str, int], optional):
+                (cache directory, maximum size in bytes). Defaults to disabled.
+            analysis_config (Tuple[str, int, bool], optional):
+                (sentiment engine, worker processes, deferred). Defaults to
+                textblob without workers while storing the speeches.
+            sentiment_cache_config (Tuple[int, str], optional):
+                (entries in memory, database file). Defaults to 10000 entries
+                without database.
 
         """
         self.database_config = database_config
@@ -555,6 +786,9 @@ class EnvVars(JSONSerializable):
         self.protocol_config = protocol_config
         self.ods_config = ods_config
         self.logging_config = logging_config
+        self.cache_config = cache_config
+        self.analysis_config = analysis_config
+        self.sentiment_cache_config = sentiment_cache_config
     # pylint: enable=too-many-arguments
 
     def to_json(self) -> Dict[str, Any]:
@@ -570,7 +804,10 @@ class EnvVars(JSONSerializable):
             scraper_config=self.scraper_config,
             protocol_config=self.protocol_config,
             ods_config=self.ods_config,
-            logging_config=self.logging_config
+            logging_config=self.logging_config,
+            cache_config=self.cache_config,
+            analysis_config=self.analysis_config,
+            sentiment_cache_config=self.sentiment_cache_config
         )
 
     @classmethod
@@ -591,13 +828,25 @@ class EnvVars(JSONSerializable):
             scraper_config=obj["scraper_config"],
             protocol_config=obj["protocol_config"],
             ods_config=obj["ods_config"],
-            logging_config=obj["logging_config"]
+            logging_config=obj["logging_config"],
+            cache_config=obj.get("cache_config", ("", 0)),
+            analysis_config=obj.get(
+                "analysis_config", ("textblob", 0, False)
+            ),
+            sentiment_cache_config=obj.get(
+                "sentiment_cache_config", (10000, "")
+            )
         )
 
 
 class Name(JSONSerializable):
     """Structure of a deputy's name."""
 
+    # Academic titles which are not part of the key of a name
+    TITLES = frozenset(["dr", "prof", "hc"])
+    # Replacements of the German umlauts (after case folding)
+    UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+
     def __init__(self, components: List[str]):
         """Initialize object.
 
@@ -675,6 +924,42 @@ class Name(JSONSerializable):
         """
         return re.compile("(.)*".join(self.components), re.IGNORECASE)
 
+    def get_key(self) -> str:
+        """Return the normalized key of the name (see normalize).
+
+        Returns:
+            str: key of the name
+
+        """
+        return Name.normalize(" ".join(self.components))
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Return the normalized key of a name.
+
+        The name is case folded, umlauts are replaced by their two letter
+        spelling and all other diacritics are removed. Dots are dropped and
+        the remaining words (separated by whitespace or hyphens) are joined
+        by single spaces, except for academic titles.
+
+        Args:
+            name (str): name in any format (e.g. "Prof. Dr. Jürgen Müller")
+
+        Returns:
+            str: key of the name (e.g. "juergen mueller")
+
+        """
+        folded = unicodedata.normalize(
+            "NFKD", name.casefold().translate(Name.UMLAUTS)
+        )
+        folded = "".join(
+            char for char in folded if not unicodedata.combining(char)
+        ).replace(".", "")
+        return " ".join(
+            word for word in re.split(r"[\s\-]+", folded)
+            if word and word not in Name.TITLES
+        )
+
     def to_url_string(self) -> str:
         """Convert the name to url styled string.
 
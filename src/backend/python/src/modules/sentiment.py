@@ -0,0 +1,424 @@
+"""Sentiment analysis of texts.
+
+This module provides the engines that compute the sentiment of speeches. The
+textblob engine analyzes every text with TextBlobDE. The lexicon engine scores
+whole batches of texts with numpy operations instead. It uses the same German
+polarity lexicon and lemmatizer as TextBlobDE, but applies them once per
+distinct token rather than once per occurrence.
+"""
+
+
+# Python imports
+import re
+from typing import List, Tuple
+
+
+# 3rd party modules
+import numpy as np
+from textblob_de import TextBlobDE as TextBlob
+from textblob_de.packages import pattern_de
+from textblob_de.sentiments import sentiment as pattern_sentiment
+
+
+class SentimentEngine:
+    """Base class of all sentiment engines."""
+
+    # Name of the engine (used for the configuration)
+    NAME = None
+    # Text that is analyzed in order to load all models
+    WARM_UP_TEXT = "Das ist ein guter Anfang. Das ist nicht schlecht."
+
+    def analyze(self, texts: List[str]) -> List[Tuple[float, float]]:
+        """Return the sentiment of every given text.
+
+        Child classes must provide an implementation of this method.
+
+        Args:
+            texts (List[str]): texts to analyze
+
+        Raises:
+            NotImplementedError: override by child classes
+
+        Returns:
+            List[Tuple[float, float]]: (polarity, subjectivity) per text
+
+        """
+        raise NotImplementedError
+
+    def warm_up(self) -> None:
+        """Load all models, so the analysis of the first text is not delayed.
+
+        The models of TextBlobDE and pattern are loaded lazily. Analyzing a
+        short text makes them load at once.
+        """
+        self.analyze([SentimentEngine.WARM_UP_TEXT])
+
+
+class TextBlobEngine(SentimentEngine):
+    """Sentiment engine that analyzes every text with TextBlobDE."""
+
+    NAME = "textblob"
+
+    def __init__(self, tokenizer=None):
+        """Init object.
+
+        Args:
+            tokenizer (optional): tokenizer passed to TextBlobDE. Defaults to
+                the one chosen by TextBlobDE.
+
+        """
+        self.tokenizer = tokenizer
+
+    def analyze(self, texts: List[str]) -> List[Tuple[float, float]]:
+        """Return the sentiment of every given text.
+
+        Args:
+            texts (List[str]): texts to analyze
+
+        Returns:
+            List[Tuple[float, float]]: (polarity, subjectivity) per text
+
+        """
+        sentiments = []
+        for text in texts:
+            blob = TextBlob(text, tokenizer=self.tokenizer)
+            sentiments.append(
+                (blob.sentiment.polarity, blob.sentiment.subjectivity)
+            )
+        return sentiments
+
+
+class LexiconEngine(SentimentEngine):
+    """Sentiment engine that scores batches of texts with numpy.
+
+    The engine reproduces the scoring of TextBlobDE: the polarity of a text is
+    the mean polarity of its sentences, the polarity of a sentence is the mean
+    polarity of the lexicon words found in it. A negation preceding a word
+    turns its polarity into -0.5 times the polarity, a modifier (adverb or
+    adjective) preceding a word is merged with it and scales it by its
+    intensity. Every distinct token is lemmatized and looked up once. Its
+    attributes are stored in arrays indexed by a token id, so scoring a batch
+    only requires array operations over the token ids of the batch.
+
+    The results differ slightly from TextBlobDE. Tokens are lemmatized
+    without their context, sentences are split by a regular expression and
+    negations and modifiers only apply to the directly following word.
+    Compared to TextBlobDE (splitting sentences with its pattern tokenizer),
+    the polarity of a speech of the example protocol deviates by at most
+    TOLERANCE (0.025 on average), the subjectivity by at most 0.05. The
+    analysis rounds both values to two decimals anyway. This engine is not
+    thread-safe.
+    """
+
+    NAME = "lexicon"
+    # Words, and sequences of sentence-ending punctuation marks
+    TOKEN_REGEX = re.compile(r"\w+(?:-\w+)*|[.!?]+")
+    NUMBER_REGEX = re.compile(r"\d+")
+    # Bits of the token flags
+    KNOWN = 1
+    MODIFIER = 2
+    NEGATION = 4
+    BOUNDARY = 8
+    NO_BREAK = 16
+    # Part-of-speech tags of lexicon words that modify the next word
+    MODIFIER_TAGS = ("RB", "JJ")
+    # Maximum deviation of the polarity from TextBlobDE (see above)
+    TOLERANCE = 0.1
+
+    def __init__(self):
+        """Init object."""
+        self.vocabulary = {}
+        self.attributes = []
+        self.polarity = np.zeros(0)
+        self.subjectivity = np.zeros(0)
+        self.intensity = np.zeros(0)
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.initial = np.zeros(0, dtype=np.int64)
+
+    def analyze(self, texts: List[str]) -> List[Tuple[float, float]]:
+        """Return the sentiment of every given text.
+
+        Args:
+            texts (List[str]): texts to analyze
+
+        Returns:
+            List[Tuple[float, float]]: (polarity, subjectivity) per text
+
+        """
+        tokens = [LexiconEngine.TOKEN_REGEX.findall(text) for text in texts]
+        vocabulary = self.vocabulary
+        ids = np.array([
+            vocabulary[token] if token in vocabulary
+            else self.__add_token(token)
+            for text_tokens in tokens for token in text_tokens
+        ], dtype=np.int64)
+        if len(self.attributes) > len(self.flags):
+            self.__update_arrays()
+        lengths = np.array(
+            [len(text_tokens) for text_tokens in tokens], dtype=np.int64
+        )
+        polarity, subjectivity = self.__score(ids, lengths)
+        return list(zip(polarity.tolist(), subjectivity.tolist()))
+
+    def __score(
+            self, ids: np.ndarray, lengths: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score texts given as concatenated token ids.
+
+        Args:
+            ids (np.ndarray): token ids of all texts
+            lengths (np.ndarray): number of tokens per text
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: polarity and subjectivity per text
+
+        """
+        flags = self.flags[ids]
+        sentence_start = LexiconEngine.__split_sentences(flags, lengths)
+        sentence = np.cumsum(sentence_start) - 1
+        sentences_per_text = np.bincount(
+            np.repeat(np.arange(len(lengths)), lengths)[sentence_start],
+            minlength=len(lengths)
+        )
+        # The first word of a sentence is capitalized regardless of its type
+        ids = np.where(sentence_start, self.initial[ids], ids)
+        words = flags & LexiconEngine.BOUNDARY == 0
+        sentence_polarity, sentence_subjectivity = self.__score_sentences(
+            ids[words], self.flags[ids[words]], sentence[words],
+            len(sentence_start)
+        )
+        sentence_text = np.repeat(
+            np.arange(len(lengths)), sentences_per_text
+        )
+        return LexiconEngine.__mean_per_group(
+            sentence_text, sentence_polarity[:len(sentence_text)],
+            sentence_subjectivity[:len(sentence_text)], len(lengths)
+        )
+
+    @staticmethod
+    def __split_sentences(
+            flags: np.ndarray, lengths: np.ndarray
+    ) -> np.ndarray:
+        """Return which tokens of concatenated texts start a sentence.
+
+        Args:
+            flags (np.ndarray): flags of all tokens
+            lengths (np.ndarray): number of tokens per text
+
+        Returns:
+            np.ndarray: True for the first token of every sentence
+
+        """
+        previous = LexiconEngine.__previous
+        text_start = np.zeros(len(flags), dtype=bool)
+        offsets = np.cumsum(lengths) - lengths
+        text_start[offsets[lengths > 0]] = True
+        # Punctuation ends a sentence unless it follows an abbreviation
+        ends = flags & LexiconEngine.BOUNDARY != 0
+        ends &= ~(previous(flags & LexiconEngine.NO_BREAK != 0) & ~text_start)
+        return text_start | (previous(ends) & ~text_start)
+
+    def __score_sentences(
+            self, ids: np.ndarray, flags: np.ndarray, sentence: np.ndarray,
+            size: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score the sentences of texts given as word ids.
+
+        Args:
+            ids (np.ndarray): ids of all words (without punctuation)
+            flags (np.ndarray): flags of all words
+            sentence (np.ndarray): sentence index of all words
+            size (int): upper bound of the number of sentences
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: polarity and subjectivity per
+                sentence
+
+        """
+        previous = LexiconEngine.__previous
+        same = np.zeros(len(ids), dtype=bool)
+        same[1:] = sentence[1:] == sentence[:-1]
+        known = flags & LexiconEngine.KNOWN != 0
+        negated = same & previous(flags & LexiconEngine.NEGATION != 0)
+        # A known word following a modifier is merged into its assessment
+        merged = known & same & previous(
+            known & (flags & LexiconEngine.MODIFIER != 0)
+        )
+        intensity = np.where(
+            negated, 1.0 / self.intensity[ids], self.intensity[ids]
+        )
+        factor = np.where(merged, previous(intensity, 1.0), 1.0)
+        polarity = np.clip(self.polarity[ids] * factor, -1.0, 1.0)
+        subjectivity = np.clip(self.subjectivity[ids] * factor, -1.0, 1.0)
+        # Every assessment is scored by its last word
+        final = known & ~np.append(merged[1:], False)
+        return LexiconEngine.__mean_per_group(
+            sentence[final],
+            LexiconEngine.__negate_assessments(
+                polarity, known, merged, negated, final
+            ),
+            subjectivity[final], size
+        )
+
+    @staticmethod
+    def __negate_assessments(
+            polarity: np.ndarray, known: np.ndarray, merged: np.ndarray,
+            negated: np.ndarray, final: np.ndarray
+    ) -> np.ndarray:
+        """Return the polarity of all assessments including their negation.
+
+        A negation of any word of an assessment applies to the whole
+        assessment.
+
+        Args:
+            polarity (np.ndarray): polarity of all words
+            known (np.ndarray): True for words of the lexicon
+            merged (np.ndarray): True for words merged into the assessment
+                of their predecessor
+            negated (np.ndarray): True for words following a negation
+            final (np.ndarray): True for the last word of every assessment
+
+        Returns:
+            np.ndarray: polarity per assessment
+
+        """
+        assessment = np.cumsum(known & ~merged) - 1
+        negated_assessment = np.zeros(len(polarity), dtype=bool)
+        np.logical_or.at(negated_assessment, assessment[known], negated[known])
+        return np.where(
+            negated_assessment[assessment[final]],
+            polarity[final] * -0.5, polarity[final]
+        )
+
+    @staticmethod
+    def __mean_per_group(
+            group: np.ndarray, polarity: np.ndarray,
+            subjectivity: np.ndarray, size: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the mean polarity and subjectivity of every group.
+
+        Args:
+            group (np.ndarray): group index of every value
+            polarity (np.ndarray): polarity values
+            subjectivity (np.ndarray): subjectivity values
+            size (int): number of groups
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: polarity and subjectivity per
+                group (0.0 for empty groups)
+
+        """
+        count = np.maximum(np.bincount(group, minlength=size), 1)
+        return (
+            np.bincount(group, weights=polarity, minlength=size) / count,
+            np.bincount(group, weights=subjectivity, minlength=size) / count
+        )
+
+    def __add_token(self, token: str) -> int:
+        """Add a token to the vocabulary and return its id.
+
+        Args:
+            token (str): token as it appears in a text
+
+        Returns:
+            int: id of the token
+
+        """
+        lower = token.lower()
+        if lower == token:
+            initial = len(self.attributes)
+        elif lower in self.vocabulary:
+            initial = self.vocabulary[lower]
+        else:
+            initial = self.__add_token(lower)
+        flags, scores = 0, (0.0, 0.0, 1.0)
+        if token[0] in ".!?":
+            flags |= LexiconEngine.BOUNDARY
+        else:
+            if (
+                    LexiconEngine.NUMBER_REGEX.fullmatch(token)
+                    or "{}.".format(token) in pattern_de.ABBREVIATIONS
+            ):
+                flags |= LexiconEngine.NO_BREAK
+            lemma = LexiconEngine.__lemmatize(token)
+            if lemma in pattern_sentiment:
+                entry = pattern_sentiment[lemma]
+                flags |= LexiconEngine.KNOWN
+                scores = tuple(entry[None])
+                if any(tag in entry for tag in LexiconEngine.MODIFIER_TAGS):
+                    flags |= LexiconEngine.MODIFIER
+            if lemma in pattern_sentiment.negations:
+                flags |= LexiconEngine.NEGATION
+        self.vocabulary[token] = len(self.attributes)
+        self.attributes.append(scores + (flags, initial))
+        return self.vocabulary[token]
+
+    def __update_arrays(self) -> None:
+        """Convert the attributes of all tokens into arrays."""
+        polarity, subjectivity, intensity, flags, initial = zip(
+            *self.attributes
+        )
+        self.polarity = np.array(polarity)
+        self.subjectivity = np.array(subjectivity)
+        self.intensity = np.array(intensity)
+        self.flags = np.array(flags, dtype=np.uint8)
+        self.initial = np.array(initial, dtype=np.int64)
+
+    @staticmethod
+    def __previous(values: np.ndarray, fill=False) -> np.ndarray:
+        """Shift the given array by one, so every element sees its predecessor.
+
+        Args:
+            values (np.ndarray): array to shift
+            fill (optional): value of the first element. Defaults to False.
+
+        Returns:
+            np.ndarray: shifted array
+
+        """
+        shifted = np.empty_like(values)
+        shifted[1:] = values[:-1]
+        if len(values):
+            shifted[0] = fill
+        return shifted
+
+    @staticmethod
+    def __lemmatize(token: str) -> str:
+        """Return the lemma of a token the way TextBlobDE looks it up.
+
+        The token is tagged without context, which is why a token that is a
+        lexicon word already is not lemmatized at all. Like in TextBlobDE, the
+        lemma uses Swiss spelling and is lowercase.
+
+        Args:
+            token (str): token as it appears in a text
+
+        Returns:
+            str: lemma of the token
+
+        """
+        surface = token.replace("ß", "ss").lower()
+        if surface in pattern_sentiment:
+            return surface
+        tagged = pattern_de.parser.find_tags([token])
+        lemma = pattern_de.find_lemmata([list(tagged[0])])[0][2]
+        return lemma.replace("ß", "ss").lower()
+
+
+def create_engine(name: str) -> SentimentEngine:
+    """Return a new sentiment engine of the given name.
+
+    Args:
+        name (str): name of the engine
+
+    Raises:
+        ValueError: if there is no engine of the given name
+
+    Returns:
+        SentimentEngine: sentiment engine
+
+    """
+    for engine in [TextBlobEngine, LexiconEngine]:
+        if engine.NAME == name:
+            return engine()
+    raise ValueError("Unknown sentiment engine '{}'".format(name))
@@ -0,0 +1,318 @@
+"""Fast serialization of speeches.
+
+Speech.to_json and Speech.from_json convert every object of a speech by its
+own method and validate the keys of the json data at every level. This
+module converts a speech into a document in a single pass and back. Documents
+written by the backend itself are trusted, so their keys are not validated.
+Speeches can be encoded to BSON or JSON bytes directly. A SpeechProxy defers
+decoding the content of a speech until it is accessed.
+"""
+
+
+# Python imports
+import json
+from typing import Dict, Any, Union
+
+
+# 3rd party modules
+import bson
+
+
+# Local imports
+import src.modules.schema as schema
+import src.modules.columns as columns
+
+
+# Values of the paragraph types in the documents
+__TYPE_VALUES = {
+    type_of_paragraph: type_of_paragraph.value
+    for type_of_paragraph in schema.ParagraphType
+}
+
+
+def speech_to_document(speech: schema.Speech) -> Dict[str, Any]:
+    """Convert a speech into a document in a single pass.
+
+    Args:
+        speech (schema.Speech): speech to convert
+
+    Returns:
+        Dict[str, Any]: document (equal to the result of Speech.to_json)
+
+    """
+    if isinstance(speech, SpeechProxy) and not speech.is_decoded():
+        return speech.to_json()
+    content = speech.content
+    analysis = speech.analysis
+    if isinstance(content, schema.SpeechContent):
+        content = dict(entries=[
+            dict(
+                speaker=entry.speaker, is_speaker=entry.is_speaker,
+                paragraphs=[
+                    dict(
+                        type_of_paragraph=__TYPE_VALUES[
+                            paragraph.type_of_paragraph
+                        ],
+                        text=paragraph.text
+                    ) for paragraph in entry.paragraphs
+                ]
+            ) for entry in content.entries
+        ])
+    else:
+        content = content.to_json()
+    return dict(
+        meta=speech.meta,
+        content=content,
+        speaker_id=speech.speaker_id,
+        speech_id=speech.speech_id,
+        analysis=dict(
+            polarity=analysis.polarity,
+            subjectivity=analysis.subjectivity,
+            number_of_comments=analysis.number_of_comments
+        )
+    )
+
+
+def speech_from_document(
+        document: Dict[str, Any], trusted: bool = True,
+        columnar: bool = False
+) -> schema.Speech:
+    """Initialize a speech from a document.
+
+    Unlike Speech.from_json, the analysis of the speech is restored as well.
+
+    Args:
+        document (Dict[str, Any]): document of the speech
+        trusted (bool, optional): the document has been written by the
+            backend, so its keys are not validated. Defaults to True.
+        columnar (bool, optional): store the content in a
+            ColumnarSpeechContent. Defaults to False.
+
+    Raises:
+        myexceptions.JSONInitializationException: if an untrusted document
+            misses a key
+
+    Returns:
+        schema.Speech: speech
+
+    """
+    if not trusted:
+        speech = columns.ColumnarSpeechContent.speech_from_json(
+            document
+        ) if columnar else schema.Speech.from_json(document)
+    else:
+        speech = schema.Speech(
+            document["meta"], content_from_document(
+                document["content"], columnar
+            ), document["speaker_id"], document["speech_id"]
+        )
+    restore_analysis(speech, document)
+    return speech
+
+
+def content_from_document(
+        document: Dict[str, Any], columnar: bool = False
+) -> Union[schema.SpeechContent, columns.ColumnarSpeechContent]:
+    """Initialize the content of a speech from a trusted document.
+
+    Args:
+        document (Dict[str, Any]): document of the content
+        columnar (bool, optional): create a ColumnarSpeechContent.
+            Defaults to False.
+
+    Returns:
+        Union[schema.SpeechContent, columns.ColumnarSpeechContent]: content
+
+    """
+    if columnar:
+        return columns.ColumnarSpeechContent.from_json(document)
+    return schema.SpeechContent([
+        schema.SpeechEntry(
+            entry["speaker"], entry["is_speaker"], [
+                schema.SpeechParagraph(
+                    paragraph["type_of_paragraph"], paragraph["text"]
+                ) for paragraph in entry["paragraphs"]
+            ]
+        ) for entry in document["entries"]
+    ])
+
+
+def restore_analysis(
+        speech: schema.Speech, document: Dict[str, Any]
+) -> None:
+    """Restore the analysis of a speech from its document.
+
+    Args:
+        speech (schema.Speech): decoded speech
+        document (Dict[str, Any]): document of the speech
+
+    """
+    analysis = document.get("analysis")
+    if analysis is not None:
+        speech.analysis.update(
+            analysis["polarity"], analysis["subjectivity"],
+            analysis["number_of_comments"]
+        )
+
+
+class SpeechProxy(schema.Speech):
+    """Speech that decodes its content on first access.
+
+    Meta data, IDs and analysis are taken from the trusted document right
+    away. The content is decoded once it is accessed, so reading the meta
+    data or the analysis of many speeches does not decode their paragraphs.
+    Until then, to_json returns the content of the document as it is.
+    """
+
+    __slots__ = ("document", "columnar", "__content")
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, document: Dict[str, Any], columnar: bool = False):
+        """Init object.
+
+        Args:
+            document (Dict[str, Any]): trusted document of the speech
+            columnar (bool, optional): decode the content into a
+                ColumnarSpeechContent. Defaults to False.
+
+        """
+        self.document = document
+        self.columnar = columnar
+        self.__content = None
+        self.meta = document["meta"]
+        self.speaker_id = document["speaker_id"]
+        self.speech_id = document["speech_id"]
+        self.analysis = schema.SpeechAnalysis()
+        restore_analysis(self, document)
+    # pylint: enable=super-init-not-called
+
+    @property
+    def content(
+            self
+    ) -> Union[schema.SpeechContent, columns.ColumnarSpeechContent]:
+        """Return the content of the speech and decode it if necessary.
+
+        Returns:
+            Union[schema.SpeechContent, columns.ColumnarSpeechContent]:
+                content of the speech
+
+        """
+        if self.__content is None:
+            self.__content = content_from_document(
+                self.document["content"], self.columnar
+            )
+            self.document = None
+        return self.__content
+
+    @content.setter
+    def content(
+            self,
+            content: Union[schema.SpeechContent, columns.ColumnarSpeechContent]
+    ) -> None:
+        """Replace the content of the speech.
+
+        Args:
+            content (Union[schema.SpeechContent,
+                columns.ColumnarSpeechContent]): new content
+
+        """
+        self.__content = content
+        self.document = None
+
+    def is_decoded(self) -> bool:
+        """Check if the content has been decoded (or replaced).
+
+        Returns:
+            bool: True if the content has been decoded, False otherwise
+
+        """
+        return self.__content is not None
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert object to json data without decoding the content.
+
+        Returns:
+            Dict[str, Any]: mapping of attributes
+
+        """
+        if self.is_decoded():
+            return super().to_json()
+        return dict(
+            meta=self.meta,
+            content=self.document["content"],
+            speaker_id=self.speaker_id,
+            speech_id=self.speech_id,
+            analysis=self.analysis.to_json()
+        )
+
+    @classmethod
+    def from_json(cls, obj: dict, columnar: bool = False) -> "SpeechProxy":
+        """Initialize object from trusted json data.
+
+        Returns:
+            SpeechProxy: object
+
+        """
+        return cls(obj, columnar)
+
+
+def speech_to_bson(speech: schema.Speech) -> bytes:
+    """Encode a speech to BSON.
+
+    Args:
+        speech (schema.Speech): speech to encode
+
+    Returns:
+        bytes: BSON document
+
+    """
+    return bson.BSON.encode(speech_to_document(speech))
+
+
+def speech_from_bson(
+        data: bytes, trusted: bool = True, columnar: bool = False
+) -> schema.Speech:
+    """Decode a speech from BSON.
+
+    Args:
+        data (bytes): BSON document
+        trusted (bool, optional): see speech_from_document
+        columnar (bool, optional): see speech_from_document
+
+    Returns:
+        schema.Speech: speech
+
+    """
+    return speech_from_document(bson.BSON(data).decode(), trusted, columnar)
+
+
+def speech_to_json_bytes(speech: schema.Speech) -> bytes:
+    """Encode a speech to compact UTF-8 encoded JSON.
+
+    Args:
+        speech (schema.Speech): speech to encode
+
+    Returns:
+        bytes: JSON document
+
+    """
+    return json.dumps(
+        speech_to_document(speech), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def speech_from_json_bytes(
+        data: bytes, trusted: bool = True, columnar: bool = False
+) -> schema.Speech:
+    """Decode a speech from JSON.
+
+    Args:
+        data (bytes): JSON document
+        trusted (bool, optional): see speech_from_document
+        columnar (bool, optional): see speech_from_document
+
+    Returns:
+        schema.Speech: speech
+
+    """
+    return speech_from_document(json.loads(data), trusted, columnar)
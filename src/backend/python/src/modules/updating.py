@@ -13,10 +13,11 @@ from typing import Tuple
 
 
 # 3rd party modules
-import wget
+import requests
 
 
 # Local imports
+import src.modules.schema as schema
 import src.modules.parsing as parsing
 import src.modules.database as database
 import src.modules.processing as processing
@@ -27,24 +28,36 @@ class Updater(threading.Thread):
     """Implementation of the updater thread.
 
     The updater request for unprocessed protocols, downloads and parses them
-    and stores the processed speeches into the database.
+    and stores the processed speeches into the database. Protocols are parsed
+    in memory (validating the whole document) and written to the protocol
+    directory afterwards, unless no directory is configured. In the deferred
+    mode, the speeches are stored before their analysis, which is left to the
+    analyzer thread (see module analyzing).
     """
 
+    # Timeout of connecting to and reading from the server in seconds
+    DOWNLOAD_TIMEOUT = 60
+
     def __init__(
             self, sem: threading.Semaphore, database_client: database.Database,
-            protocol_config: Tuple[str, str]
+            protocol_config: Tuple[str, str],
+            analyzer_sem: threading.Semaphore = None
     ):
         """Init object.
 
         Args:
             sem (threading.Semaphore): semaphore for comm. with database
             database (database.Database): database
-            protocol_config (Tuple[str, str]): (dtd file, destination)
+            protocol_config (Tuple[str, str]): (dtd file, destination).
+                An empty destination disables storing the protocols.
+            analyzer_sem (threading.Semaphore, optional): semaphore of the
+                analyzer. Enables the deferred mode. Defaults to None.
 
         """
         threading.Thread.__init__(self)
         self.sem = sem
         self.db_client = database_client
+        self.analyzer_sem = analyzer_sem
         self.dtd_file, self.protocols_directory = protocol_config
 
     def run(self):
@@ -57,11 +70,9 @@ class Updater(threading.Thread):
             if protocol is None:
                 continue
             try:
-                fpath = os.path.join(self.protocols_directory, protocol.fname)
-                wget.download(protocol.url, fpath)
-                speeches = parsing.get_speeches(fpath, self.dtd_file)
-                processing.analyze_speeches(speeches)
-                self.db_client.speech_insert_collection(speeches)
+                self.process(protocol)
+            except requests.exceptions.RequestException:
+                logging.error("Failed downloading protocol %s", protocol.url)
             except myexceptions.SpeechParsingException as parse_exception:
                 logging.error(
                     "Failed parsing speeches in protocol %s", protocol.url
@@ -75,3 +86,60 @@ class Updater(threading.Thread):
                 # Execute this even if a failure occured to pretend that the
                 # broken protocol is updated multiple times
                 self.db_client.protocol_is_done(protocol)
+
+    def process(self, protocol: schema.Protocol) -> None:
+        """Download, parse and store the speeches of a single protocol.
+
+        Args:
+            protocol (schema.Protocol): protocol to process
+
+        Raises:
+            RequestException: if downloading the protocol fails
+            SpeechParsingException: if parsing the protocol fails
+            SpeechAnalysisException: if analyzing a speech fails
+
+        """
+        response = requests.get(
+            protocol.url, timeout=Updater.DOWNLOAD_TIMEOUT
+        )
+        response.raise_for_status()
+        self.ingest(protocol, response.content)
+
+    def ingest(self, protocol: schema.Protocol, data: bytes) -> None:
+        """Parse, analyze and insert the speeches of a downloaded protocol.
+
+        The protocol is parsed and validated as a whole (see
+        parsing.get_speeches), so protocols parsed before are taken from the
+        parse cache. Its file is written once it has been parsed
+        successfully. Its speeches are inserted only after the protocol has
+        been parsed (and analyzed) successfully. In the deferred mode, the
+        speeches are stored as pending and the analyzer is woken up.
+
+        Args:
+            protocol (schema.Protocol): protocol the data belongs to
+            data (bytes): content of the protocol
+
+        Raises:
+            SpeechParsingException: if parsing the protocol fails
+            SpeechAnalysisException: if analyzing a speech fails
+
+        """
+        speeches = parsing.get_speeches(data, self.dtd_file)
+        logging.debug("Parse cache: %s", parsing.get_cache_stats())
+        if self.protocols_directory:
+            fpath = os.path.join(self.protocols_directory, protocol.fname)
+            tmp_path = "{}.part".format(fpath)
+            with open(tmp_path, "wb") as out:
+                out.write(data)
+            os.replace(tmp_path, fpath)
+        if self.analyzer_sem is not None:
+            self.db_client.speech_insert_collection(
+                speeches, analysis_pending=True
+            )
+            self.analyzer_sem.release()
+            return
+        processing.analyze_speeches(speeches)
+        self.db_client.speech_insert_collection(speeches)
+        logging.debug(
+            "Sentiment cache: %s", processing.get_sentiment_cache_stats()
+        )
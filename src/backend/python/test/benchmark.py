@@ -0,0 +1,705 @@
+"""Helper script to measure the performance of parsing/processing.
+
+Besides measuring a single protocol, this module provides a benchmark suite
+that runs on synthetic protocols of several sizes (see test.synthetic). The
+results of the suite are stored as JSON and can be compared against the
+results of a previous run in order to detect throughput regressions. The
+memory retained by the parsed speeches is reported in bytes per speech.
+"""
+
+
+# Python imports
+import gc
+import os
+import json
+import time
+import pickle
+import platform
+import tempfile
+import threading
+import statistics
+import tracemalloc
+from typing import Callable, List, Dict, Any, Tuple
+
+
+# 3rd party modules
+import lxml.etree
+
+
+# Local imports
+import test.synthetic as synthetic
+import src.modules.schema as schema
+import src.modules.columns as columns
+import src.modules.parsing as parsing
+import src.modules.database as database
+import src.modules.sentiment as sentiment
+import src.modules.processing as processing
+import src.modules.serialization as serialization
+import src.modules.myexceptions as myexceptions
+
+
+# Sizes of the synthetic protocols used by the benchmark suite
+SIZES = [
+    dict(
+        name="small", agenda_items=2, speeches_per_item=5,
+        interjections_per_speech=5, paragraph_length=40
+    ),
+    dict(
+        name="medium", agenda_items=10, speeches_per_item=10,
+        interjections_per_speech=15, paragraph_length=80
+    ),
+    dict(
+        name="large", agenda_items=20, speeches_per_item=20,
+        interjections_per_speech=40, paragraph_length=120
+    )
+]
+# Synthetic corpus used for measuring the serialization of speeches
+CORPUS = dict(
+    name="corpus", agenda_items=100, speeches_per_item=100,
+    interjections_per_speech=10, paragraph_length=40
+)
+# Protocol whose speeches are replicated to fill the database for /info
+INFO_CORPUS = dict(
+    name="info", agenda_items=1, speeches_per_item=10,
+    interjections_per_speech=2, paragraph_length=10
+)
+# Numbers of speeches in the database when measuring /info
+INFO_SIZES = [10000, 100000, 1000000]
+# Median latency of the database statistics of /info in seconds
+INFO_BUDGET = 0.005
+# Database used for measuring inserts (never the production database)
+BENCHMARK_DATABASE = "bundestag_benchmark"
+# Relative loss of throughput that is reported as regression
+REGRESSION_TOLERANCE = 0.1
+
+
+def __measure(
+        func: Callable[[], None], repetitions: int,
+        setup: Callable[[], None] = None
+) -> List[float]:
+    """Call the given function repeatedly and measure every call.
+
+    Args:
+        func (Callable[[], None]): function to measure
+        repetitions (int): number of calls
+        setup (Callable[[], None], optional): called (unmeasured) before
+            every call. Defaults to None.
+
+    Returns:
+        List[float]: wall time of every call in seconds
+
+    """
+    timings = []
+    for _ in range(repetitions):
+        if setup is not None:
+            setup()
+        ts_start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - ts_start)
+    return timings
+
+
+def __report(title: str, timings: List[float], speeches: int = None) -> None:
+    """Print a summary of the given timings.
+
+    Args:
+        title (str): description of the measurement
+        timings (List[float]): wall times in seconds
+        speeches (int, optional): number of speeches processed per call.
+            If given, the throughput is printed as well. Defaults to None.
+
+    """
+    summary = "{:<40} median {:8.2f} ms  min {:8.2f} ms  max {:8.2f} ms"
+    summary = summary.format(
+        title, statistics.median(timings) * 1000,
+        min(timings) * 1000, max(timings) * 1000
+    )
+    if speeches is not None:
+        summary += "  {:10.1f} speeches/s".format(
+            speeches / statistics.median(timings)
+        )
+    print(summary)
+
+
+def __measure_memory(
+        protocol_file: str, dtd_file: str, columnar: bool = False
+) -> float:
+    """Return the memory retained by the parsed speeches of a protocol.
+
+    The memory is traced while the protocol is parsed and the parsed
+    speeches are still referenced. Temporary objects of the parser are not
+    included.
+
+    Args:
+        protocol_file (str): protocol to parse
+        dtd_file (str): document type definition (loaded beforehand)
+        columnar (bool, optional): convert the contents of the speeches
+            into ColumnarSpeechContent. Defaults to False.
+
+    Returns:
+        float: retained memory in bytes per speech
+
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        speeches = parsing.get_speeches(protocol_file, dtd_file)
+        if columnar:
+            for speech in speeches:
+                speech.content = columns.ColumnarSpeechContent.from_content(
+                    speech.content
+                )
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return retained / len(speeches)
+
+
+def __parse_uncached(protocol_file: str, dtd_file: str) -> None:
+    """Parse the protocol the way it was done before the DTD cache existed.
+
+    The document type definition is loaded from scratch and the protocol is
+    parsed a second time for the validation.
+
+    Args:
+        protocol_file (str): protocol to parse
+        dtd_file (str): document type definition
+
+    """
+    parsing.clear_dtd_cache()
+    lxml.etree.parse(protocol_file)
+    parsing.get_speeches(protocol_file, dtd_file)
+
+
+def run(protocol_file: str, dtd_file: str, repetitions: int) -> None:
+    """Measure the time that is required to parse a single protocol.
+
+    Args:
+        protocol_file (str): protocol to parse
+        dtd_file (str): document type definition
+        repetitions (int): number of measurements per variant
+
+    """
+    print("Parsing {} ({} repetitions)".format(protocol_file, repetitions))
+    __report("before (DTD per protocol, two parses)", __measure(
+        lambda: __parse_uncached(protocol_file, dtd_file), repetitions
+    ))
+    parsing.get_speeches(protocol_file, dtd_file)
+    __report("after (shared DTD, single parse)", __measure(
+        lambda: parsing.get_speeches(protocol_file, dtd_file), repetitions
+    ))
+    for title, columnar in [
+            ("memory of parsed speeches", False),
+            ("memory of columnar speeches", True)
+    ]:
+        print("{:<40} {:10.0f} bytes/speech".format(
+            title, __measure_memory(protocol_file, dtd_file, columnar)
+        ))
+    speeches = lxml.etree.parse(protocol_file).findall(
+        ".//tagesordnungspunkt/rede"
+    )
+    print("Lookups of {} speeches (times per speech)".format(len(speeches)))
+    for title, lookup in [
+            ("string paths", __lookup_paths),
+            ("compiled XPath registry", __lookup_registry)
+    ]:
+        timings = __measure(
+            lambda func=lookup: [func(speech) for speech in speeches],
+            repetitions
+        )
+        __report(title, [timing / len(speeches) for timing in timings])
+    parsed = parsing.get_speeches(protocol_file, dtd_file)
+    print("Sentiment of {} speeches".format(len(parsed)))
+    for title, engine, cached in [
+            (sentiment.TextBlobEngine.NAME, sentiment.TextBlobEngine.NAME,
+             False),
+            (sentiment.LexiconEngine.NAME, sentiment.LexiconEngine.NAME,
+             False),
+            ("textblob (cached)", sentiment.TextBlobEngine.NAME, True)
+    ]:
+        try:
+            timings = __measure(
+                lambda: processing.analyze_speeches(parsed), repetitions,
+                __configure_analysis(engine, 0, parsed if cached else None)
+            )
+        except myexceptions.SpeechAnalysisException as exception:
+            print("{:<40} failed: {}".format(
+                title, type(exception.__cause__).__name__
+            ))
+            continue
+        __report(title, timings, len(parsed))
+    processing.configure_engine(sentiment.TextBlobEngine.NAME)
+    processing.configure_sentiment_cache(processing.SENTIMENT_CACHE_SIZE)
+
+
+def __lookup_paths(speech: lxml.etree.ElementBase) -> None:
+    """Run the lookups of a speech with string paths.
+
+    Args:
+        speech (lxml.etree.ElementBase): speech element
+
+    """
+    speaker = speech.find(".//redner")
+    for path in ["./name/vorname", "./name/nachname", "./name/fraktion"]:
+        speaker.find(path)
+    for elem in speech:
+        if elem.tag == "p" and elem.get("klasse") == "redner":
+            for field in ["vorname", "nachname", "fraktion"]:
+                elem.find(".//redner/name/{}".format(field))
+
+
+def __lookup_registry(speech: lxml.etree.ElementBase) -> None:
+    """Run the lookups of a speech with the compiled XPath registry.
+
+    Args:
+        speech (lxml.etree.ElementBase): speech element
+
+    """
+    find = getattr(parsing, "__find")
+    speaker = find("speech_speaker", speech)
+    for query in ["speaker_firstname", "speaker_lastname", "speaker_party"]:
+        find(query, speaker)
+    for elem in speech:
+        if elem.tag == "p" and elem.get("klasse") == "redner":
+            for query in ["entry_firstname", "entry_lastname", "entry_party"]:
+                find(query, elem)
+
+
+def run_suite(
+        dtd_file: str, output_file: str, repetitions: int,
+        baseline_file: str = None
+) -> None:
+    """Run the benchmark suite on synthetic protocols of several sizes.
+
+    Parsing, processing (serial with both sentiment engines, in a pool of
+    one worker per core and with cached sentiments), the JSON conversion and
+    (if a database is configured via the environment variables DB_HOST,
+    DB_PORT, DB_USER and DB_PASSWORD) the insertion of speeches are measured
+    for every size. The serialization of speeches is measured on a corpus of
+    10000 speeches. With a database, the latency of the statistics of /info
+    is measured for every number of speeches of INFO_SIZES.
+
+    Args:
+        dtd_file (str): document type definition
+        output_file (str): destination of the results (JSON format)
+        repetitions (int): number of measurements per benchmark
+        baseline_file (str, optional): results of a previous run to compare
+            with. Defaults to None.
+
+    """
+    db_client = __connect_database()
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            __run_size(size, directory, dtd_file, repetitions, db_client)
+            for size in SIZES
+        ]
+        results.append(__run_serialization(directory, dtd_file, repetitions))
+        if db_client is not None:
+            results.extend(
+                __run_info(db_client, directory, dtd_file, repetitions)
+            )
+    processing.configure_workers(0)
+    processing.configure_sentiment_cache(processing.SENTIMENT_CACHE_SIZE)
+    if db_client is not None:
+        db_client.client.drop_database(BENCHMARK_DATABASE)
+    report = dict(
+        created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        python=platform.python_version(),
+        machine=platform.machine(),
+        repetitions=repetitions,
+        results=results
+    )
+    if output_file is not None:
+        with open(output_file, "w") as out:
+            json.dump(report, out, indent=4)
+        print("Benchmark results in {}".format(output_file))
+    if baseline_file is not None:
+        with open(baseline_file, "r") as baseline:
+            __compare(report, json.load(baseline))
+
+
+def __run_size(
+        size: Dict[str, Any], directory: str, dtd_file: str,
+        repetitions: int, db_client: database.Database
+) -> Dict[str, Any]:
+    """Run all benchmarks on a synthetic protocol of the given size.
+
+    Args:
+        size (Dict[str, Any]): name and parameters of the protocol
+        directory (str): directory for the generated protocol
+        dtd_file (str): document type definition
+        repetitions (int): number of measurements per benchmark
+        db_client (database.Database): database client or None
+
+    Returns:
+        Dict[str, Any]: parameters and results of all benchmarks
+
+    """
+    params = {key: value for key, value in size.items() if key != "name"}
+    protocol_file = os.path.join(directory, "{}.xml".format(size["name"]))
+    synthetic.ProtocolGenerator(**params).write(protocol_file)
+    speeches = parsing.get_speeches(protocol_file, dtd_file)
+    documents = [speech.to_json() for speech in speeches]
+    columnar = [
+        columns.ColumnarSpeechContent.speech_from_json(doc)
+        for doc in documents
+    ]
+    benchmarks = dict(
+        get_speeches=(
+            lambda: parsing.get_speeches(protocol_file, dtd_file), None
+        ),
+        iter_speeches=(
+            lambda: list(parsing.iter_speeches(protocol_file, dtd_file)), None
+        ),
+        analyze_speeches=(
+            lambda: processing.analyze_speeches(speeches),
+            __configure_analysis(sentiment.TextBlobEngine.NAME, 0)
+        ),
+        analyze_speeches_lexicon=(
+            lambda: processing.analyze_speeches(speeches),
+            __configure_analysis(sentiment.LexiconEngine.NAME, 0)
+        ),
+        analyze_speeches_workers=(
+            lambda: processing.analyze_speeches(speeches),
+            __configure_analysis(
+                sentiment.TextBlobEngine.NAME, os.cpu_count()
+            )
+        ),
+        analyze_speeches_cached=(
+            lambda: processing.analyze_speeches(speeches),
+            __configure_analysis(sentiment.TextBlobEngine.NAME, 0, speeches)
+        ),
+        to_json=(lambda: [speech.to_json() for speech in speeches], None),
+        from_json=(
+            lambda: [schema.Speech.from_json(doc) for doc in documents], None
+        ),
+        from_json_columnar=(
+            lambda: [
+                columns.ColumnarSpeechContent.speech_from_json(doc)
+                for doc in documents
+            ], None
+        ),
+        pickle=(lambda: pickle.loads(pickle.dumps(speeches)), None),
+        pickle_columnar=(lambda: pickle.loads(pickle.dumps(columnar)), None)
+    )
+    if db_client is not None:
+        benchmarks.update(
+            speech_insert=(
+                lambda: [
+                    db_client.speech_insert(speech) for speech in speeches
+                ],
+                lambda: __reset_speeches(db_client)
+            ),
+            speech_insert_collection=(
+                lambda: db_client.speech_insert_collection(speeches),
+                lambda: __reset_speeches(db_client)
+            ),
+            speech_insert_collection_duplicates=(
+                lambda: db_client.speech_insert_collection(speeches),
+                lambda: __reset_speeches(db_client, speeches)
+            )
+        )
+    result = dict(
+        size=size["name"], params=params, speeches=len(speeches),
+        protocol_bytes=os.path.getsize(protocol_file),
+        benchmarks=__run_benchmarks(
+            size["name"], benchmarks, repetitions, len(speeches)
+        )
+    )
+    result["bytes_per_speech"] = __measure_memory(protocol_file, dtd_file)
+    result["bytes_per_speech_columnar"] = __measure_memory(
+        protocol_file, dtd_file, True
+    )
+    for title, key in [
+            ("memory", "bytes_per_speech"),
+            ("memory columnar", "bytes_per_speech_columnar")
+    ]:
+        print("{:<40} {:10.0f} bytes/speech".format(
+            "{} {}".format(size["name"], title), result[key]
+        ))
+    return result
+
+
+def __run_serialization(
+        directory: str, dtd_file: str, repetitions: int
+) -> Dict[str, Any]:
+    """Run the serialization benchmarks on the synthetic corpus.
+
+    The conversion of speeches by their own methods is compared with the
+    single pass conversion of module serialization. Reading the meta data of
+    decoded speeches is compared with reading it from lazy proxies.
+
+    Args:
+        directory (str): directory for the generated protocol
+        dtd_file (str): document type definition
+        repetitions (int): number of measurements per benchmark
+
+    Returns:
+        Dict[str, Any]: parameters and results of all benchmarks
+
+    """
+    params = {key: value for key, value in CORPUS.items() if key != "name"}
+    protocol_file = os.path.join(directory, "{}.xml".format(CORPUS["name"]))
+    synthetic.ProtocolGenerator(**params).write(protocol_file)
+    speeches = parsing.get_speeches(protocol_file, dtd_file)
+    documents = [speech.to_json() for speech in speeches]
+    encoded = [serialization.speech_to_bson(speech) for speech in speeches]
+    benchmarks = dict(
+        to_json=(lambda: [speech.to_json() for speech in speeches], None),
+        to_document=(lambda: [
+            serialization.speech_to_document(speech) for speech in speeches
+        ], None),
+        to_bson=(lambda: [
+            serialization.speech_to_bson(speech) for speech in speeches
+        ], None),
+        to_json_bytes=(lambda: [
+            serialization.speech_to_json_bytes(speech) for speech in speeches
+        ], None),
+        from_json=(
+            lambda: [schema.Speech.from_json(doc) for doc in documents], None
+        ),
+        from_document=(lambda: [
+            serialization.speech_from_document(doc) for doc in documents
+        ], None),
+        from_bson=(lambda: [
+            serialization.speech_from_bson(data) for data in encoded
+        ], None),
+        meta_from_document=(lambda: [
+            serialization.speech_from_document(doc).meta["date"]
+            for doc in documents
+        ], None),
+        meta_from_proxy=(lambda: [
+            serialization.SpeechProxy(doc).meta["date"] for doc in documents
+        ], None)
+    )
+    return dict(
+        size=CORPUS["name"], params=params, speeches=len(speeches),
+        protocol_bytes=os.path.getsize(protocol_file),
+        benchmarks=__run_benchmarks(
+            CORPUS["name"], benchmarks, repetitions, len(speeches)
+        )
+    )
+
+
+def __run_info(
+        db_client: database.Database, directory: str, dtd_file: str,
+        repetitions: int
+) -> List[Dict[str, Any]]:
+    """Measure the latency of the database statistics of /info.
+
+    The benchmark database is filled with copies of the speeches of a small
+    synthetic protocol until it contains the number of speeches of every
+    entry of INFO_SIZES. Medians above INFO_BUDGET are reported.
+
+    Args:
+        db_client (database.Database): database client
+        directory (str): directory for the generated protocol
+        dtd_file (str): document type definition
+        repetitions (int): number of measurements per size
+
+    Returns:
+        List[Dict[str, Any]]: results for every number of speeches
+
+    """
+    params = {
+        key: value for key, value in INFO_CORPUS.items() if key != "name"
+    }
+    protocol_file = os.path.join(
+        directory, "{}.xml".format(INFO_CORPUS["name"])
+    )
+    synthetic.ProtocolGenerator(**params).write(protocol_file)
+    documents = [
+        serialization.speech_to_document(speech)
+        for speech in parsing.get_speeches(protocol_file, dtd_file)
+    ]
+    __reset_speeches(db_client)
+    results = []
+    stored = 0
+    for size in INFO_SIZES:
+        while stored < size:
+            count = min(database.Database.INSERT_CHUNK_SIZE, size - stored)
+            db_client.speeches.insert_many([
+                dict(
+                    documents[(stored + index) % len(documents)],
+                    speech_id="INFO{:08d}".format(stored + index)
+                ) for index in range(count)
+            ], ordered=False)
+            stored += count
+        title = "{} {} speeches".format(INFO_CORPUS["name"], size)
+        timings = __measure(db_client.meta_stats, repetitions)
+        __report("{} meta_stats".format(title), timings)
+        median = statistics.median(timings)
+        if median > INFO_BUDGET:
+            print("{} exceeds the budget of {:.2f} ms".format(
+                title, INFO_BUDGET * 1000
+            ))
+        results.append(dict(
+            size="{}_{}".format(INFO_CORPUS["name"], size),
+            params=dict(speeches=size), speeches=size,
+            benchmarks=dict(meta_stats=dict(
+                median=median, min=min(timings), max=max(timings)
+            ))
+        ))
+    db_client.speeches.drop()
+    return results
+
+
+def __run_benchmarks(
+        title: str,
+        benchmarks: Dict[str, Tuple[Callable[[], Any], Callable[[], None]]],
+        repetitions: int, speeches: int
+) -> Dict[str, Any]:
+    """Measure and report multiple benchmarks.
+
+    Args:
+        title (str): prefix of the reported benchmarks
+        benchmarks (Dict[str, Tuple[Callable[[], Any], Callable[[], None]]]):
+            function to measure and its setup (or None) by name
+        repetitions (int): number of measurements per benchmark
+        speeches (int): number of speeches processed per call
+
+    Returns:
+        Dict[str, Any]: results of the benchmarks by name
+
+    """
+    results = {}
+    for name, (func, setup) in benchmarks.items():
+        try:
+            timings = __measure(func, repetitions, setup)
+        except myexceptions.SpeechAnalysisException as exception:
+            error = type(exception.__cause__).__name__
+            print("{:<40} failed: {}".format(
+                "{} {}".format(title, name), error
+            ))
+            results[name] = dict(error=error)
+            continue
+        __report("{} {}".format(title, name), timings, speeches)
+        results[name] = dict(
+            median=statistics.median(timings), min=min(timings),
+            max=max(timings),
+            speeches_per_second=speeches / statistics.median(timings)
+        )
+    return results
+
+
+def __configure_analysis(
+        engine: str, workers: int, cached: List[schema.Speech] = None
+) -> Callable[[], None]:
+    """Return a function that configures the analysis of speeches.
+
+    Without cached speeches, the sentiment cache is disabled, so every call
+    analyzes all speeches.
+
+    Args:
+        engine (str): name of the sentiment engine
+        workers (int): number of worker processes
+        cached (List[schema.Speech], optional): speeches whose sentiments
+            are cached before the first call. Defaults to None.
+
+    Returns:
+        Callable[[], None]: sets engine, workers (keeps a running pool) and
+            the sentiment cache
+
+    """
+    def configure() -> None:
+        processing.configure_workers(workers)
+        processing.configure_engine(engine)
+        if cached is None:
+            processing.configure_sentiment_cache(0)
+        elif not processing.get_sentiment_cache_stats():
+            processing.configure_sentiment_cache(
+                processing.SENTIMENT_CACHE_SIZE
+            )
+            processing.analyze_speeches(cached)
+    return configure
+
+
+def __connect_database() -> database.Database:
+    """Connect to the database that is configured in the environment.
+
+    The client connects to a separate database, so the benchmark never
+    touches the data of the backend.
+
+    Returns:
+        database.Database: database client or None if not configured
+
+    """
+    if "DB_HOST" not in os.environ:
+        return None
+    try:
+        db_client = database.Database((
+            os.environ["DB_HOST"], int(os.environ.get("DB_PORT", 27017)),
+            False, os.environ.get("DB_USER"), os.environ.get("DB_PASSWORD")
+        ), threading.Semaphore(0), threading.Semaphore(0), BENCHMARK_DATABASE)
+    except myexceptions.DatabaseInitException:
+        print("Could not connect to the database. Skipping inserts.")
+        return None
+    db_client.ensure_indexes()
+    return db_client
+
+
+def __reset_speeches(
+        db_client: database.Database, speeches: List[schema.Speech] = None
+) -> None:
+    """Drop the speeches, summary and speakers of the benchmark database.
+
+    The indexes are recreated afterwards.
+
+    Args:
+        db_client (database.Database): database client
+        speeches (List[schema.Speech], optional): speeches to insert again
+            afterwards. Defaults to None.
+
+    """
+    db_client.speeches.drop()
+    db_client.summary.collection.drop()
+    db_client.speakers.collection.drop()
+    db_client.ensure_indexes()
+    if speeches:
+        db_client.speech_insert_collection(speeches)
+
+
+def __compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print all benchmarks whose throughput dropped compared to a baseline.
+
+    The memory per speech of both runs is printed for every size as well.
+    Growing memory counts as regression, too.
+
+    Args:
+        report (Dict[str, Any]): results of the current run
+        baseline (Dict[str, Any]): results of a previous run
+
+    """
+    previous = {
+        (result["size"], name): values.get("speeches_per_second")
+        for result in baseline["results"]
+        for name, values in result["benchmarks"].items()
+    }
+    regressions = 0
+    for result in report["results"]:
+        for name, values in result["benchmarks"].items():
+            before = previous.get((result["size"], name))
+            after = values.get("speeches_per_second")
+            if not before or not after:
+                continue
+            if after < before * (1 - REGRESSION_TOLERANCE):
+                regressions += 1
+                print("Regression in {} {}: {:.1f} -> {:.1f} {}".format(
+                    result["size"], name, before, after, "speeches/s"
+                ))
+    memory = {
+        result["size"]: result.get("bytes_per_speech")
+        for result in baseline["results"]
+    }
+    for result in report["results"]:
+        before = memory.get(result["size"])
+        after = result.get("bytes_per_speech")
+        if not before or not after:
+            continue
+        print("Memory of {}: {:.0f} -> {:.0f} bytes/speech".format(
+            result["size"], before, after
+        ))
+        if after > before * (1 + REGRESSION_TOLERANCE):
+            regressions += 1
+    print("Found {} regressions compared to the baseline".format(regressions))
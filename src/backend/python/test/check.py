@@ -2,8 +2,12 @@
 
 
 # Python imports
+import os
+import math
 import time
 import json
+import concurrent.futures
+from typing import Dict, Any, List
 
 
 # Local imports
@@ -11,9 +15,13 @@ import src.modules.parsing as parsing
 import src.modules.processing as processing
 
 
+# Maximum size of the parse cache (in bytes)
+CACHE_SIZE = 1 << 30
+
+
 def run(
         protocol_file: str, dtd_file: str, output_file: str,
-        parse_only: bool
+        parse_only: bool, cache_directory: str = None
 ) -> None:
     """Parse and process speeches of test protocol.
 
@@ -25,8 +33,11 @@ def run(
         dtd_file (str): document type definition
         output_file (str): output file
         parse_only (bool): skip processing
+        cache_directory (str, optional): directory of the parse cache.
+            Defaults to None (no cache).
 
     """
+    parsing.configure_cache(cache_directory, CACHE_SIZE)
     ts_start = time.time()
     speeches = parsing.get_speeches(protocol_file, dtd_file)
     print("Parsing speeches took {:3.2f} seconds".format(time.time()-ts_start))
@@ -41,3 +52,140 @@ def run(
     with open(output_file, "a") as out:
         json.dump(speeches_json, out, indent=4)
     print("Check result in {}".format(output_file))
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def run_directory(
+        protocol_dir: str, dtd_file: str, output_file: str,
+        parse_only: bool, workers: int, cache_directory: str = None
+) -> None:
+    """Parse and process all protocols of a directory in parallel.
+
+    The protocols are distributed over a pool of worker processes. The
+    speeches of all protocols are merged into a single output file (JSON
+    format) that maps the filename of a protocol to its speeches. Finally, a
+    summary about throughput, timings and failures is printed.
+
+    Args:
+        protocol_dir (str): directory containing the protocols
+        dtd_file (str): document type definition
+        output_file (str): output file
+        parse_only (bool): skip processing
+        workers (int): number of worker processes (0 for one per CPU)
+        cache_directory (str, optional): directory of the parse cache.
+            Defaults to None (no cache).
+
+    """
+    protocols = sorted(
+        os.path.join(protocol_dir, fname) for fname in os.listdir(protocol_dir)
+        if os.path.isfile(os.path.join(protocol_dir, fname))
+    )
+    workers = workers or os.cpu_count()
+    print("Checking {} protocols with {} workers".format(
+        len(protocols), workers
+    ))
+    ts_start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=parsing.configure_cache,
+            initargs=(cache_directory, CACHE_SIZE)
+    ) as executor:
+        results = list(executor.map(
+            __check_protocol, protocols,
+            [dtd_file] * len(protocols), [parse_only] * len(protocols)
+        ))
+    duration = time.perf_counter() - ts_start
+    __print_summary(results, duration)
+    if parse_only or output_file is None:
+        return
+    merged = {
+        os.path.basename(result["protocol"]): result["speeches"]
+        for result in results if result["error"] is None
+    }
+    with open(output_file, "w") as out:
+        json.dump(merged, out, indent=4)
+    print("Check result in {}".format(output_file))
+# pylint: enable=too-many-arguments,too-many-positional-arguments
+
+
+def __check_protocol(
+        protocol_file: str, dtd_file: str, parse_only: bool
+) -> Dict[str, Any]:
+    """Parse and process a single protocol inside a worker process.
+
+    Args:
+        protocol_file (str): protocol to parse
+        dtd_file (str): document type definition
+        parse_only (bool): skip processing
+
+    Returns:
+        Dict[str, Any]: speeches, timings and error of the protocol
+
+    """
+    result = dict(
+        protocol=protocol_file, speeches=None, error=None,
+        parse_time=None, analysis_time=None
+    )
+    try:
+        ts_start = time.perf_counter()
+        speeches = parsing.get_speeches(protocol_file, dtd_file)
+        result["parse_time"] = time.perf_counter() - ts_start
+        if not parse_only:
+            ts_start = time.perf_counter()
+            processing.analyze_speeches(speeches)
+            result["analysis_time"] = time.perf_counter() - ts_start
+        result["speeches"] = [speech.to_json() for speech in speeches]
+    except Exception as exception:  # pylint: disable=broad-except
+        result["error"] = repr(exception.__cause__ or exception)
+    return result
+
+
+def __percentile(values: List[float], percent: float) -> float:
+    """Return the percentile of the given values (nearest-rank method).
+
+    Args:
+        values (List[float]): values
+        percent (float): percentile in the range (0, 100]
+
+    Returns:
+        float: percentile
+
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def __print_summary(results: List[Dict[str, Any]], duration: float) -> None:
+    """Print throughput, timings and failures of a parallel check.
+
+    Args:
+        results (List[Dict[str, Any]]): results of all protocols
+        duration (float): wall time of the entire check in seconds
+
+    """
+    succeeded = [result for result in results if result["error"] is None]
+    failed = [result for result in results if result["error"] is not None]
+    speeches = sum(len(result["speeches"]) for result in succeeded)
+    print("Checked {} protocols ({} speeches) in {:3.2f} seconds".format(
+        len(results), speeches, duration
+    ))
+    print("Throughput: {:3.2f} protocols/s, {:3.2f} speeches/s".format(
+        len(results) / duration, speeches / duration
+    ))
+    for key, title in [
+            ("parse_time", "Parsing"), ("analysis_time", "Analysis")
+    ]:
+        timings = [
+            result[key] for result in succeeded if result[key] is not None
+        ]
+        if not timings:
+            continue
+        print(
+            "{} per protocol: p50 {:3.2f}s, p95 {:3.2f}s, max {:3.2f}s".format(
+                title, __percentile(timings, 50), __percentile(timings, 95),
+                max(timings)
+            )
+        )
+    print("Failures: {}".format(len(failed)))
+    for result in failed:
+        print("  {}: {}".format(result["protocol"], result["error"]))
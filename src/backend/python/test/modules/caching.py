@@ -0,0 +1,188 @@
+"""Unittest for module caching."""
+
+
+# Python imports
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+
+# Local imports
+import src.modules.schema as schema
+import src.modules.caching as caching
+import src.modules.parsing as parsing
+import src.modules.database as database
+import src.modules.updating as updating
+
+
+class TestClass(unittest.TestCase):
+    """Unittest class."""
+
+    DTD_FILE = "data/protocol.dtd"
+    PROTOCOL = "data/protocol.xml"
+
+    def setUp(self):
+        """Set test objects up before each test case."""
+        self.directory = tempfile.mkdtemp()
+        self.cache = caching.ParseCache(self.directory, 1 << 20)
+        self.speech = schema.Speech(
+            meta=dict(name="John Doe", party="", topic="", date=""),
+            content=schema.SpeechContent([schema.SpeechEntry(
+                speaker="John Doe", is_speaker=True,
+                paragraphs=[schema.SpeechParagraph(
+                    schema.SpeechParagraph.TYPE_SPEECH, "text"
+                )]
+            )]),
+            speaker_id="JohnDoe42",
+            speech_id="FooBar4711"
+        )
+
+    def tearDown(self):
+        """Clean up after each test case."""
+        parsing.configure_cache(None, 0)
+        shutil.rmtree(self.directory)
+
+    def test_key_depends_on_version(self):
+        """Test that the key changes with the version of the parser."""
+        self.assertNotEqual(
+            caching.ParseCache.key([b"protocol"], "1"),
+            caching.ParseCache.key([b"protocol"], "2")
+        )
+
+    def test_get_missing(self):
+        """Test that a missing entry is reported as None."""
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_put_get(self):
+        """Test that stored speeches are returned unchanged."""
+        self.cache.put("key", [self.speech])
+        self.assertEqual(
+            [speech.to_json() for speech in self.cache.get("key")],
+            [self.speech.to_json()]
+        )
+
+    def test_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        self.cache.put("first", [self.speech])
+        size = os.path.getsize(
+            os.path.join(self.directory, "first" + caching.ParseCache.SUFFIX)
+        )
+        self.cache.max_bytes = 2 * size
+        self.cache.put("second", [self.speech])
+        os.utime(
+            os.path.join(self.directory, "first" + caching.ParseCache.SUFFIX),
+            (0, 0)
+        )
+        self.cache.put("third", [self.speech])
+        self.assertIsNone(self.cache.get("first"))
+        self.assertIsNotNone(self.cache.get("second"))
+        self.assertIsNotNone(self.cache.get("third"))
+
+    def test_get_speeches_cached(self):
+        """Test that parsing a protocol twice returns the cached speeches."""
+        parsing.configure_cache(self.directory, 1 << 30)
+        parsed = parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        cached = parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        streamed = parsing.iter_speeches(
+            TestClass.PROTOCOL, TestClass.DTD_FILE
+        )
+        self.assertEqual(
+            [speech.to_json() for speech in parsed],
+            [speech.to_json() for speech in cached]
+        )
+        self.assertEqual(
+            [speech.to_json() for speech in parsed],
+            [speech.to_json() for speech in streamed]
+        )
+
+    def test_iter_speeches_stream_not_cached(self):
+        """Test that streamed protocols bypass the cache."""
+        parsing.configure_cache(self.directory, 1 << 30)
+        with open(TestClass.PROTOCOL, "rb") as protocol:
+            list(parsing.iter_speeches(protocol, TestClass.DTD_FILE))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_iter_speeches_cached_copies(self):
+        """Test that changes of yielded speeches do not reach the cache."""
+        parsing.configure_cache(self.directory, 1 << 30)
+        parsed = parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        os.remove(os.path.join(self.directory, os.listdir(self.directory)[0]))
+        for speech in parsing.iter_speeches(
+                TestClass.PROTOCOL, TestClass.DTD_FILE
+        ):
+            speech.analysis.update(0.42, 0.47, 11)
+        cached = parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        self.assertEqual(
+            [speech.to_json() for speech in parsed],
+            [speech.to_json() for speech in cached]
+        )
+
+    def test_updater_ingest_cached(self):
+        """Test that ingesting a protocol again is a hit of the cache."""
+        parsing.configure_cache(self.directory, 1 << 30)
+        protocols = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, protocols)
+        client = unittest.mock.create_autospec(
+            database.Database, instance=True
+        )
+        updater = updating.Updater(
+            threading.Semaphore(0), client,
+            (TestClass.DTD_FILE, protocols), threading.Semaphore(0)
+        )
+        protocol = schema.Protocol("url", "protocol.xml")
+        with open(TestClass.PROTOCOL, "rb") as protocol_file:
+            data = protocol_file.read()
+        updater.ingest(protocol, data)
+        self.assertEqual(
+            parsing.get_cache_stats(), dict(hits=0, misses=1)
+        )
+        updater.ingest(protocol, data)
+        self.assertEqual(
+            parsing.get_cache_stats(), dict(hits=1, misses=1)
+        )
+        first, second = client.speech_insert_collection.call_args_list
+        self.assertEqual(
+            [speech.to_json() for speech in first.args[0]],
+            [speech.to_json() for speech in second.args[0]]
+        )
+        self.assertTrue(
+            os.path.isfile(os.path.join(protocols, "protocol.xml"))
+        )
+
+    def test_sentiment_key(self):
+        """Test that the key ignores whitespace but depends on the engine."""
+        key = caching.SentimentCache.key("Das ist gut.", "lexicon")
+        self.assertEqual(
+            caching.SentimentCache.key(" Das  ist\ngut. ", "lexicon"), key
+        )
+        self.assertNotEqual(
+            caching.SentimentCache.key("Das ist gut.", "textblob"), key
+        )
+
+    def test_sentiment_eviction(self):
+        """Test that the least recently used sentiments are evicted."""
+        cache = caching.SentimentCache(2)
+        cache.put_many([("a", (0.1, 0.2)), ("b", (0.3, 0.4))])
+        self.assertEqual(cache.get("a"), (0.1, 0.2))
+        cache.put_many([("c", (0.5, 0.6))])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), (0.5, 0.6))
+        self.assertEqual(cache.stats(), dict(hits=2, misses=1, entries=2))
+
+    def test_sentiment_persistent(self):
+        """Test that sentiments in the database survive the cache."""
+        database_file = os.path.join(self.directory, "sentiments.sqlite")
+        cache = caching.SentimentCache(0, database_file)
+        cache.put_many([("a", (0.1, 0.2))])
+        cache.close()
+        cache = caching.SentimentCache(10, database_file)
+        try:
+            self.assertEqual(cache.get("a"), (0.1, 0.2))
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.stats()["entries"], 1)
+        finally:
+            cache.close()
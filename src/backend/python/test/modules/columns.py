@@ -0,0 +1,71 @@
+"""Unittest for module columns."""
+
+
+# Python imports
+import unittest
+
+
+# Local imports
+import src.modules.schema as schema
+import src.modules.columns as columns
+
+
+class TestClass(unittest.TestCase):
+    """Unittest class."""
+
+    def test_columnar_speech_content(self):
+        """Test that the columnar content keeps the contract of the content.
+
+        The paragraphs of the speaker are interrupted by another deputy, a
+        comment and a paragraph without text.
+        """
+        content = schema.SpeechContent([
+            schema.SpeechEntry("John Doe", True, [
+                schema.SpeechParagraph(schema.ParagraphType.SPEECH, "first"),
+                schema.SpeechParagraph(schema.ParagraphType.COMMENT, "comment")
+            ]),
+            schema.SpeechEntry("Jane Doe", False, [
+                schema.SpeechParagraph(schema.ParagraphType.SPEECH, "other")
+            ]),
+            schema.SpeechEntry("John Doe", True, [
+                schema.SpeechParagraph(schema.ParagraphType.SPEECH, None),
+                schema.SpeechParagraph(schema.ParagraphType.SPEECH, "last")
+            ])
+        ])
+        columnar = columns.ColumnarSpeechContent.from_content(content)
+        self.assertEqual(columnar.get_speakers_text(), "first  last")
+        self.assertEqual(
+            columnar.get_speakers_text_view().tobytes(), b"first  last"
+        )
+        self.assertEqual(
+            columnar.get_speakers_text_length(),
+            content.get_speakers_text_length()
+        )
+        self.assertEqual(columnar.get_comments(), ["comment"])
+        self.assertEqual(columnar.get_number_of_comments(), 1)
+        self.assertFalse(columnar.assert_valid())
+        self.assertEqual(columnar.to_json(), content.to_json())
+        self.assertEqual(
+            columns.ColumnarSpeechContent.from_json(
+                content.to_json()
+            ).to_json(),
+            content.to_json()
+        )
+
+    def test_speech_columnar(self):
+        """Test conversion of class Speech with a columnar content."""
+        original = schema.Speech(
+            meta={"foo": "bar"},
+            content=schema.SpeechContent([schema.SpeechEntry(
+                "John Doe", True, [schema.SpeechParagraph(
+                    schema.ParagraphType.SPEECH, "text"
+                )]
+            )]),
+            speaker_id="JohnDoe42",
+            speech_id="FooBar4711"
+        ).to_json()
+        duplicate = columns.ColumnarSpeechContent.speech_from_json(original)
+        self.assertIsInstance(
+            duplicate.content, columns.ColumnarSpeechContent
+        )
+        self.assertEqual(original, duplicate.to_json())
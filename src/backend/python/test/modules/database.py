@@ -0,0 +1,279 @@
+"""Unittest for module database.
+
+The tests run against an in-memory database of mongomock, which executes
+the queries and aggregation pipelines of the database client.
+"""
+
+
+# Python imports
+import threading
+import unittest
+import unittest.mock
+
+
+# 3rd party modules
+import mongomock
+import mongomock.collection
+
+
+# Local imports
+import src.modules.schema as schema
+import src.modules.parsing as parsing
+import src.modules.database as database
+import src.modules.serialization as serialization
+
+
+class TestClass(unittest.TestCase):
+    """Unittest class."""
+
+    DTD_FILE = "data/protocol.dtd"
+    PROTOCOL = "data/protocol.xml"
+    # Bulk update of mongomock, which does not know the option 'sort' that
+    # pymongo passes since version 4.11
+    MONGOMOCK_ADD_UPDATE = mongomock.collection.BulkOperationBuilder.add_update
+
+    @staticmethod
+    def add_update(builder, *args, **kwargs):
+        """Add an update to a bulk of mongomock without the option sort."""
+        kwargs.pop("sort", None)
+        return TestClass.MONGOMOCK_ADD_UPDATE(builder, *args, **kwargs)
+
+    def setUp(self):
+        """Set test objects up before each test case."""
+        patcher = unittest.mock.patch.object(
+            mongomock.collection.BulkOperationBuilder, "add_update",
+            TestClass.add_update
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with unittest.mock.patch(
+                "pymongo.MongoClient", mongomock.MongoClient
+        ), unittest.mock.patch.object(mongomock.database.Database, "command"):
+            self.database = database.Database(
+                ("localhost", 27017, False, None, None),
+                threading.Semaphore(0), threading.Semaphore(0), "test"
+            )
+        self.database.speeches.create_index("speech_id", unique=True)
+        self.speeches = parsing.get_speeches(
+            TestClass.PROTOCOL, TestClass.DTD_FILE
+        )
+        for index, speech in enumerate(self.speeches):
+            speech.analysis.update(
+                (index % 21 - 10) / 10, (index % 11) / 10, index % 4
+            )
+
+    def test_insert_collection_duplicates(self):
+        """Test that rejected duplicates are counted but not inserted."""
+        self.database.speech_insert_collection(self.speeches[:10])
+        with unittest.mock.patch.object(
+                database.Database, "INSERT_CHUNK_SIZE", 50
+        ):
+            result = self.database.speech_insert_collection(self.speeches)
+        self.assertEqual(
+            result, dict(inserted=len(self.speeches) - 10, duplicates=10,
+                         failed=0)
+        )
+        self.assertEqual(
+            self.database.speeches.count_documents({}), len(self.speeches)
+        )
+        self.assertEqual(sum(
+            speaker["speeches"]
+            for speaker in self.database.meta_get_all_speakers()["speakers"]
+        ), len(self.speeches))
+
+    def test_summary_add_equals_rebuild(self):
+        """Test that the updated summary equals the rebuilt summary."""
+        with unittest.mock.patch.object(
+                database.Database, "INSERT_CHUNK_SIZE", 16
+        ):
+            self.database.speech_insert_collection(self.speeches[:40])
+            self.database.speech_insert_collection(
+                self.speeches[40:], analysis_pending=True
+            )
+        self.database.speech_update_analysis(self.speeches[40:70])
+        self.database.speech_update_analysis(self.speeches[70:], failed=True)
+        self.assertEqual(
+            self.database.speech_update_analysis(self.speeches[40:70]), 0
+        )
+        updated = self.database.summary.collection.find_one()
+        self.database.summary.rebuild(self.database.speeches)
+        rebuilt = self.database.summary.collection.find_one()
+        self.assertEqual(updated["total"], 70)
+        for key in ["polarity", "subjectivity", "number"]:
+            self.assertAlmostEqual(
+                updated[key].pop("sum"), rebuilt[key].pop("sum")
+            )
+        self.assertEqual(updated, rebuilt)
+        limits = self.database.meta_get_analysis_limits()
+        self.assertEqual(limits["total"], len(self.speeches))
+        self.assertEqual(limits["analyzed"], 70)
+        self.assertEqual(sum(limits["polarity"]["histogram"]), 70)
+
+    def test_speakers_newest_party(self):
+        """Test that the party of a speaker is taken from the newest speech."""
+        newest = self.speeches[0]
+        older = serialization.speech_from_document(
+            serialization.speech_to_document(newest)
+        )
+        older.speech_id = "ID1800100100"
+        older.meta.update(
+            party="Old", date="01.01.2010",
+            date_key=schema.ProtocolContext.date_key("01.01.2010")
+        )
+        self.database.speech_insert_collection([newest])
+        self.database.speech_insert_collection([older])
+        speakers = {
+            speaker["name"]: speaker
+            for speaker in self.database.meta_get_all_speakers()["speakers"]
+        }
+        self.assertEqual(speakers[newest.meta["name"]], dict(
+            name=newest.meta["name"], party=newest.meta["party"], speeches=2
+        ))
+        updated = list(self.database.speakers.collection.find())
+        self.database.speakers.rebuild(self.database.speeches)
+        self.assertEqual(
+            list(self.database.speakers.collection.find().sort("_id")),
+            sorted(updated, key=lambda speaker: speaker["_id"])
+        )
+        self.assertEqual(
+            self.database.meta_get_all_speakers()["speakers"],
+            list(speakers.values())
+        )
+
+    def test_speeches_exact_before_fuzzy(self):
+        """Test that the fuzzy lookup is only used without exact match."""
+        self.database.speech_insert_collection(self.speeches)
+        with unittest.mock.patch.object(
+                self.database.speakers, "get_name_keys",
+                wraps=self.database.speakers.get_name_keys
+        ) as get_name_keys:
+            exact = self.database.speech_get_speeches_for_name(
+                "Claudia Müller"
+            )
+            get_name_keys.assert_not_called()
+            self.assertEqual(self.database.speech_get_speeches_for_name(
+                "Claudia Muller"
+            ), exact)
+            get_name_keys.assert_called_once()
+            self.assertEqual(self.database.speech_get_speeches_for_name(
+                "Claudia Muller", fuzzy=False
+            ), [])
+        self.assertEqual(len(exact), 2)
+
+    def test_page_fuzzy_cursor(self):
+        """Test that the cursor of a fuzzy page keeps the similar name."""
+        self.database.speech_insert_collection(self.speeches)
+        with unittest.mock.patch.object(
+                self.database.speakers, "get_name_keys",
+                wraps=self.database.speakers.get_name_keys
+        ) as get_name_keys:
+            first = self.database.speech_get_page_for_name(
+                "Claudia Muller", 1
+            )
+            second = self.database.speech_get_page_for_name(
+                "Claudia Muller", 1, first["cursor"]
+            )
+            get_name_keys.assert_called_once()
+        self.assertTrue(first["cursor"].endswith("|claudia mueller"))
+        self.assertIsNone(second["cursor"])
+        self.assertEqual(
+            first["speeches"] + second["speeches"],
+            self.database.speech_get_page_for_name(
+                "Claudia Müller", 2
+            )["speeches"]
+        )
+
+    def test_page_cursor(self):
+        """Test that following the cursors returns all speeches in order."""
+        speeches = []
+        for index, speech in enumerate(self.speeches[:7]):
+            date = "0{}.10.2019".format(index % 3 + 1)
+            speech.meta.update(
+                name="Jane Doe", name_key=schema.Name.normalize("Jane Doe"),
+                date=date, date_key=schema.ProtocolContext.date_key(date)
+            )
+            speeches.append(serialization.speech_to_document(speech))
+        self.database.speech_insert_collection(self.speeches)
+        pages, cursor = [], None
+        while True:
+            page = self.database.speech_get_page_for_name(
+                "Jane Doe", 3, cursor, ["meta", "speech_id"]
+            )
+            pages.append(page["speeches"])
+            cursor = page["cursor"]
+            if cursor is None:
+                break
+            self.assertEqual(cursor, "{}|{}".format(
+                pages[-1][-1]["meta"]["date_key"], pages[-1][-1]["speech_id"]
+            ))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(
+            [speech for page in pages for speech in page],
+            [
+                dict(meta=speech["meta"], speech_id=speech["speech_id"])
+                for speech in sorted(speeches, key=lambda speech: (
+                    speech["meta"]["date_key"], speech["speech_id"]
+                ), reverse=True)
+            ]
+        )
+
+    def test_page_projection(self):
+        """Test that pages contain the requested fields and the cursor's."""
+        self.database.speech_insert_collection(self.speeches)
+        name = self.speeches[0].meta["name"]
+        speech = self.database.speech_get_page_for_name(
+            name, 1, fields=["analysis"]
+        )["speeches"][0]
+        self.assertEqual(speech, dict(
+            meta=dict(date_key=self.speeches[0].meta["date_key"]),
+            speech_id=self.speeches[0].speech_id,
+            analysis=self.speeches[0].analysis.to_json()
+        ))
+        speech = self.database.speech_get_page_for_name(
+            name, 1
+        )["speeches"][0]
+        self.assertEqual(
+            speech, serialization.speech_to_document(self.speeches[0])
+        )
+
+    def test_unanalyzed_hidden(self):
+        """Test that speeches are only returned after a successful analysis."""
+        name = "Claudia Müller"
+        speeches = [
+            speech for speech in self.speeches if speech.meta["name"] == name
+        ]
+        self.assertEqual(len(speeches), 2)
+        self.database.speech_insert_collection(
+            speeches, analysis_pending=True
+        )
+        self.assertEqual(self.database.speech_get_speeches_for_name(name), [])
+        self.assertEqual(
+            self.database.speech_get_page_for_name(name, 10)["speeches"], []
+        )
+        self.assertIsNone(self.database.speech_get(speeches[0].speech_id))
+        self.database.speech_update_analysis(speeches[:1])
+        self.database.speech_update_analysis(speeches[1:], failed=True)
+        expected = [serialization.speech_to_document(speeches[0])]
+        self.assertEqual(
+            self.database.speech_get_speeches_for_name(name), expected
+        )
+        self.assertEqual(
+            self.database.speech_get_page_for_name(name, 10)["speeches"],
+            expected
+        )
+        self.assertEqual(
+            self.database.speech_get(speeches[0].speech_id), expected[0]
+        )
+        for speech in speeches[1:]:
+            self.assertIsNone(self.database.speech_get(speech.speech_id))
+
+    def test_page_invalid(self):
+        """Test that invalid limits, cursors and fields are rejected."""
+        with self.assertRaises(ValueError):
+            self.database.speech_get_page_for_name("Jane Doe", 0)
+        with self.assertRaises(ValueError):
+            self.database.speech_get_page_for_name("Jane Doe", 1, "invalid")
+        with self.assertRaises(ValueError):
+            self.database.speech_get_page_for_name(
+                "Jane Doe", 1, fields=["unknown"]
+            )
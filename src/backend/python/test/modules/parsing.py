@@ -2,19 +2,129 @@
 
 
 # Python imports
+import io
+import os
+import glob
+import pickle
+import tempfile
 import unittest
 
 
+# 3rd party modules
+import lxml.etree
+
+
 # Local imports
+import test.synthetic as synthetic
+import src.modules.schema as schema
+import src.modules.columns as columns
 import src.modules.parsing as parsing
 
 
+def legacy_speech_contents(speech):
+    """Return the content of a speech like the former implementation did.
+
+    Reference implementation of 'parsing.__get_speech_contents' before the
+    segmentation was rewritten as a single pass. Used for differential tests.
+
+    Args:
+        speech (lxml.etree.ElementBase): speech to parse
+
+    Returns:
+        schema.SpeechContent: the sequential content of the speech
+
+    """
+    # pylint: disable=undefined-loop-variable
+    speech_content = schema.SpeechContent([])
+    name_flow = [
+        schema.SpeechIndex(speech.index(e), e.text.replace(":", ""))
+        for e in speech if e.tag == "name"
+    ]
+    redner_flow = [
+        schema.SpeechIndex(speech.index(e), "{} {} ({})".format(
+            e.find(".//redner/name/vorname").text
+            if e.find(".//redner/name/vorname") is not None else "n.a",
+            e.find(".//redner/name/nachname").text
+            if e.find(".//redner/name/nachname") is not None else "n.a",
+            e.find(".//redner/name/fraktion").text
+            if e.find(".//redner/name/fraktion") is not None else ""
+        ))
+        for e in speech
+        if e.tag == "p" and "klasse" in e.attrib.keys()
+        and e.attrib["klasse"] == "redner"
+    ]
+    speech_flow = sorted(name_flow + redner_flow, key=lambda x: x.index)
+    speaker = speech_flow[0]
+    for counter, curr_speech_index in enumerate(speech_flow):
+        try:
+            speech_index_start = curr_speech_index
+            speech_index_end = speech_flow[counter + 1].index
+        except IndexError:
+            speech_index_end = len(speech)
+        is_speaker = (speech_index_start.name == speaker.name)
+        paragraphs = speech[(speech_index_start.index + 1):speech_index_end]
+        speech_entry = schema.SpeechEntry(
+            speech_index_start.name, is_speaker, []
+        )
+        for para in paragraphs:
+            if para.text is None:
+                continue
+            if para.tag == "kommentar":
+                speech_paragraph = schema.SpeechParagraph(
+                    schema.SpeechParagraph.TYPE_COMMENT,
+                    para.text.replace("(", "").replace(")", "")
+                )
+            if para.tag == "p" and para.attrib != "redner":
+                speech_paragraph = schema.SpeechParagraph(
+                    schema.SpeechParagraph.TYPE_SPEECH,
+                    para.text
+                )
+            speech_entry.add_paragraph(speech_paragraph)
+        if len(speech_entry.paragraphs) != 0:
+            speech_content.add_speech_entry(speech_entry)
+    return speech_content
+    # pylint: enable=undefined-loop-variable
+
+
+def segment(get_contents, speech):
+    """Return the outcome of a segmentation function for a speech.
+
+    Args:
+        get_contents (Callable): segmentation function
+        speech (lxml.etree.ElementBase): speech to parse
+
+    Returns:
+        dict: json data of the content or None if the segmentation failed
+
+    """
+    try:
+        return get_contents(speech).to_json()
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
 class TestClass(unittest.TestCase):
     """Unittest class."""
 
     DTD_FILE = "data/protocol.dtd"
     PROTOCOL = "data/protocol.xml"
     PROTOCOL_NUMBER_OF_SPEECHES = 91
+    PROTOCOL_CORPUS = "data/*.xml"
+    SPEECH_EDGE_CASES = [
+        # Paragraphs before the first speaker and quotes between paragraphs
+        """<rede id="1"><p>ignored</p><p klasse="redner"><redner id="2">
+        <name><vorname>A</vorname><nachname>B</nachname></name></redner>
+        </p><p>x</p><zitat>q</zitat><kommentar>(c)</kommentar><p/>
+        <name>Präsident:</name><p>y</p><name>Other:</name><a/>
+        <p klasse="redner"><redner id="2"><name><nachname>B</nachname>
+        </name></redner></p><p>z</p></rede>""",
+        # Quote without preceding paragraph
+        """<rede id="1"><name>A:</name><zitat>q</zitat><p>x</p></rede>""",
+        # Speech without any speaker
+        """<rede id="1"><p>x</p><kommentar>(c)</kommentar></rede>""",
+        # Speaker without paragraphs
+        """<rede id="1"><name>A:</name><name>B:</name><p>x</p></rede>"""
+    ]
 
     def test_get_speeches_filepath_none(self):
         """Test function with None as protocol file.
@@ -66,3 +176,171 @@ class TestClass(unittest.TestCase):
             parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
         )
         self.assertEqual(len(speeches), TestClass.PROTOCOL_NUMBER_OF_SPEECHES)
+
+    def test_get_speeches_shared_dtd(self):
+        """Test that the document type definition is loaded only once.
+
+        Parsing the example protocol multiple times must reuse the cached
+        definition and yield identical results.
+        """
+        parsing.clear_dtd_cache()
+        first = parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        get_dtd = getattr(parsing, "__get_dtd")
+        dtd = get_dtd(TestClass.DTD_FILE)
+        second = parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        self.assertIs(dtd, get_dtd(TestClass.DTD_FILE))
+        self.assertEqual(
+            [speech.to_json() for speech in first],
+            [speech.to_json() for speech in second]
+        )
+
+    def test_iter_speeches_filepath_not_exists(self):
+        """Test streaming function with not existing path as protocol file.
+
+        Additionaly, a valid dtd file is provided.
+        """
+        with self.assertRaises(FileNotFoundError):
+            list(parsing.iter_speeches("XYZ", TestClass.DTD_FILE))
+
+    def test_iter_speeches_equals_get_speeches(self):
+        """Test streaming function with example protocol file.
+
+        Assert that the streamed speeches are equal to the speeches that are
+        returned by parsing the whole tree at once.
+        """
+        streamed = parsing.iter_speeches(
+            TestClass.PROTOCOL, TestClass.DTD_FILE
+        )
+        parsed = parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        self.assertEqual(
+            [speech.to_json() for speech in streamed],
+            [speech.to_json() for speech in parsed]
+        )
+
+    def test_get_speeches_in_memory(self):
+        """Test function with the content of the example protocol.
+
+        Assert that bytes and file-like objects are parsed like the file.
+        """
+        with open(TestClass.PROTOCOL, "rb") as protocol:
+            data = protocol.read()
+        expected = [
+            speech.to_json() for speech in
+            parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        ]
+        for source in [data, io.BytesIO(data)]:
+            self.assertEqual([
+                speech.to_json() for speech in
+                parsing.get_speeches(source, TestClass.DTD_FILE)
+            ], expected)
+
+    def test_iter_speeches_in_memory(self):
+        """Test streaming function with the content of the example protocol.
+
+        Assert that bytes and file-like objects are parsed like the file.
+        """
+        with open(TestClass.PROTOCOL, "rb") as protocol:
+            data = protocol.read()
+        expected = [
+            speech.to_json() for speech in
+            parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        ]
+        for source in [data, io.BytesIO(data)]:
+            self.assertEqual([
+                speech.to_json() for speech in
+                parsing.iter_speeches(source, TestClass.DTD_FILE)
+            ], expected)
+
+    def test_speech_contents_differential_corpus(self):
+        """Test segmentation of speeches against the former implementation.
+
+        Every speech of every protocol in the corpus must be segmented
+        exactly like before (or fail like before).
+        """
+        get_contents = getattr(parsing, "__get_speech_contents")
+        protocols = [
+            lxml.etree.parse(protocol)
+            for protocol in glob.glob(TestClass.PROTOCOL_CORPUS)
+        ]
+        protocols.append(lxml.etree.fromstring(
+            synthetic.ProtocolGenerator(agenda_items=3).to_bytes()
+        ))
+        self.assertGreater(len(protocols), 1)
+        for protocol in protocols:
+            for speech in protocol.iter("rede"):
+                self.assertEqual(
+                    segment(get_contents, speech),
+                    segment(legacy_speech_contents, speech)
+                )
+
+    def test_speech_contents_differential_edge_cases(self):
+        """Test segmentation of unusual speeches against the former one."""
+        get_contents = getattr(parsing, "__get_speech_contents")
+        for case in TestClass.SPEECH_EDGE_CASES:
+            speech = lxml.etree.fromstring(case)
+            self.assertEqual(
+                segment(get_contents, speech),
+                segment(legacy_speech_contents, speech)
+            )
+
+    def test_get_speeches_synthetic(self):
+        """Test function with a synthetic protocol.
+
+        The generated protocol must conform to the DTD and every generated
+        speech must be parsed.
+        """
+        generator = synthetic.ProtocolGenerator(
+            agenda_items=3, speeches_per_item=4, interjections_per_speech=2
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            protocol = os.path.join(directory, "synthetic.xml")
+            generator.write(protocol)
+            speeches = parsing.get_speeches(protocol, TestClass.DTD_FILE)
+        self.assertEqual(len(speeches), 12)
+        self.assertEqual(len(speeches[0].content.get_comments()), 2)
+
+    def test_speech_content_statistics(self):
+        """Test the statistics of parsed speeches against their content."""
+        for speech in parsing.get_speeches(
+                TestClass.PROTOCOL, TestClass.DTD_FILE
+        ):
+            self.assertEqual(
+                speech.content.get_speakers_text_length(),
+                len(speech.content.get_speakers_text())
+            )
+            self.assertEqual(
+                speech.content.get_number_of_comments(),
+                len(speech.content.get_comments())
+            )
+
+    def test_columnar_speech_content(self):
+        """Test the columnar content of parsed speeches against the content.
+
+        The columnar content must survive pickling, which is how batches of
+        speeches are sent to other processes.
+        """
+        for speech in parsing.get_speeches(
+                TestClass.PROTOCOL, TestClass.DTD_FILE
+        ):
+            columnar = pickle.loads(pickle.dumps(
+                columns.ColumnarSpeechContent.from_content(speech.content)
+            ))
+            self.assertEqual(columnar.to_json(), speech.content.to_json())
+            self.assertEqual(
+                columnar.get_speakers_text(),
+                speech.content.get_speakers_text()
+            )
+            self.assertEqual(
+                columnar.get_comments(), speech.content.get_comments()
+            )
+
+    def test_name_and_date_key(self):
+        """Test that parsed speeches carry the name and date key."""
+        for speech in parsing.get_speeches(
+                TestClass.PROTOCOL, TestClass.DTD_FILE
+        ):
+            self.assertEqual(
+                speech.meta["name_key"],
+                schema.Name.normalize(speech.meta["name"])
+            )
+            self.assertEqual(speech.meta["date_key"], "2019-10-25")
@@ -151,6 +151,88 @@ class TestClass(unittest.TestCase):
         processing.analyze_speeches([self.positive_speech])
         self.assertGreater(self.positive_speech.analysis.polarity, 0.0)
 
+    def test_analyze_sentiment_lexicon(self):
+        """Test function with the lexicon engine.
+
+        Sentiment analysis should return a negative value for the negative
+        speech and a positive value for the positive one.
+        """
+        processing.configure_engine("lexicon")
+        try:
+            processing.analyze_speeches(
+                [self.negative_speech, self.empty_speech, self.positive_speech]
+            )
+        finally:
+            processing.configure_engine("textblob")
+        self.assertLess(self.negative_speech.analysis.polarity, 0.0)
+        self.assertGreater(self.positive_speech.analysis.polarity, 0.0)
+        self.assertEqual(self.empty_speech.analysis.subjectivity, 0.5)
+
+    def test_analyze_speeches_workers(self):
+        """Test function with a pool of worker processes.
+
+        The results must be equal to the ones of the serial analysis and the
+        order of the speeches must be kept.
+        """
+        speeches = [
+            self.negative_speech, self.empty_speech, self.positive_speech
+        ] * processing.WORKER_BATCH_SIZE
+        processing.configure_engine("lexicon")
+        # Without the cache, all speeches are analyzed by the workers
+        processing.configure_sentiment_cache(0)
+        try:
+            processing.analyze_speeches(speeches)
+            expected = [speech.analysis.to_json() for speech in speeches]
+            processing.configure_workers(2)
+            analyzed = list(processing.iter_analyzed_speeches(
+                schema.Speech.from_json(speech.to_json())
+                for speech in speeches
+            ))
+        finally:
+            processing.configure_workers(0)
+            processing.configure_engine("textblob")
+            processing.configure_sentiment_cache(
+                processing.SENTIMENT_CACHE_SIZE
+            )
+        self.assertEqual(
+            [speech.analysis.to_json() for speech in analyzed], expected
+        )
+
+    def test_analyze_speeches_cached(self):
+        """Test function with speeches that have been analyzed before.
+
+        The sentiments of known texts must be taken from the cache.
+        """
+        speeches = [self.negative_speech, self.positive_speech]
+        processing.configure_engine("lexicon")
+        processing.configure_sentiment_cache(10)
+        try:
+            processing.analyze_speeches(speeches)
+            expected = [speech.analysis.to_json() for speech in speeches]
+            copies = [
+                schema.Speech.from_json(speech.to_json())
+                for speech in speeches
+            ]
+            processing.analyze_speeches(copies)
+            stats = processing.get_sentiment_cache_stats()
+        finally:
+            processing.configure_engine("textblob")
+            processing.configure_sentiment_cache(
+                processing.SENTIMENT_CACHE_SIZE
+            )
+        self.assertEqual(stats, dict(hits=2, misses=2, entries=2))
+        self.assertEqual(
+            [speech.analysis.to_json() for speech in copies], expected
+        )
+
+    def test_configure_engine_unknown(self):
+        """Test function with an unknown engine.
+
+        Function should raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            processing.configure_engine("XYZ")
+
     # def test_analyze_subjective_speech(self):
     #    """Test function with a subjective speech.
     #
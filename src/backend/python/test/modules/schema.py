@@ -5,6 +5,7 @@
 
 
 # Python imports
+import sys
 import unittest
 
 
@@ -44,6 +45,10 @@ class TestClass(unittest.TestCase):
         self.protocol = schema.Protocol(
             url="www.johndoe/default/file.xml", fname="file.xml", done=True
         )
+        self.protocol_context = schema.ProtocolContext(
+            date="25.10.2019", session=dict(period="19", number="122"),
+            topics={"JohnDoe42": "Foo", "AlbertEinstein": "Bar"}
+        )
         self.env_vars = schema.EnvVars(
             database_config=("john", 42, False),
             api_config=("doe", 4711),
@@ -77,6 +82,45 @@ class TestClass(unittest.TestCase):
         duplicate = schema.SpeechContent.from_json(original).to_json()
         self.assertEqual(original, duplicate)
 
+    def test_speech_content_statistics(self):
+        """Test that the statistics follow paragraphs added to entries."""
+        content = schema.SpeechContent([])
+        entry = schema.SpeechEntry("John Doe", True, [self.speech_paragraph])
+        content.add_speech_entry(entry)
+        self.assertEqual(content.get_speakers_text(), "text")
+        entry.add_paragraph(schema.SpeechParagraph(
+            schema.SpeechParagraph.TYPE_COMMENT, "comment"
+        ))
+        entry.add_paragraph(self.speech_paragraph)
+        content.add_speech_entry(self.speech_entry)
+        self.assertEqual(content.get_speakers_text(), "text text")
+        self.assertEqual(content.get_speakers_text_length(), 9)
+        self.assertEqual(content.get_number_of_comments(), 1)
+        self.assertEqual(
+            content.paragraph_counts[schema.SpeechParagraph.TYPE_SPEECH], 12
+        )
+
+    def test_speech_paragraph_type(self):
+        """Test that paragraph types are enum members stored as strings."""
+        paragraph = schema.SpeechParagraph.from_json(
+            dict(type_of_paragraph="comment", text="text")
+        )
+        self.assertIs(
+            paragraph.type_of_paragraph, schema.ParagraphType.COMMENT
+        )
+        self.assertIs(type(paragraph.to_json()["type_of_paragraph"]), str)
+        with self.assertRaises(ValueError):
+            schema.SpeechParagraph("XYZ", "text")
+
+    def test_speech_compact(self):
+        """Test that speeches have no instance dicts and share names."""
+        duplicate = schema.Speech.from_json(self.speech.to_json())
+        self.assertFalse(hasattr(duplicate, "__dict__"))
+        self.assertFalse(hasattr(duplicate.content, "__dict__"))
+        # Strings built at runtime are not shared unless they are interned
+        entry = schema.SpeechEntry("".join(["John", " Doe"]), True, [])
+        self.assertIs(entry.speaker, sys.intern("John Doe"))
+
     def test_speech_analysis(self):
         """Test conversion of class SpeechAnalysis."""
         original = self.speech_analysis.to_json()
@@ -95,11 +139,50 @@ class TestClass(unittest.TestCase):
         duplicate = schema.Protocol.from_json(original).to_json()
         self.assertEqual(original, duplicate)
 
+    def test_protocol_context(self):
+        """Test conversion of class ProtocolContext."""
+        original = self.protocol_context.to_json()
+        duplicate = schema.ProtocolContext.from_json(original).to_json()
+        self.assertEqual(original, duplicate)
+
+    def test_protocol_context_topic(self):
+        """Test topic lookup of class ProtocolContext."""
+        self.assertEqual(self.protocol_context.get_topic("JohnDoe42"), "Foo")
+        self.assertEqual(
+            self.protocol_context.get_topic("unknown"),
+            schema.ProtocolContext.TOPIC_UNKNOWN
+        )
+
+    def test_protocol_context_date_key(self):
+        """Test the sortable key of dates of class ProtocolContext."""
+        self.assertEqual(
+            schema.ProtocolContext.date_key("25.10.2019"), "2019-10-25"
+        )
+        self.assertEqual(
+            schema.ProtocolContext.date_key("1.2.2020"), "2020-02-01"
+        )
+        self.assertEqual(schema.ProtocolContext.date_key("None"), "None")
+
     def test_envvars(self):
         """Test conversion of class EnvVars."""
         original = self.env_vars.to_json()
         duplicate = schema.EnvVars.from_json(original).to_json()
         self.assertEqual(original, duplicate)
 
+    def test_name_normalize(self):
+        """Test the normalized key of names."""
+        for name, key in [
+                ("Svenja Schulze", "svenja schulze"),
+                ("Prof. Dr. Jürgen Müller", "juergen mueller"),
+                ("Dr. h.c. Hans-Peter Friedrich", "hans peter friedrich"),
+                ("José  Señor", "jose senor"),
+                ("Gerhard Strauß", "gerhard strauss")
+        ]:
+            self.assertEqual(schema.Name.normalize(name), key)
+        self.assertEqual(
+            schema.Name.from_url_string("hans-peter-friedrich").get_key(),
+            schema.Name.normalize("Dr. Hans-Peter Friedrich")
+        )
+
 
 # pylint: enable=too-many-instance-attributes
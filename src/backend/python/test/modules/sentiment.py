@@ -0,0 +1,88 @@
+"""Unittest for module sentiment."""
+
+
+# Python imports
+import unittest
+
+
+# 3rd party modules
+from textblob_de import PatternTokenizer
+
+
+# Local imports
+import src.modules.parsing as parsing
+import src.modules.sentiment as sentiment
+
+
+class TestClass(unittest.TestCase):
+    """Unittest class."""
+
+    DTD_FILE = "data/protocol.dtd"
+    PROTOCOL = "data/protocol.xml"
+    NUMBER_OF_SPEECHES = 15
+
+    def setUp(self):
+        """Set test objects up before each test case."""
+        self.engine = sentiment.LexiconEngine()
+
+    def test_create_engine(self):
+        """Test that engines are created by their name."""
+        self.assertIsInstance(
+            sentiment.create_engine("lexicon"), sentiment.LexiconEngine
+        )
+        self.assertIsInstance(
+            sentiment.create_engine("textblob"), sentiment.TextBlobEngine
+        )
+        with self.assertRaises(ValueError):
+            sentiment.create_engine("XYZ")
+
+    def test_lexicon_polarity(self):
+        """Test the polarity of simple sentences.
+
+        A negation turns the polarity into half of its opposite.
+        """
+        self.assertEqual(self.engine.analyze([
+            "Das ist gut.", "Das ist schlecht.", "Das ist nicht gut.",
+            "Das ist ein Tisch.", ""
+        ]), [(1.0, 0.0), (-1.0, 0.0), (-0.5, 0.0), (0.0, 0.0), (0.0, 0.0)])
+
+    def test_lexicon_sentences(self):
+        """Test that the polarity is averaged over the sentences."""
+        self.assertEqual(
+            self.engine.analyze(["Das ist gut. Das ist ein Tisch."]),
+            [(0.5, 0.0)]
+        )
+        self.assertEqual(
+            self.engine.analyze(["Dr. Muster ist gut."]), [(1.0, 0.0)]
+        )
+
+    def test_lexicon_batch(self):
+        """Test that scoring a batch equals scoring every text on its own."""
+        texts = [
+            speech.content.get_speakers_text() for speech in
+            parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        ]
+        self.assertEqual(
+            self.engine.analyze(texts),
+            [self.engine.analyze([text])[0] for text in texts]
+        )
+
+    def test_lexicon_tolerance(self):
+        """Test the lexicon engine against TextBlobDE.
+
+        The polarity must not deviate more than the documented tolerance.
+        Sentences are split by the pattern tokenizer, which does not require
+        any downloaded data.
+        """
+        texts = [
+            speech.content.get_speakers_text() for speech in
+            parsing.get_speeches(TestClass.PROTOCOL, TestClass.DTD_FILE)
+        ][:TestClass.NUMBER_OF_SPEECHES]
+        expected = sentiment.TextBlobEngine(PatternTokenizer()).analyze(texts)
+        for (polarity, _), (expected_polarity, _) in zip(
+                self.engine.analyze(texts), expected
+        ):
+            self.assertAlmostEqual(
+                polarity, expected_polarity,
+                delta=sentiment.LexiconEngine.TOLERANCE
+            )
@@ -0,0 +1,80 @@
+"""Unittest for module serialization."""
+
+
+# Python imports
+import unittest
+
+
+# Local imports
+import src.modules.parsing as parsing
+import src.modules.myexceptions as myexceptions
+import src.modules.serialization as serialization
+
+
+class TestClass(unittest.TestCase):
+    """Unittest class."""
+
+    DTD_FILE = "data/protocol.dtd"
+    PROTOCOL = "data/protocol.xml"
+
+    def setUp(self):
+        """Set test objects up before each test case."""
+        self.speeches = parsing.get_speeches(
+            TestClass.PROTOCOL, TestClass.DTD_FILE
+        )
+        self.speeches[0].analysis.update(0.42, 0.47, 11)
+
+    def test_speech_to_document(self):
+        """Test that documents equal the json data of the speeches."""
+        for speech in self.speeches:
+            self.assertEqual(
+                serialization.speech_to_document(speech), speech.to_json()
+            )
+
+    def test_speech_from_document(self):
+        """Test that speeches are restored including their analysis."""
+        for speech in self.speeches:
+            for columnar in [False, True]:
+                duplicate = serialization.speech_from_document(
+                    speech.to_json(), columnar=columnar
+                )
+                self.assertEqual(duplicate.to_json(), speech.to_json())
+
+    def test_speech_from_document_untrusted(self):
+        """Test that untrusted documents are validated."""
+        document = self.speeches[0].to_json()
+        del document["content"]["entries"][0]["is_speaker"]
+        with self.assertRaises(myexceptions.JSONInitializationException):
+            serialization.speech_from_document(document, trusted=False)
+
+    def test_speech_bytes(self):
+        """Test encoding speeches to BSON and JSON bytes and back."""
+        for speech in self.speeches:
+            self.assertEqual(serialization.speech_from_bson(
+                serialization.speech_to_bson(speech)
+            ).to_json(), speech.to_json())
+            self.assertEqual(serialization.speech_from_json_bytes(
+                serialization.speech_to_json_bytes(speech)
+            ).to_json(), speech.to_json())
+
+    def test_speech_proxy(self):
+        """Test that proxies decode their content on first access only."""
+        for speech in self.speeches:
+            for columnar in [False, True]:
+                document = speech.to_json()
+                proxy = serialization.SpeechProxy(document, columnar)
+                self.assertEqual(proxy.meta, speech.meta)
+                self.assertEqual(
+                    proxy.analysis.to_json(), speech.analysis.to_json()
+                )
+                self.assertEqual(proxy.to_json(), document)
+                self.assertEqual(
+                    serialization.speech_to_document(proxy), document
+                )
+                self.assertFalse(proxy.is_decoded())
+                self.assertEqual(
+                    proxy.content.get_speakers_text(),
+                    speech.content.get_speakers_text()
+                )
+                self.assertTrue(proxy.is_decoded())
+                self.assertEqual(proxy.to_json(), document)
@@ -0,0 +1,248 @@
+"""Generator of synthetic protocols of the Bundestag.
+
+The generated protocols conform to the document type definition of the
+Bundestag and can be used to benchmark parsing and processing at arbitrary
+sizes.
+"""
+
+
+# Python imports
+import random
+from typing import List
+
+
+# 3rd party modules
+import lxml.etree
+
+
+# Doctype declaration of the generated protocols
+DOCTYPE = '<!DOCTYPE dbtplenarprotokoll SYSTEM "dbtplenarprotokoll.dtd">'
+# Fixed attributes of the root element required by the DTD
+VERTRIEB = (
+    "Bundesanzeiger Verlagsgesellschaft mbH, Postfach 1 0 05 34, 50445 Köln, "
+    "Telefon (02 21) 97 66 83 40, Fax (02 21) 97 66 83 44, "
+    "www.betrifft-gesetze.de"
+)
+# Parties the synthetic deputies belong to
+PARTIES = ["CDU/CSU", "SPD", "AfD", "FDP", "DIE LINKE", "BÜNDNIS 90/DIE GRÜNEN"]
+# Vocabulary of the synthetic paragraphs (including sentiment words)
+WORDS = [
+    "der", "die", "das", "und", "nicht", "wir", "sie", "ist", "haben",
+    "Bundestag", "Regierung", "Gesetz", "Antrag", "Bürger", "Klimaschutz",
+    "Zukunft", "Land", "Wirtschaft", "Arbeit", "Familien", "Verantwortung",
+    "gut", "schlecht", "wichtig", "falsch", "richtig", "sehr", "großartig",
+    "gefährlich", "erfolgreich", "Hoffnung", "Angst", "Freude", "Kritik"
+]
+# Interjections of other deputies
+COMMENTS = [
+    "(Beifall bei der {})", "(Zuruf von der {})", "(Heiterkeit bei der {})",
+    "(Widerspruch bei der {})"
+]
+
+
+class ProtocolGenerator:
+    """Generator of a single synthetic protocol."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+            self, agenda_items: int = 10, speeches_per_item: int = 10,
+            interjections_per_speech: int = 10, paragraph_length: int = 80,
+            paragraphs_per_speech: int = 10, seed: int = 42
+    ):
+        """Init object.
+
+        Args:
+            agenda_items (int, optional): number of agenda items
+            speeches_per_item (int, optional): speeches per agenda item
+            interjections_per_speech (int, optional): comments per speech
+            paragraph_length (int, optional): words per paragraph
+            paragraphs_per_speech (int, optional): paragraphs per speech
+            seed (int, optional): seed of the random number generator
+
+        """
+        self.agenda_items = agenda_items
+        self.speeches_per_item = speeches_per_item
+        self.interjections_per_speech = interjections_per_speech
+        self.paragraph_length = paragraph_length
+        self.paragraphs_per_speech = paragraphs_per_speech
+        self.random = random.Random(seed)
+    # pylint: enable=too-many-arguments
+
+    def to_bytes(self) -> bytes:
+        """Generate the protocol and return it as xml document.
+
+        Returns:
+            bytes: serialized protocol
+
+        """
+        root = lxml.etree.Element("dbtplenarprotokoll", {
+            "wahlperiode": "19", "sitzung-nr": "1",
+            "sitzung-datum": "01.01.2020", "sitzung-start-uhrzeit": "9.00",
+            "sitzung-ende-uhrzeit": "17.00",
+            "sitzung-naechste-datum": "02.01.2020",
+            "herstellung": "synthetic", "vertrieb": VERTRIEB,
+            "start-seitennr": "1"
+        })
+        speakers = [
+            "S{:03d}{:03d}".format(item, number)
+            for item in range(self.agenda_items)
+            for number in range(self.speeches_per_item)
+        ]
+        self.__add_preamble(root, speakers)
+        self.__add_proceedings(root)
+        anlage = lxml.etree.SubElement(
+            lxml.etree.SubElement(root, "anlagen"), "anlage"
+        )
+        lxml.etree.SubElement(anlage, "anlagen-text").text = "Anlage"
+        speaker_list = lxml.etree.SubElement(
+            root, "rednerliste", {"sitzung-datum": "01.01.2020"}
+        )
+        for speaker_id in speakers:
+            self.__add_speaker(speaker_list, speaker_id)
+        return lxml.etree.tostring(
+            root.getroottree(), xml_declaration=True, encoding="utf-8",
+            doctype=DOCTYPE
+        )
+
+    def write(self, filepath: str) -> None:
+        """Generate the protocol and write it to the given file.
+
+        Args:
+            filepath (str): destination of the protocol
+
+        """
+        with open(filepath, "wb") as out:
+            out.write(self.to_bytes())
+
+    def __add_preamble(
+            self, root: lxml.etree.ElementBase, speakers: List[str]
+    ) -> None:
+        """Add header and table of contents to the protocol.
+
+        Args:
+            root (lxml.etree.ElementBase): root element
+            speakers (List[str]): IDs of all speakers
+
+        """
+        preamble = lxml.etree.SubElement(root, "vorspann")
+        header = lxml.etree.SubElement(preamble, "kopfdaten")
+        for tag, text in [
+                ("plenarprotokoll-nummer", "Plenarprotokoll 19/1"),
+                ("herausgeber", "Deutscher Bundestag"),
+                ("berichtart", "Stenografischer Bericht"),
+                ("sitzungstitel", "1. Sitzung")
+        ]:
+            lxml.etree.SubElement(header, tag).text = text
+        date = lxml.etree.SubElement(header, "veranstaltungsdaten")
+        lxml.etree.SubElement(date, "datum", {"date": "01.01.2020"}).text = (
+            "Mittwoch, den 1. Januar 2020"
+        )
+        contents = lxml.etree.SubElement(preamble, "inhaltsverzeichnis")
+        lxml.etree.SubElement(contents, "ivz-titel").text = "Inhalt:"
+        for item in range(self.agenda_items):
+            block = lxml.etree.SubElement(contents, "ivz-block")
+            lxml.etree.SubElement(block, "ivz-block-titel").text = (
+                "Tagesordnungspunkt {}:".format(item + 1)
+            )
+            lxml.etree.SubElement(
+                lxml.etree.SubElement(block, "ivz-eintrag"),
+                "ivz-eintrag-inhalt"
+            ).text = "Antrag: {}".format(self.__sentence(8))
+            for speaker_id in speakers[
+                    item * self.speeches_per_item:
+                    (item + 1) * self.speeches_per_item
+            ]:
+                self.__add_speaker(lxml.etree.SubElement(
+                    lxml.etree.SubElement(block, "ivz-eintrag"),
+                    "ivz-eintrag-inhalt"
+                ), speaker_id)
+
+    def __add_proceedings(self, root: lxml.etree.ElementBase) -> None:
+        """Add the agenda items and their speeches to the protocol.
+
+        Args:
+            root (lxml.etree.ElementBase): root element
+
+        """
+        proceedings = lxml.etree.SubElement(root, "sitzungsverlauf")
+        for item in range(self.agenda_items):
+            agenda_item = lxml.etree.SubElement(
+                proceedings, "tagesordnungspunkt",
+                {"top-id": "Tagesordnungspunkt {}".format(item + 1)}
+            )
+            for number in range(self.speeches_per_item):
+                self.__add_speech(
+                    agenda_item, "S{:03d}{:03d}".format(item, number)
+                )
+
+    def __add_speech(
+            self, agenda_item: lxml.etree.ElementBase, speaker_id: str
+    ) -> None:
+        """Add a single speech with interjections to an agenda item.
+
+        Args:
+            agenda_item (lxml.etree.ElementBase): agenda item
+            speaker_id (str): ID of the speaker
+
+        """
+        speech = lxml.etree.SubElement(
+            agenda_item, "rede", {"id": "ID{}".format(speaker_id)}
+        )
+        self.__add_speaker(
+            lxml.etree.SubElement(speech, "p", {"klasse": "redner"}),
+            speaker_id
+        )
+        comments = sorted(
+            self.random.randrange(self.paragraphs_per_speech)
+            for _ in range(self.interjections_per_speech)
+        )
+        for number in range(self.paragraphs_per_speech):
+            lxml.etree.SubElement(speech, "p").text = self.__sentence(
+                self.paragraph_length
+            )
+            for _ in range(comments.count(number)):
+                lxml.etree.SubElement(speech, "kommentar").text = (
+                    self.random.choice(COMMENTS).format(
+                        self.random.choice(PARTIES)
+                    )
+                )
+        lxml.etree.SubElement(speech, "name").text = "Präsident Dr. Muster:"
+        lxml.etree.SubElement(speech, "p").text = "Vielen Dank."
+
+    def __add_speaker(
+            self, parent: lxml.etree.ElementBase, speaker_id: str
+    ) -> None:
+        """Add the speaker element of a deputy.
+
+        Args:
+            parent (lxml.etree.ElementBase): parent element
+            speaker_id (str): ID of the speaker
+
+        """
+        name = lxml.etree.SubElement(
+            lxml.etree.SubElement(parent, "redner", {"id": speaker_id}),
+            "name"
+        )
+        lxml.etree.SubElement(name, "vorname").text = "Vorname{}".format(
+            speaker_id
+        )
+        lxml.etree.SubElement(name, "nachname").text = "Nachname{}".format(
+            speaker_id
+        )
+        lxml.etree.SubElement(name, "fraktion").text = PARTIES[
+            sum(ord(char) for char in speaker_id) % len(PARTIES)
+        ]
+
+    def __sentence(self, length: int) -> str:
+        """Return a random sentence of the given number of words.
+
+        Args:
+            length (int): number of words
+
+        Returns:
+            str: sentence
+
+        """
+        words = [self.random.choice(WORDS) for _ in range(length)]
+        words[0] = words[0].capitalize()
+        return "{}.".format(" ".join(words))
@@ -11,8 +11,13 @@ import unittest
 
 # Local imports
 import test.modules.parsing as parsing_test
+import test.modules.caching as caching_test
 import test.modules.schema as schema_test
+import test.modules.columns as columns_test
+import test.modules.database as database_test
+import test.modules.sentiment as sentiment_test
 import test.modules.processing as processing_test
+import test.modules.serialization as serialization_test
 
 
 def suite():
@@ -26,6 +31,11 @@ def suite():
     test_suite.addTest(unittest.makeSuite(parsing_test.TestClass))
     test_suite.addTest(unittest.makeSuite(processing_test.TestClass))
     test_suite.addTest(unittest.makeSuite(schema_test.TestClass))
+    test_suite.addTest(unittest.makeSuite(columns_test.TestClass))
+    test_suite.addTest(unittest.makeSuite(caching_test.TestClass))
+    test_suite.addTest(unittest.makeSuite(sentiment_test.TestClass))
+    test_suite.addTest(unittest.makeSuite(serialization_test.TestClass))
+    test_suite.addTest(unittest.makeSuite(database_test.TestClass))
     return test_suite
 
 